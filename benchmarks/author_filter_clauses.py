@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+"""Size of the author filters generated by the ``product`` and ``compact`` author filter strategies.
+
+Usage:
+    python benchmarks/author_filter_clauses.py [--repeat N] [NAME ...]
+
+For each author name (by default, names with a growing number of parts), reports the number of name variations, the
+number of leaf clauses (``term``, ``terms`` and ``match``) and the serialized size of the filter, as well as the time
+for generating the author query, with each strategy.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import json
+import sys
+import timeit
+
+from inspire_query_parser.utils.visitor_utils import generate_minimal_name_variations
+from inspire_query_parser.visitors.elastic_search_visitor import ElasticSearchVisitor
+
+DEFAULT_NAMES = [
+    'Ellis',
+    'Ellis, J.',
+    'Ellis, John',
+    'Ellis, John Richard',
+    'Caro-Estevez, Jose Luis',
+    'van der Berg, Jan Willem',
+    'Kim, Jae Hoon Kyung Min',
+]
+
+STRATEGIES = (ElasticSearchVisitor.AUTHOR_FILTER_STRATEGY_PRODUCT, ElasticSearchVisitor.AUTHOR_FILTER_STRATEGY_COMPACT)
+
+
+def _visitor(author_filter_strategy):
+    class AuthorFilterElasticSearchVisitor(ElasticSearchVisitor):
+        AUTHOR_FILTER_STRATEGY = author_filter_strategy
+
+    return AuthorFilterElasticSearchVisitor()
+
+
+def count_clauses(query):
+    """Counts the leaf ``term``, ``terms`` and ``match`` clauses of query."""
+    if isinstance(query, dict):
+        return sum(count_clauses(value) for value in query.values()) + \
+            sum(1 for key in query if key in ('term', 'terms', 'match'))
+    if isinstance(query, list):
+        return sum(count_clauses(value) for value in query)
+    return 0
+
+
+def measure(author_name, repeat):
+    row = {'name': author_name, 'variations': len(generate_minimal_name_variations(author_name))}
+    for strategy in STRATEGIES:
+        visitor = _visitor(strategy)
+        author_filter = visitor._generate_author_query(author_name)['nested']['query']['bool']['filter']
+        duration = min(timeit.repeat(lambda: visitor._generate_author_query(author_name), number=100, repeat=repeat))
+        row[strategy] = {
+            'clauses': count_clauses(author_filter),
+            'bytes': len(json.dumps(author_filter)),
+            'time': duration / 100,
+        }
+    return row
+
+
+def format_table(rows):
+    header = '{:<28} {:>4}'.format('name', 'vars')
+    for strategy in STRATEGIES:
+        header += ' {:>9} {:>7} {:>8}'.format(strategy[:7] + ' cl', 'bytes', 'us')
+    lines = [header]
+    for row in rows:
+        line = '{:<28} {:>4}'.format(row['name'][:28], row['variations'])
+        for strategy in STRATEGIES:
+            line += ' {:>9} {:>7} {:>8.1f}'.format(
+                row[strategy]['clauses'], row[strategy]['bytes'], row[strategy]['time'] * 1e6
+            )
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('names', nargs='*', help='author names, by default names with a growing number of parts')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='timing runs per name, the best one is kept')
+    args = arg_parser.parse_args(argv)
+
+    print(format_table([measure(author_name, args.repeat) for author_name in args.names or DEFAULT_NAMES]))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
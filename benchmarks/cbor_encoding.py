@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+"""Encoded size and encode time of the ElasticSearch queries in CBOR, against JSON.
+
+Usage:
+    python benchmarks/cbor_encoding.py [--log PATH] [--repeat N]
+
+Translates the query log with ``parse_query``, then reports for JSON (``json.dumps(es_query, sort_keys=True)``, encoded
+to UTF-8) and CBOR (``encode_cbor``) the mean and largest encoded sizes, and the encode time per query. The translation
+isn't included.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import json
+import logging
+import os
+import sys
+import timeit
+
+from inspire_query_parser import parse_query
+from inspire_query_parser.utils.cbor_encoder import encode_cbor
+from stages import read_query_log
+
+DEFAULT_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'synthetic_query_log.jsonl')
+
+
+def encode_json(es_query):
+    return json.dumps(es_query, sort_keys=True).encode('utf-8')
+
+
+ENCODINGS = [('json', encode_json), ('cbor', encode_cbor)]
+
+
+def measure(es_queries, repeat):
+    rows = []
+    for name, encode in ENCODINGS:
+        sizes = [len(encode(es_query)) for es_query in es_queries]
+
+        def encode_all():
+            for es_query in es_queries:
+                encode(es_query)
+
+        duration = min(timeit.repeat(encode_all, number=1, repeat=repeat))
+        rows.append((name, sum(sizes) / len(sizes), max(sizes), duration / len(es_queries)))
+    return rows
+
+
+def format_report(rows):
+    json_mean_size = rows[0][1]
+    lines = ['{:<8} {:>12} {:>12} {:>12} {:>12}'.format('encoding', 'mean bytes', 'max bytes', 'vs json', 'us/query')]
+    for name, mean_size, max_size, duration in rows:
+        lines.append('{:<8} {:>12.1f} {:>12} {:>11.1f}% {:>12.2f}'.format(
+            name, mean_size, max_size, mean_size / json_mean_size * 100, duration * 1e6
+        ))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--log', default=DEFAULT_LOG, help='JSONL or plain text query log')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='timing runs, the best one is kept')
+    args = arg_parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    es_queries = [parse_query(query) for query in read_query_log(args.log)]
+    print(format_report(measure(es_queries, args.repeat)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
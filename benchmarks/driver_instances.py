@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+"""Per-query cost of creating the parser and visitors of the driver, which ``parse_query`` does for each query.
+
+Usage:
+    python benchmarks/driver_instances.py [--log PATH] [--repeat N] [--qps N]
+
+Reports the time for creating each of the instances ``parse_query`` needs, against getting them from a per-thread pool
+(what reusing them would cost at least), and their share of the time per query of translating the query log. The time
+a pool would save is also expressed as the fraction of a CPU core at ``--qps`` queries per second.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import logging
+import os
+import sys
+import threading
+import timeit
+
+from inspire_query_parser.parsing_driver import parse_query
+from inspire_query_parser.stateful_pypeg_parser import StatefulParser
+from inspire_query_parser.visitors.elastic_search_visitor import ElasticSearchVisitor
+from inspire_query_parser.visitors.restructuring_visitor import RestructuringVisitor
+from stages import read_query_log
+
+DEFAULT_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'synthetic_query_log.jsonl')
+
+CLASSES = (StatefulParser, RestructuringVisitor, ElasticSearchVisitor)
+
+
+def _best_time_per_call(func, number, repeat):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def measure_instances(repeat, number=20000):
+    rows = [
+        (cls.__name__, _best_time_per_call(cls, number, repeat), None) for cls in CLASSES
+    ]
+
+    pool = threading.local()
+    pool.instances = {cls: cls() for cls in CLASSES}
+    pooled = _best_time_per_call(lambda: [pool.instances[cls] for cls in CLASSES], number, repeat)
+    rows.append(('all', sum(created for _, created, _ in rows), pooled))
+    return rows
+
+
+def measure_queries(queries, repeat):
+    def translate_all():
+        for query in queries:
+            parse_query(query)
+
+    translate_all()  # Fills the caches of the name, date, etc. helpers.
+    return min(timeit.repeat(translate_all, number=1, repeat=repeat)) / len(queries)
+
+
+def format_report(instance_rows, query_time, qps):
+    lines = ['{:<24} {:>12} {:>12} {:>12}'.format('instances', 'created us', 'pooled us', 'saved us')]
+    for name, created, pooled in instance_rows[:-1]:
+        lines.append('{:<24} {:>12.2f}'.format(name, created * 1e6))
+    name, created, pooled = instance_rows[-1]
+    saved = created - pooled
+    lines.append('{:<24} {:>12.2f} {:>12.2f} {:>12.2f}'.format(name, created * 1e6, pooled * 1e6, saved * 1e6))
+
+    lines.extend([
+        '',
+        'parse_query: {:.1f} us/query, of which {:.3%} creating the instances'.format(
+            query_time * 1e6, created / query_time
+        ),
+        'at {} queries/s, a pool would save {:.2f}% of a CPU core'.format(qps, saved * qps * 100),
+    ])
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--log', default=DEFAULT_LOG, help='JSONL or plain text query log')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='timing runs, the best one is kept')
+    arg_parser.add_argument('--qps', type=int, default=1000, help='query rate for expressing the saved CPU time')
+    args = arg_parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)  # The fallback queries log warnings and tracebacks.
+    queries = read_query_log(args.log)
+    print(format_report(measure_instances(args.repeat), measure_queries(queries, args.repeat), args.qps))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+"""Per grammar category microbenchmarks, compared against stored baselines.
+
+Usage:
+    python benchmarks/grammar_categories.py                   # Print timings.
+    python benchmarks/grammar_categories.py --save            # Store timings as the new baseline.
+    python benchmarks/grammar_categories.py --compare [--threshold 0.25]
+
+With ``--compare`` the exit status is 1 if the time of any stage of any category exceeds its baseline by more than the
+threshold (a fraction of the baseline time).
+
+The baseline stores the timings relative to the time of a calibration loop run by the same process, so that it can be
+compared against on a faster or slower machine: it's scaled by the calibration time of the current run. The machine and
+the Python of the baseline are stored with it too, and the comparison is refused against another Python, whose
+relative timings differ.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+from collections import OrderedDict
+import io
+import json
+import logging
+import os
+import platform
+import sys
+import timeit
+
+from stages import STAGES, translate_with_stage_timings
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'grammar_categories.json')
+
+# Grouped like tests/test_parser_functionality.py.
+CATEGORIES = OrderedDict([
+    ('find_prefix', [
+        "FIN author:'ellis'",
+        'Find author "ellis"',
+        'f AU ellis',
+        'find a T.A. Aibergenov and date = 1986',
+    ]),
+    ('invenio_keywords', [
+        'author:ellis and Ti:boson',
+        "unknown_keyword:'bar'",
+        "dotted.keyword:'bar'",
+        'fulltext:boson and (reference:Ellis or reference "Ellis")',
+        'exactauthor:M.Vanderhaeghen.1 and ac: 42',
+    ]),
+    ('spires_keywords', [
+        "author ellis and title 'boson'",
+        'f a appelquist and date 1983',
+        "au ellis | title 'boson'",
+        "-author ellis OR title 'boson'",
+        "author ellis & title 'boson'",
+    ]),
+    ('implicit_and', [
+        "author ellis elastic.keyword:'boson'",
+        'find cn atlas not tc c',
+        "author:ellis j title:'boson' reference:M.N.1",
+        "author ellis title 'boson' not title higgs",
+        "author ellis - title 'boson'",
+    ]),
+    ('simple_value_booleans', [
+        'author ellis, j and smith',
+        'f author ellis, j and patrignani and j Chin.Phys.',
+        'f author ellis, j and patrignani and j, ellis',
+        'author (pardo, f AND slavich) OR (author:bernreuther and not date:2017)',
+    ]),
+    ('ranges_and_comparisons', [
+        'd 2015->2017 and cited:1->9',
+        'date > 2000-10 and < 2000-12',
+        'date after 10/2000 and before 2000-12',
+        'date >= nov 2000 and d<=2005',
+        'date 1978+ + -ac 100+',
+    ]),
+    ('nested_keywords', [
+        'referstox:author:s.p.martin.1',
+        'find a parke, s j and refersto author witten',
+        'citedby:author:s.p.martin.1',
+        '-refersto:recid:1374998 and citedby:(A.A.Aguilar.Arevalo.1)',
+        'citedby:refersto:recid:1432705',
+    ]),
+    ('malformed_input', [
+        'title and foo',
+        'title γ-radiation and and',
+        'd < 200',
+        '',
+        '       ',
+    ]),
+    ('date_specifiers', [
+        'date today - 2 and title foo',
+        'date this month author ellis',
+        'date yesterday - 2 - ac 100',
+        'date last month - 2 + ac < 50',
+        'du > yesterday - 2',
+    ]),
+    ('journal_and_author_special_cases', [
+        'find (j phys.rev. and vol d85) or (j phys.rev.lett.,62,1825)',
+        'j Phys.Rev.D,85',
+        'a Ellis, John',
+        'a Mele, Salvatore',
+        'a J.Smith',
+        'ea S.Mele.1',
+        "find a 'o*aigh' and t \"alge*\" and date >2013",
+        'author:/^Ellis, (J|John)$/',
+    ]),
+])
+
+
+def _calibration_loop():
+    # Pure Python work of the kinds the parser does: attribute lookups, calls, string slicing and comparisons.
+    text = 'find a ellis and t boson or date > 2000'
+    matches = 0
+    for _ in range(200):
+        for position in range(len(text)):
+            if text[position:position + 3].lower() in ('and', 'or ', 'not'):
+                matches += 1
+    return matches
+
+
+def calibrate(repeat):
+    """Returns the best time (in ms) of the calibration loop, which the baseline timings are relative to."""
+    return min(timeit.repeat(_calibration_loop, number=1, repeat=max(2 * repeat, 30))) * 1000
+
+
+def describe_environment():
+    """Returns the machine and Python that the timings are measured on."""
+    return OrderedDict([
+        ('python', '{} {}'.format(platform.python_implementation(), '.'.join(platform.python_version_tuple()[:2]))),
+        ('machine', '{} {}'.format(platform.system(), platform.machine())),
+        ('processor', platform.processor()),
+    ])
+
+
+def to_baseline(results, calibration_time):
+    """Returns the baseline of results, with the timings relative to the calibration time."""
+    return OrderedDict([
+        ('environment', describe_environment()),
+        ('calibration_ms', round(calibration_time, 4)),
+        ('categories', OrderedDict(
+            (category, OrderedDict((stage, round(time / calibration_time, 4)) for stage, time in timings.items()))
+            for category, timings in results.items()
+        )),
+    ])
+
+
+def from_baseline(baseline, calibration_time):
+    """Returns the timings (in ms) of the baseline, scaled to the calibration time of the current run."""
+    return OrderedDict(
+        (category, OrderedDict((stage, relative_time * calibration_time) for stage, relative_time in timings.items()))
+        for category, timings in baseline['categories'].items()
+    )
+
+
+def measure(repeat):
+    """Returns, for each category, the sum of the best time (in ms) of each stage over the category's queries.
+
+    The best of several runs is used, since it is the least sensitive to scheduling noise.
+    """
+    for queries in CATEGORIES.values():  # Warm-up.
+        for query_str in queries:
+            translate_with_stage_timings(query_str)
+
+    results = OrderedDict()
+    for category, queries in CATEGORIES.items():
+        category_timings = dict.fromkeys(STAGES, 0.0)
+        for query_str in queries:
+            runs = [translate_with_stage_timings(query_str)[0] for _ in range(repeat)]
+            for stage in STAGES:
+                category_timings[stage] += min(run.get(stage, 0.0) for run in runs) * 1000
+        results[category] = OrderedDict((stage, round(category_timings[stage], 4)) for stage in STAGES)
+    return results
+
+
+def compare(results, baseline, threshold, min_delta):
+    """Returns a list of (category, stage, baseline ms, current ms) for every stage that regressed beyond threshold.
+
+    Slowdowns smaller than min_delta milliseconds are ignored, as they are within timer noise for the fast stages.
+    """
+    regressions = []
+    for category, timings in results.items():
+        for stage, current in timings.items():
+            baseline_time = baseline.get(category, {}).get(stage)
+            if baseline_time and current > baseline_time * (1 + threshold) and current - baseline_time > min_delta:
+                regressions.append((category, stage, baseline_time, current))
+    return regressions
+
+
+def format_results(results, baseline=None):
+    lines = ['{:<34}'.format('category (ms)') + ''.join('{:>14}'.format(stage) for stage in STAGES)]
+    for category, timings in results.items():
+        cells = []
+        for stage in STAGES:
+            cell = '{:.3f}'.format(timings[stage])
+            if baseline and baseline.get(category, {}).get(stage):
+                cell += ' {:+.0%}'.format(timings[stage] / baseline[category][stage] - 1)
+            cells.append('{:>14}'.format(cell))
+        lines.append('{:<34}'.format(category) + ''.join(cells))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON file')
+    arg_parser.add_argument('--repeat', type=int, default=15, help='runs per query, the best one is kept')
+    arg_parser.add_argument('--save', action='store_true', help='store the results as the new baseline')
+    arg_parser.add_argument('--compare', action='store_true', help='fail if a category regressed')
+    arg_parser.add_argument('--threshold', type=float, default=0.25,
+                            help='allowed slowdown, as a fraction of the baseline time (default: 0.25)')
+    arg_parser.add_argument('--min-delta', type=float, default=0.05,
+                            help='ignore slowdowns smaller than this many milliseconds (default: 0.05)')
+    args = arg_parser.parse_args(argv)
+
+    logging.getLogger('inspire_query_parser').setLevel(logging.CRITICAL)
+
+    # Calibrated before and after measuring, keeping the best, like the timings.
+    calibration_time = calibrate(args.repeat)
+    results = measure(args.repeat)
+    calibration_time = min(calibration_time, calibrate(args.repeat))
+
+    if args.save:
+        with io.open(args.baseline, 'w', encoding='utf-8') as baseline_file:
+            baseline_file.write(json.dumps(to_baseline(results, calibration_time), indent=2) + '\n')
+        print(format_results(results))
+        print('\nBaseline saved to {}.'.format(args.baseline))
+        return 0
+
+    if not args.compare:
+        print(format_results(results))
+        return 0
+
+    with io.open(args.baseline, encoding='utf-8') as baseline_file:
+        stored_baseline = json.load(baseline_file)
+
+    environment = describe_environment()
+    stored_environment = stored_baseline.get('environment', {})
+    print('Baseline measured with {} on {} ({}), calibration {:.3f}ms.'.format(
+        stored_environment.get('python'), stored_environment.get('machine'), stored_environment.get('processor'),
+        stored_baseline.get('calibration_ms', float('nan'))
+    ))
+    print('Current run with {} on {} ({}), calibration {:.3f}ms.\n'.format(
+        environment['python'], environment['machine'], environment['processor'], calibration_time
+    ))
+    if 'categories' not in stored_baseline or stored_environment.get('python') != environment['python']:
+        print('The baseline is uncalibrated or was measured with another Python, save a new one with --save.')
+        return 2
+
+    baseline = from_baseline(stored_baseline, calibration_time)
+    print(format_results(results, baseline))
+    regressions = compare(results, baseline, args.threshold, args.min_delta)
+    if not regressions:
+        print('\nNo category regressed more than {:.0%}.'.format(args.threshold))
+        return 0
+
+    print('\nRegressions beyond {:.0%}:'.format(args.threshold))
+    for category, stage, baseline_time, current in regressions:
+        print('  {} [{}]: {:.3f}ms -> {:.3f}ms'.format(category, stage, baseline_time, current))
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+"""Cold-start cost of ``import inspire_query_parser``, from ``python -X importtime``.
+
+Usage:
+    python benchmarks/import_time.py [--repeat N] [--top N] [--budget MS]
+
+Imports the package in fresh interpreters (Python 3.7+) and reports, for the fastest run, the total import time and the
+modules with the largest cumulative import time, followed by the time of the first queries of a few kinds, which pay
+for the dependencies imported on first use. Exits with status 1 if the import takes longer than ``--budget``
+milliseconds, or if one of the dependencies that are only needed by some queries (``DEFERRED_MODULES``) got imported.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import json
+import subprocess
+import sys
+
+PACKAGE = 'inspire_query_parser'
+
+DEFAULT_BUDGET = 150
+"""Milliseconds, about twice the import time on a developer laptop."""
+
+DEFERRED_MODULES = ('inspire_schemas', 'lxml', 'babel', 'nameparser', 'dateutil')
+"""Dependencies which must only be imported by the queries needing them."""
+
+FIRST_QUERIES = [
+    ('simple', 'title collider'),
+    ('author', 'a Ellis, John'),
+    ('date', 'date > 2010-11'),
+    ('date specifier', 'de today - 2'),
+    ('journal', 'j Phys.Rev,D85,1'),
+]
+
+_FIRST_QUERIES_SCRIPT = '''
+import json, sys, timeit
+from inspire_query_parser import parse_query
+durations = []
+for query in json.loads(sys.argv[1]):
+    start = timeit.default_timer()
+    parse_query(query)
+    durations.append(timeit.default_timer() - start)
+print(json.dumps(durations))
+'''
+
+
+def parse_importtime(output):
+    """Parses the ``-X importtime`` output to a list of ``(module, self us, cumulative us, depth)``."""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_time, cumulative_time, name = line[len('import time:'):].split('|')
+        if not self_time.strip().isdigit():
+            continue  # The header.
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), int(self_time), int(cumulative_time), depth))
+    return modules
+
+
+def measure_import():
+    output = subprocess.check_output(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + PACKAGE], stderr=subprocess.STDOUT
+    ).decode('utf-8')
+    return parse_importtime(output)
+
+
+def measure_first_queries():
+    output = subprocess.check_output(
+        [sys.executable, '-c', _FIRST_QUERIES_SCRIPT, json.dumps([query for _, query in FIRST_QUERIES])]
+    ).decode('utf-8')
+    return list(zip((kind for kind, _ in FIRST_QUERIES), json.loads(output)))
+
+
+def package_import_time(modules):
+    return next(cumulative for name, _, cumulative, _ in modules if name == PACKAGE)
+
+
+def format_report(modules, first_queries, top):
+    total = package_import_time(modules)
+    package_modules = []
+    in_package = False
+    for module in reversed(modules):  # Children are reported before their parents.
+        name, _, _, depth = module
+        if name == PACKAGE:
+            in_package = True
+        elif in_package and depth == 0:
+            break
+        if in_package:
+            package_modules.append(module)
+
+    lines = ['import {}: {:.1f} ms'.format(PACKAGE, total / 1000), '']
+    lines.append('{:<56} {:>9} {:>9}'.format('module', 'self ms', 'cumul ms'))
+    for name, self_time, cumulative_time, depth in sorted(package_modules, key=lambda module: -module[2])[:top]:
+        lines.append('{:<56} {:>9.1f} {:>9.1f}'.format(
+            ('  ' * depth + name)[:56], self_time / 1000, cumulative_time / 1000
+        ))
+
+    lines.extend(['', '{:<20} {:>9}'.format('first query', 'ms')])
+    for kind, duration in first_queries:
+        lines.append('{:<20} {:>9.1f}'.format(kind, duration * 1000))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--repeat', type=int, default=5, help='interpreters started, the fastest import is kept')
+    arg_parser.add_argument('--top', type=int, default=15, help='modules listed')
+    arg_parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help='maximum import time in milliseconds')
+    args = arg_parser.parse_args(argv)
+
+    modules = min((measure_import() for _ in range(args.repeat)), key=package_import_time)
+    print(format_report(modules, measure_first_queries(), args.top))
+
+    status = 0
+    total = package_import_time(modules) / 1000
+    if total > args.budget:
+        print('\nImport time {:.1f} ms is over the {:.1f} ms budget.'.format(total, args.budget))
+        status = 1
+
+    imported = sorted({
+        name.split('.')[0] for name, _, _, _ in modules if name.split('.')[0] in DEFERRED_MODULES
+    })
+    if imported:
+        print('\nImported on import, instead of on first use: {}.'.format(', '.join(imported)))
+        status = 1
+
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+"""Time of getting the JSON of the ElasticSearch queries with ``parse_query_json``, against serializing ``parse_query``.
+
+Usage:
+    python benchmarks/json_output.py [--log PATH] [--repeat N]
+
+For the query log, reports the number of queries whose ``parse_query_json`` bytes differ from
+``json.dumps(parse_query(query), sort_keys=True).encode('utf-8')``, then the time per query of both, without cache and
+with a warm ``LocalQueryCache`` (i.e. every query is a hit). Exits with status 1 if a query differs.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import json
+import logging
+import os
+import sys
+import timeit
+
+from inspire_query_parser import parse_query, parse_query_json
+from inspire_query_parser.caching import LocalQueryCache, set_query_cache
+from stages import read_query_log
+
+DEFAULT_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'synthetic_query_log.jsonl')
+
+
+def dump_parse_query(query_str):
+    return json.dumps(parse_query(query_str), sort_keys=True).encode('utf-8')
+
+
+MODES = [('json.dumps', dump_parse_query), ('parse_query_json', parse_query_json)]
+
+
+def count_differences(queries):
+    return sum(dump_parse_query(query) != parse_query_json(query) for query in queries)
+
+
+def measure(queries, repeat):
+    """Returns, for each mode, the best time of translating the queries without cache and with a warm one."""
+    best = dict((name, [float('inf'), float('inf')]) for name, _ in MODES)
+    cache = LocalQueryCache(max_size=len(queries))
+    for _ in range(repeat):
+        for name, serialize in MODES:
+            for cached in (False, True):
+                set_query_cache(cache if cached else None)
+                try:
+                    if cached:
+                        for query in queries:
+                            serialize(query)
+                    start = timeit.default_timer()
+                    for query in queries:
+                        serialize(query)
+                    best[name][cached] = min(best[name][cached], timeit.default_timer() - start)
+                finally:
+                    set_query_cache(None)
+    return [(name, best[name][False], best[name][True]) for name, _ in MODES]
+
+
+def format_report(differences, rows, num_queries):
+    lines = [
+        '{} of {} queries serialized differently'.format(differences, num_queries),
+        '',
+        '{:<18} {:>14} {:>14}'.format('mode', 'no cache us', 'cache hit us'),
+    ]
+    for name, uncached, cached in rows:
+        lines.append('{:<18} {:>14.1f} {:>14.2f}'.format(
+            name, uncached / num_queries * 1e6, cached / num_queries * 1e6
+        ))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--log', default=DEFAULT_LOG, help='JSONL or plain text query log')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='timing runs, the best one is kept')
+    args = arg_parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    queries = read_query_log(args.log)
+    differences = count_differences(queries)
+    print(format_report(differences, measure(queries, args.repeat), len(queries)))
+    return 1 if differences else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
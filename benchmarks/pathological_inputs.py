@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+"""Worst-case latency report for families of adversarial queries.
+
+Usage:
+    python benchmarks/pathological_inputs.py [--max-size N] [--max-exponent 1.3] [--family NAME ...] [--strict]
+
+Every family generates queries of growing size. For each family and stage the time is fitted to ``c * length^k``
+(least squares on a log-log scale, ``length`` being the query length in characters) and the stages whose exponent ``k``
+exceeds ``--max-exponent`` are flagged as super-linear. With ``--strict`` the exit status is 1 if anything was flagged
+or if a family crashed (e.g. with a ``RecursionError``).
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+from collections import OrderedDict
+import logging
+import math
+import sys
+
+from stages import STAGES, translate_with_stage_timings
+
+_WORDS = (
+    'we study the production of heavy quarks in proton collisions at high energies using a lattice approach '
+    'and find that the cross section agrees with perturbative predictions within uncertainties'
+).split()
+
+
+def _words(count):
+    return ' '.join(_WORDS[i % len(_WORDS)] for i in range(count))
+
+
+FAMILIES = OrderedDict([
+    ('nested_parentheses', lambda n: '(' * n + 'title boson' + ')' * n),
+    ('or_keyword_queries', lambda n: ' or '.join('title foo{}'.format(i) for i in range(n))),
+    ('implicit_and_keyword_queries', lambda n: ' '.join('t foo{} a bar{}'.format(i, i) for i in range(n))),
+    ('or_simple_values', lambda n: 'a ' + ' or '.join('ellis{}'.format(i) for i in range(n))),
+    ('parenthesized_simple_values', lambda n: 'a (' + ' and not '.join('smith{}'.format(i) for i in range(n)) + ')'),
+    ('pasted_abstract', lambda n: _words(n * 8)),
+    ('unbalanced_single_quote', lambda n: "t 'foo " + _words(n * 4)),
+    ('unbalanced_double_quote', lambda n: 't "foo ' + _words(n * 4) + ' and a ellis'),
+    ('unterminated_regex', lambda n: 'a /^ellis ' + _words(n * 4)),
+    ('many_quoted_values', lambda n: ' '.join("t 'foo{}'".format(i) for i in range(n))),
+    ('nested_keywords', lambda n: 'citedby:' * n + 'author:ellis'),
+])
+"""Mapping from family name to a generator of a query of the given size."""
+
+
+def fit_exponent(points):
+    """Least squares fit of ``log(time) = k * log(length) + c``. Returns k, or None if it cannot be fitted."""
+    points = [(math.log(length), math.log(duration)) for length, duration in points if length > 0 and duration > 0]
+    if len(points) < 3:
+        return None
+
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if not variance:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+def measure_family(generator, sizes, repeat, time_limit):
+    """Times each stage for queries of the given sizes.
+
+    Returns:
+        (list, six.text_type): [(query length, {stage: seconds})] and the error that interrupted the measurements (e.g.
+        a ``RecursionError``), if any. Measurements also stop once a query takes more than ``time_limit`` seconds.
+    """
+    measurements = []
+    for size in sizes:
+        query_str = generator(size)
+        try:
+            runs = [translate_with_stage_timings(query_str)[0] for _ in range(repeat)]
+        except Exception as e:
+            return measurements, '{} at size {}'.format(type(e).__name__, size)
+
+        timings = {stage: min(run.get(stage, 0.0) for run in runs) for stage in STAGES}
+        timings['total'] = sum(timings.values())
+        measurements.append((len(query_str), timings))
+
+        if timings['total'] > time_limit:
+            return measurements, 'time limit exceeded at size {}'.format(size)
+    return measurements, None
+
+
+def build_report(families, sizes, repeat, time_limit, max_exponent):
+    report = OrderedDict()
+    for name, generator in families.items():
+        measurements, error = measure_family(generator, sizes, repeat, time_limit)
+        exponents = OrderedDict(
+            (stage, fit_exponent([(length, timings[stage]) for length, timings in measurements]))
+            for stage in STAGES + ('total',)
+        )
+        report[name] = {
+            'measurements': measurements,
+            'exponents': exponents,
+            'error': error,
+            'super_linear': [
+                stage for stage, exponent in exponents.items()
+                if stage != 'total' and exponent is not None and exponent > max_exponent
+            ],
+        }
+    return report
+
+
+def format_report(report, max_exponent):
+    lines = [
+        '{:<30}{:>10}{:>12}'.format('family', 'max len', 'worst (ms)')
+        + ''.join('{:>15}'.format('k ' + stage) for stage in STAGES) + '  notes'
+    ]
+    for name, family in report.items():
+        measurements = family['measurements']
+        max_length, worst = (measurements[-1][0], measurements[-1][1]['total'] * 1000) if measurements else (0, 0.0)
+        exponents = ''.join(
+            '{:>15}'.format('-' if family['exponents'][stage] is None else '{:.2f}'.format(family['exponents'][stage]))
+            for stage in STAGES
+        )
+        notes = []
+        if family['super_linear']:
+            notes.append('SUPER-LINEAR: ' + ', '.join(family['super_linear']))
+        if family['error']:
+            notes.append(family['error'])
+        lines.append('{:<30}{:>10}{:>12.3f}{}  {}'.format(name, max_length, worst, exponents, '; '.join(notes)))
+
+    lines.append('')
+    lines.append('k: fitted exponent of time ~ length^k, flagged when above {:.2f}.'.format(max_exponent))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--family', action='append', choices=list(FAMILIES), help='only run the given families')
+    arg_parser.add_argument('--max-size', type=int, default=256, help='largest size parameter (sizes double from 4)')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='runs per query, the best one is kept')
+    arg_parser.add_argument('--time-limit', type=float, default=5.0,
+                            help='stop growing a family once a query takes longer than this many seconds')
+    arg_parser.add_argument('--max-exponent', type=float, default=1.3, help='flag stages growing faster than this')
+    arg_parser.add_argument('--strict', action='store_true', help='exit with status 1 if anything was flagged')
+    args = arg_parser.parse_args(argv)
+
+    logging.getLogger('inspire_query_parser').setLevel(logging.CRITICAL)
+
+    sizes = []
+    size = 4
+    while size <= args.max_size:
+        sizes.append(size)
+        size *= 2
+
+    families = OrderedDict((name, FAMILIES[name]) for name in (args.family or FAMILIES))
+    report = build_report(families, sizes, args.repeat, args.time_limit, args.max_exponent)
+    print(format_report(report, args.max_exponent))
+
+    flagged = any(family['super_linear'] or family['error'] for family in report.values())
+    return 1 if args.strict and flagged else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+"""Replays a query log through the query parser and reports throughput, per-stage latencies and fallback rate.
+
+Usage:
+    python benchmarks/replay_query_log.py [LOG] [--mode {single,threads,processes}] [--workers N] [--repeat N]
+
+LOG is either a JSONL file with one ``{"query": ...}`` object per line or a plain text file with one query per line.
+It defaults to the bundled synthetic log, so that the benchmark runs offline.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+from collections import Counter
+import json
+import logging
+import os
+import resource
+import sys
+
+from inspire_query_parser.parsing_driver import warm_up
+from inspire_query_parser.stateful_pypeg_parser import InstrumentedStatefulParser, RuleStatistics
+from stages import STAGES, percentile, read_query_log, timer, translate_with_stage_timings
+
+DEFAULT_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'synthetic_query_log.jsonl')
+
+
+def _replay(queries, rule_statistics=None):
+    """Translates queries sequentially, returning a (stage timings, fallback reason) record per query.
+
+    If rule_statistics is given, the queries are parsed with an :class:`InstrumentedStatefulParser` recording into it.
+    """
+    parser = InstrumentedStatefulParser(rule_statistics) if rule_statistics is not None else None
+    return [translate_with_stage_timings(query_str, parser=parser) for query_str in queries]
+
+
+def _chunks(queries, count):
+    size = max(1, -(-len(queries) // count))
+    return [queries[i:i + size] for i in range(0, len(queries), size)]
+
+
+def run(queries, mode, workers):
+    """Replays queries in the given mode and returns the per-query records along with the wall clock time."""
+    start = timer()
+    if mode == 'single':
+        records = _replay(queries)
+    else:
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        executor_class = ThreadPoolExecutor if mode == 'threads' else ProcessPoolExecutor
+        with executor_class(max_workers=workers) as executor:
+            records = [
+                record
+                for chunk_records in executor.map(_replay, _chunks(queries, workers * 4))
+                for record in chunk_records
+            ]
+    return records, timer() - start
+
+
+def _peak_rss_in_kilobytes():
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    peak_rss = max(self_rss, children_rss)
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux.
+    return peak_rss // 1024 if sys.platform == 'darwin' else peak_rss
+
+
+def summarize(records, wall_time):
+    summary = {
+        'queries': len(records),
+        'wall_time_seconds': wall_time,
+        'throughput_qps': len(records) / wall_time if wall_time else 0.0,
+        'peak_rss_kb': _peak_rss_in_kilobytes(),
+        'latency_ms': {},
+    }
+
+    for stage in STAGES + ('total',):
+        durations = sorted(timings[stage] * 1000 for timings, _ in records if stage in timings)
+        summary['latency_ms'][stage] = {
+            'count': len(durations),
+            'p50': percentile(durations, 0.50),
+            'p95': percentile(durations, 0.95),
+            'p99': percentile(durations, 0.99),
+            'max': durations[-1] if durations else 0.0,
+        }
+
+    fallbacks = Counter(reason for _, reason in records if reason)
+    summary['fallback_rate'] = sum(fallbacks.values()) / len(records) if records else 0.0
+    summary['fallbacks'] = dict(fallbacks)
+    return summary
+
+
+def format_summary(summary, mode, workers):
+    lines = [
+        'Replayed {queries} queries in {wall_time_seconds:.2f}s'.format(**summary),
+        'Mode: {} ({} worker(s))'.format(mode, 1 if mode == 'single' else workers),
+        'Throughput: {throughput_qps:.1f} queries/s'.format(**summary),
+        'Peak RSS: {:.1f} MiB'.format(summary['peak_rss_kb'] / 1024),
+        '',
+        '{:<12}{:>8}{:>10}{:>10}{:>10}{:>10}'.format('stage (ms)', 'count', 'p50', 'p95', 'p99', 'max'),
+    ]
+    for stage, latencies in summary['latency_ms'].items():
+        lines.append('{:<12}{count:>8}{p50:>10.3f}{p95:>10.3f}{p99:>10.3f}{max:>10.3f}'.format(stage, **latencies))
+
+    lines.append('')
+    lines.append('Fallback rate: {:.2%}'.format(summary['fallback_rate']))
+    for reason, count in sorted(summary['fallbacks'].items()):
+        lines.append('  {}: {}'.format(reason, count))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('log', nargs='?', default=DEFAULT_LOG, help='JSONL or plain text query log')
+    arg_parser.add_argument('--mode', choices=('single', 'threads', 'processes'), default='single')
+    arg_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    arg_parser.add_argument('--repeat', type=int, default=1, help='replay the log this many times')
+    arg_parser.add_argument('--limit', type=int, help='only replay the first LIMIT queries of the log')
+    arg_parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    arg_parser.add_argument('--rule-stats', action='store_true',
+                            help='replay single-threaded with an instrumented parser and report per grammar rule '
+                                 'statistics (timings include the instrumentation overhead)')
+    args = arg_parser.parse_args(argv)
+
+    # Fallbacks are reported by the benchmark, there's no need for the parser's warnings.
+    logging.getLogger('inspire_query_parser').setLevel(logging.CRITICAL)
+
+    queries = read_query_log(args.log)[:args.limit] * args.repeat
+    # Imports the dependencies only needed by some kinds of queries (e.g. ``inspire_schemas`` for the journal ones),
+    # which would otherwise be timed with the first query of each kind. Done before forking the worker processes.
+    warm_up(freeze=False)
+    if args.rule_stats:
+        rule_statistics = RuleStatistics()
+        start = timer()
+        records = _replay(queries, rule_statistics)
+        summary = summarize(records, timer() - start)
+        summary['rules'] = rule_statistics.as_dict()
+        args.mode = 'single'
+    else:
+        records, wall_time = run(queries, args.mode, args.workers)
+        summary = summarize(records, wall_time)
+
+    if args.json:
+        print(json.dumps(summary, indent=2, sort_keys=True))
+    else:
+        print(format_summary(summary, args.mode, args.workers))
+        if args.rule_stats:
+            print('')
+            print(rule_statistics.format_table())
+
+
+if __name__ == '__main__':
+    main()
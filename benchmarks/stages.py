@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+"""Helpers shared by the benchmark scripts for timing the stages of a query translation."""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import json
+import threading
+import timeit
+
+from inspire_query_parser.hooks import (STAGE_ES, STAGE_PARSE, STAGE_RESTRUCTURE, ParseQueryHooks,
+                                        register_hooks)
+from inspire_query_parser.parsing_driver import parse_query
+
+STAGES = (STAGE_PARSE, STAGE_RESTRUCTURE, STAGE_ES)
+"""The stages compared by the benchmarks. The timings also have the ``decode`` and ``fallback`` stages, when they ran,
+and the ``total`` duration of ``parse_query``."""
+
+timer = timeit.default_timer
+
+
+class _LastTraceHooks(ParseQueryHooks):
+    """Keeps the trace of the last query translated by each thread."""
+
+    def __init__(self):
+        self._last_trace = threading.local()
+
+    def on_query(self, trace):
+        self._last_trace.trace = trace
+
+    @property
+    def last_trace(self):
+        return self._last_trace.trace
+
+
+_last_trace_hooks = None
+_last_trace_hooks_lock = threading.Lock()
+
+
+def _get_last_trace_hooks():
+    """Registers the hooks on first use only, so that the scripts importing this module for its other helpers don't
+    trace their queries."""
+    global _last_trace_hooks
+    with _last_trace_hooks_lock:
+        if _last_trace_hooks is None:
+            _last_trace_hooks = _LastTraceHooks()
+            register_hooks(_last_trace_hooks)
+    return _last_trace_hooks
+
+
+def translate_with_stage_timings(query_str, parser=None):
+    """Translates a query with ``parse_query``, collecting the durations of the stages it reports to its hooks.
+
+    Args:
+        query_str (six.text_type): The query to translate.
+        parser (StatefulParser): The parser given to ``parse_query`` (e.g. an ``InstrumentedStatefulParser``), by
+            default the driver's one.
+
+    Returns:
+        (dict, six.text_type): Seconds spent per stage (only for the stages that ran) along with the ``total`` of
+        ``parse_query``, and the fallback reason, which is None if the query was translated without falling back to a
+        match-all-fields query.
+    """
+    last_trace_hooks = _get_last_trace_hooks()
+    parse_query(query_str, parser=parser)
+
+    trace = last_trace_hooks.last_trace
+    timings = {event.stage: event.duration for event in trace.stages}
+    timings['total'] = trace.duration
+    return timings, trace.fallback_reason
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = int(round(fraction * (len(sorted_values) - 1)))
+    return sorted_values[rank]
+
+
+def read_query_log(path):
+    """Reads queries from a JSONL (one ``{"query": ...}`` object per line) or a plain text (one query per line) log."""
+    queries = []
+    with io.open(path, encoding='utf-8') as log:
+        for line in log:
+            line = line.rstrip('\n')
+            if not line.strip():
+                continue
+            if line.lstrip().startswith('{'):
+                record = json.loads(line)
+                queries.append(record.get('query', record.get('q', '')))
+            else:
+                queries.append(line)
+    return queries
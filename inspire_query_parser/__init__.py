@@ -25,4 +25,4 @@
 from __future__ import absolute_import, print_function
 
 from . import config  # noqa: F401
-from .parsing_driver import parse_query  # noqa: F401
+from .parsing_driver import parse_query, parse_query_json, warm_up  # noqa: F401
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+"""
+Precomputed, memory-mapped dictionary of author name variations.
+
+For a known author population, the name analysis of the author queries (see
+:func:`inspire_query_parser.utils.visitor_utils.generate_minimal_name_variations`) can be done offline. The dictionary
+is built from a names file, one name per line, optionally followed by a tab and comma-separated BAI candidates::
+
+    python -m inspire_query_parser.author_dictionary names.tsv authors.dict
+
+and enabled with::
+
+    set_author_dictionary(AuthorDictionary.open('authors.dict'))
+
+The file is a read-only hash table, which is memory-mapped rather than read: opening it only reads its header, and
+its pages are shared through the page cache by all the processes mapping it (including the workers forked from a
+process that opened it), instead of being copied into each of them.
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+from collections import namedtuple
+import io
+import mmap
+import struct
+import sys
+
+import six
+
+from inspire_query_parser.caching import bump_config_generation, stable_hash
+from inspire_query_parser.utils.visitor_utils import AuthorNameAnalysis
+
+_author_dictionary = None
+
+
+def set_author_dictionary(author_dictionary):
+    """Sets the dictionary consulted by the author queries.
+
+    Args:
+        author_dictionary (AuthorDictionary): The dictionary, or None for disabling it.
+    """
+    global _author_dictionary
+    _author_dictionary = author_dictionary
+    bump_config_generation()
+
+
+def get_author_dictionary():
+    """Returns the dictionary consulted by the author queries or None if there's none."""
+    return _author_dictionary
+
+
+def normalize_author_dictionary_key(author_name):
+    """Collapses the whitespace of author_name, which doesn't change its analysis.
+
+    Notes:
+        The case is kept, since ``ParsedName`` uses it, e.g. in ``Vures, John I`` the ``I`` is a middle name initial,
+        whereas in ``vures, john i`` the ``i`` is not.
+    """
+    return ' '.join(author_name.split())
+
+
+AuthorDictionaryEntry = namedtuple(
+    'AuthorDictionaryEntry', ['name', 'contains_fullnames', 'name_variations', 'bai_candidates']
+)
+"""The precomputed analysis of an author name.
+
+Attributes:
+    name (six.text_type): The normalized name.
+    contains_fullnames (bool): See :func:`inspire_query_parser.utils.visitor_utils.author_name_contains_fullnames`.
+    name_variations (tuple): The lowercased minimal name variations.
+    bai_candidates (tuple): The BAIs of the authors known by this name, as given in the names file.
+"""
+
+
+class AuthorDictionary(object):
+    """A read-only, open-addressing hash table of :class:`AuthorDictionaryEntry`, kept in a memory-mapped file.
+
+    Layout (little-endian):
+        - header: magic, format version, number of slots (a power of two), number of entries.
+        - slots: ``(key hash, record offset)`` pairs, linearly probed. An offset of 0 marks an empty slot.
+        - records: the record length, followed by the UTF-8 encoded fields, separated by newlines: the normalized
+          name, ``1`` or ``0`` for contains_fullnames, then the name variations and the BAI candidates, each
+          tab-separated.
+    """
+    MAGIC = b'IQPNAMES'
+    VERSION = 1
+    HEADER = struct.Struct('<8sIII')
+    """magic, format version, number of slots, number of entries."""
+    SLOT = struct.Struct('<QQ')
+    """key hash, record offset."""
+    RECORD_LENGTH = struct.Struct('<I')
+
+    def __init__(self, buf):
+        magic, version, num_slots, size = self.HEADER.unpack_from(buf, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError('Not an author dictionary (version {}).'.format(self.VERSION))
+
+        self._buf = buf
+        self._num_slots = num_slots
+        self._size = size
+
+    @classmethod
+    def open(cls, path):
+        """Memory-maps the dictionary at path. Only its header is read."""
+        with io.open(path, 'rb') as dictionary_file:
+            buf = mmap.mmap(dictionary_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buf)
+
+    @classmethod
+    def build(cls, names, path):
+        """Analyzes names and writes their dictionary to path.
+
+        Args:
+            names (iterable): Author names, or ``(author name, BAI candidates)`` pairs.
+            path (str): Where to write the dictionary.
+
+        Returns:
+            int: The number of entries written. Names which can't be analyzed (e.g. empty ones) are skipped, while
+            the BAI candidates of duplicate names are merged.
+        """
+        entries = {}
+        for name in names:
+            bai_candidates = ()
+            if not isinstance(name, six.string_types):
+                name, bai_candidates = name
+
+            key = normalize_author_dictionary_key(name)
+            if not key:
+                continue
+
+            if key in entries:
+                entry = entries[key]
+                merged_bai_candidates = entry.bai_candidates + tuple(
+                    bai for bai in bai_candidates if bai not in entry.bai_candidates
+                )
+                entries[key] = entry._replace(bai_candidates=merged_bai_candidates)
+                continue
+
+            analysis = AuthorNameAnalysis(key)
+            try:
+                name_variations = tuple(name_variation.lower() for name_variation in analysis.minimal_name_variations)
+            except ValueError:
+                continue
+            entries[key] = AuthorDictionaryEntry(key, analysis.contains_fullnames, name_variations,
+                                                 tuple(bai_candidates))
+
+        num_slots = 1
+        while num_slots < 2 * len(entries):
+            num_slots *= 2
+
+        slots = [None] * num_slots
+        records = []
+        offset = cls.HEADER.size + num_slots * cls.SLOT.size
+        for key in sorted(entries):
+            record = cls._encode_record(entries[key])
+            key_hash = stable_hash(key)
+            index = key_hash & (num_slots - 1)
+            while slots[index] is not None:
+                index = (index + 1) & (num_slots - 1)
+            slots[index] = (key_hash, offset)
+            records.append(record)
+            offset += len(record)
+
+        with io.open(path, 'wb') as dictionary_file:
+            dictionary_file.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, num_slots, len(entries)))
+            for slot in slots:
+                dictionary_file.write(cls.SLOT.pack(*slot) if slot else cls.SLOT.pack(0, 0))
+            for record in records:
+                dictionary_file.write(record)
+
+        return len(entries)
+
+    @classmethod
+    def _encode_record(cls, entry):
+        payload = '\n'.join((
+            entry.name,
+            '1' if entry.contains_fullnames else '0',
+            '\t'.join(entry.name_variations),
+            '\t'.join(entry.bai_candidates),
+        )).encode('utf-8')
+        return cls.RECORD_LENGTH.pack(len(payload)) + payload
+
+    def _decode_record(self, offset):
+        length = self.RECORD_LENGTH.unpack_from(self._buf, offset)[0]
+        start = offset + self.RECORD_LENGTH.size
+        name, contains_fullnames, name_variations, bai_candidates = \
+            self._buf[start:start + length].decode('utf-8').split('\n')
+        return AuthorDictionaryEntry(
+            name,
+            contains_fullnames == '1',
+            tuple(name_variations.split('\t')) if name_variations else (),
+            tuple(bai_candidates.split('\t')) if bai_candidates else (),
+        )
+
+    def get(self, author_name):
+        """Returns the :class:`AuthorDictionaryEntry` of author_name, or None if it's not in the dictionary."""
+        if not self._size:
+            return None
+
+        key = normalize_author_dictionary_key(author_name)
+        key_hash = stable_hash(key)
+        mask = self._num_slots - 1
+        index = key_hash & mask
+        slot = self.SLOT
+        slots_offset = self.HEADER.size
+
+        while True:
+            slot_key_hash, offset = slot.unpack_from(self._buf, slots_offset + index * slot.size)
+            if not offset:
+                return None
+            if slot_key_hash == key_hash:
+                entry = self._decode_record(offset)
+                if entry.name == key:
+                    return entry
+            index = (index + 1) & mask
+
+    def __len__(self):
+        return self._size
+
+    def close(self):
+        self._buf.close()
+
+
+def _read_names_file(names_file):
+    for line in names_file:
+        name, _, bai_candidates = line.rstrip('\r\n').partition('\t')
+        yield name, tuple(bai for bai in (bai.strip() for bai in bai_candidates.split(',')) if bai)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='python -m inspire_query_parser.author_dictionary',
+        description='Builds a precomputed author name variations dictionary.',
+    )
+    parser.add_argument('names', help='UTF-8 names file, one name per line, optionally followed by a tab and '
+                                      'comma-separated BAI candidates.')
+    parser.add_argument('output', help='Where to write the dictionary.')
+    args = parser.parse_args(argv)
+
+    with io.open(args.names, encoding='utf-8') as names_file:
+        count = AuthorDictionary.build(_read_names_file(names_file), args.output)
+
+    print('Wrote {} names to {}.'.format(count, args.output))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
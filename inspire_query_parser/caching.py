@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+"""
+Translation cache backends for :func:`inspire_query_parser.parsing_driver.parse_query`, along with the generic
+:class:`LRUCache` they build on.
+
+The cache maps query strings to their serialized (JSON) ElasticSearch query. Two backends are provided:
+    - :class:`LocalQueryCache`, an in-process LRU cache.
+    - :class:`SharedMemoryQueryCache`, a fixed-size hash table living in ``multiprocessing.shared_memory``, which is
+      shared by all the worker processes forked from the process that created it.
+
+Caching is disabled by default. Enable it with :func:`set_query_cache`.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+from collections import OrderedDict
+import hashlib
+import struct
+import threading
+import time
+
+import six
+
+
+_query_cache = None
+
+_config_generation = 0
+
+
+def set_query_cache(cache):
+    """Sets the cache backend used by ``parse_query``.
+
+    Args:
+        cache (QueryCache): The cache backend, or None for disabling caching.
+    """
+    global _query_cache
+    _query_cache = cache
+
+
+def get_query_cache():
+    """Returns the cache backend used by ``parse_query`` or None if caching is disabled."""
+    return _query_cache
+
+
+def bump_config_generation():
+    """Marks the cached translations as stale, since a setting changing the translations (e.g. the author dictionary or
+    a keyword handler) was changed.
+
+    The generation is part of the cache keys of ``parse_query``, thus the translations cached before aren't looked up
+    anymore (and get evicted in time).
+
+    Notes:
+        The generation is per process, thus the workers sharing a :class:`SharedMemoryQueryCache` should apply the same
+        settings in the same order (usually, by applying them in the master process, before forking them).
+    """
+    global _config_generation
+    _config_generation += 1
+
+
+def get_config_generation():
+    """Returns the number of times the settings changing the translations were changed."""
+    return _config_generation
+
+
+def stable_hash(text):
+    """Hashes text to a 64-bit integer which is identical across processes (unlike the builtin ``hash``)."""
+    if isinstance(text, six.text_type):
+        text = text.encode('utf-8')
+    return struct.unpack('<Q', hashlib.sha1(text).digest()[:8])[0]
+
+
+class QueryCache(object):
+    """Interface of the translation cache backends.
+
+    Keys are query strings and values are serialized ElasticSearch queries, both of type ``six.text_type``.
+    """
+
+    def get(self, key):
+        """Returns the cached value for key, or None on a miss."""
+        raise NotImplementedError()
+
+    def set(self, key, value):
+        """Stores value under key, possibly evicting another entry."""
+        raise NotImplementedError()
+
+    def clear(self):
+        """Drops all entries."""
+        raise NotImplementedError()
+
+
+class LRUCache(object):
+    """A thread-safe, in-process, least recently used cache of at most ``max_size`` entries."""
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._entries.pop(key)
+            except KeyError:
+                return None
+            self._entries[key] = value
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = value
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class LocalQueryCache(LRUCache, QueryCache):
+    """In-process LRU cache, private to each worker process."""
+
+
+class SharedMemoryQueryCache(QueryCache):
+    """A set-associative hash table of serialized queries, kept in shared memory.
+
+    The table is split into ``num_buckets`` buckets of ``ways`` fixed-size slots each. A key can only live in the
+    bucket its hash points to, so memory usage is bounded and, once a bucket is full, the entry written longest ago is
+    evicted.
+
+    Each slot is guarded by a sequence number (seqlock): writers make it odd while writing and even again when done,
+    so readers never take a lock, they only retry-as-miss if the sequence number changed under them. Writers of the
+    same bucket are serialized by one of ``lock_stripes`` process-shared locks.
+
+    Notes:
+        The locks are inherited through ``fork``, thus the cache must be created (with :meth:`create`) in the master
+        process before forking the workers. Values that don't fit in a slot are not cached.
+    """
+    MAGIC = b'IQPCACHE'
+    HEADER = struct.Struct('<8sIII')
+    """magic, number of buckets, ways, slot size."""
+    HEADER_SIZE = 64
+
+    SLOT_HEADER = struct.Struct('<IIQQ')
+    """sequence number, payload length, key hash, write timestamp (microseconds)."""
+    SEQUENCE_MASK = 0xFFFFFFFF
+    """The sequence numbers wrap around to 0 past the largest uint32, keeping their parity, since it's even."""
+    KEY_LENGTH = struct.Struct('<I')
+
+    def __init__(self, shm, num_buckets, ways, slot_size, locks):
+        self._shm = shm
+        self._buf = shm.buf
+        self.num_buckets = num_buckets
+        self.ways = ways
+        self.slot_size = slot_size
+        self._locks = locks
+
+    @classmethod
+    def create(cls, name=None, num_buckets=8192, ways=4, slot_size=2048, lock_stripes=64):
+        """Allocates and initializes a new shared memory cache.
+
+        Args:
+            name (str): Name of the shared memory block, or None for a random one.
+            num_buckets (int): Number of hash buckets.
+            ways (int): Number of slots per bucket.
+            slot_size (int): Size in bytes of each slot, including its header.
+            lock_stripes (int): Number of process-shared locks used for serializing writers.
+
+        Returns:
+            SharedMemoryQueryCache: The cache, whose total size is ``num_buckets * ways * slot_size`` bytes (plus a
+            small header).
+        """
+        import multiprocessing
+
+        try:
+            from multiprocessing import shared_memory
+        except ImportError:  # Python < 3.8
+            raise RuntimeError('SharedMemoryQueryCache requires Python 3.8 or later.')
+
+        if slot_size <= cls.SLOT_HEADER.size + cls.KEY_LENGTH.size:
+            raise ValueError('Slot size {} is too small.'.format(slot_size))
+
+        size = cls.HEADER_SIZE + num_buckets * ways * slot_size
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        cls.HEADER.pack_into(shm.buf, 0, cls.MAGIC, num_buckets, ways, slot_size)
+
+        locks = [multiprocessing.Lock() for _ in range(lock_stripes)]
+        return cls(shm, num_buckets, ways, slot_size, locks)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def _slot_offset(self, bucket, way):
+        return self.HEADER_SIZE + (bucket * self.ways + way) * self.slot_size
+
+    def _read_slot(self, offset, key_hash, key):
+        slot_header = self.SLOT_HEADER
+        sequence, length, slot_key_hash, _ = slot_header.unpack_from(self._buf, offset)
+        if sequence & 1 or not length or slot_key_hash != key_hash:
+            return None
+
+        payload_offset = offset + slot_header.size
+        payload = bytes(self._buf[payload_offset:payload_offset + length])
+
+        if slot_header.unpack_from(self._buf, offset)[0] != sequence:
+            return None  # Concurrent write, consider it a miss.
+
+        key_length = self.KEY_LENGTH.unpack_from(payload)[0]
+        key_end = self.KEY_LENGTH.size + key_length
+        if payload[self.KEY_LENGTH.size:key_end] != key:
+            return None
+
+        return payload[key_end:].decode('utf-8')
+
+    def get(self, key):
+        key = key.encode('utf-8')
+        key_hash = stable_hash(key)
+        bucket = key_hash % self.num_buckets
+
+        for way in range(self.ways):
+            value = self._read_slot(self._slot_offset(bucket, way), key_hash, key)
+            if value is not None:
+                return value
+
+        return None
+
+    def set(self, key, value):
+        key = key.encode('utf-8')
+        payload = self.KEY_LENGTH.pack(len(key)) + key + value.encode('utf-8')
+        if len(payload) > self.slot_size - self.SLOT_HEADER.size:
+            return
+
+        key_hash = stable_hash(key)
+        bucket = key_hash % self.num_buckets
+        slot_header = self.SLOT_HEADER
+
+        with self._locks[bucket % len(self._locks)]:
+            victim_offset, victim_stamp = None, None
+            for way in range(self.ways):
+                offset = self._slot_offset(bucket, way)
+                _, length, slot_key_hash, stamp = slot_header.unpack_from(self._buf, offset)
+                if length and slot_key_hash == key_hash:
+                    victim_offset = offset
+                    break
+                if victim_offset is None or stamp < victim_stamp:
+                    victim_offset, victim_stamp = offset, stamp
+
+            sequence = slot_header.unpack_from(self._buf, victim_offset)[0]
+            slot_header.pack_into(self._buf, victim_offset, (sequence + 1) & self.SEQUENCE_MASK, 0, 0, 0)
+
+            payload_offset = victim_offset + slot_header.size
+            self._buf[payload_offset:payload_offset + len(payload)] = payload
+            slot_header.pack_into(
+                self._buf, victim_offset, (sequence + 2) & self.SEQUENCE_MASK, len(payload), key_hash,
+                int(time.time() * 1e6)
+            )
+
+    def clear(self):
+        slot_header = self.SLOT_HEADER
+        for bucket in range(self.num_buckets):
+            with self._locks[bucket % len(self._locks)]:
+                for way in range(self.ways):
+                    offset = self._slot_offset(bucket, way)
+                    sequence = slot_header.unpack_from(self._buf, offset)[0]
+                    slot_header.pack_into(
+                        self._buf, offset, (sequence + 2 - (sequence & 1)) & self.SEQUENCE_MASK, 0, 0, 0
+                    )
+
+    def close(self):
+        """Detaches this process from the shared memory block."""
+        self._buf = None
+        self._shm.close()
+
+    def unlink(self):
+        """Destroys the shared memory block. Should be called once, by the process that created it."""
+        self._shm.unlink()
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+"""
+Stage-level hooks for tracing and timing :func:`inspire_query_parser.parsing_driver.parse_query`.
+
+A translation goes through the following stages, each one reported to the registered hooks as a :class:`StageEvent`:
+    - ``decode``: decoding the query to text.
+    - ``parse``: parsing the query to a parse tree.
+    - ``restructure``: converting the parse tree to the AST, with the :class:`RestructuringVisitor`.
+    - ``es``: generating the ElasticSearch query from the AST, with the :class:`ElasticSearchVisitor`.
+    - ``fallback``: generating the match-all-fields query, when one of the above failed.
+
+Once the translation is done, the hooks receive the whole :class:`QueryTrace`.
+
+No timing or tree walking happens unless at least one hook has been registered with :func:`register_hooks`.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import logging
+import timeit
+
+from inspire_query_parser.ast import BinaryOp, ListOp, UnaryOp
+
+logger = logging.getLogger(__name__)
+
+STAGE_DECODE = 'decode'
+STAGE_PARSE = 'parse'
+STAGE_RESTRUCTURE = 'restructure'
+STAGE_ES = 'es'
+STAGE_FALLBACK = 'fallback'
+
+FALLBACK_UNRECOGNIZED_TEXT = 'unrecognized_text'
+FALLBACK_SYNTAX_ERROR = 'syntax_error'
+FALLBACK_RESTRUCTURING_VISITOR_CRASH = 'restructuring_visitor_crash'
+FALLBACK_ELASTIC_SEARCH_VISITOR_CRASH = 'elastic_search_visitor_crash'
+FALLBACK_EMPTY_ES_QUERY = 'empty_es_query'
+
+timer = timeit.default_timer
+
+_hooks = ()
+
+
+def register_hooks(hooks):
+    """Registers a :class:`ParseQueryHooks` instance, to be called by every subsequent ``parse_query`` call."""
+    global _hooks
+    if hooks not in _hooks:
+        _hooks = _hooks + (hooks,)
+
+
+def unregister_hooks(hooks):
+    """Unregisters a previously registered :class:`ParseQueryHooks` instance. Unknown hooks are ignored."""
+    global _hooks
+    _hooks = tuple(registered for registered in _hooks if registered is not hooks)
+
+
+def get_hooks():
+    """Returns a tuple of the registered hooks, in registration order."""
+    return _hooks
+
+
+def count_tree_nodes(tree):
+    """Counts the AST (or parse tree) nodes of tree, iteratively, so that deep trees don't hit the recursion limit."""
+    count = 0
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, BinaryOp):
+            stack.append(node.left)
+            stack.append(node.right)
+        elif isinstance(node, UnaryOp):
+            stack.append(node.op)
+        elif isinstance(node, ListOp):
+            if isinstance(node.children, (list, tuple)):
+                stack.extend(node.children)
+            else:
+                stack.append(node.children)
+        elif not hasattr(node, 'accept'):
+            continue  # Plain values (text, None, etc.) aren't nodes.
+        count += 1
+    return count
+
+
+class ParseQueryHooks(object):
+    """No-op base class for ``parse_query`` hooks. Override the methods of interest.
+
+    Hooks are called synchronously, from the thread running ``parse_query``, so they should be cheap. Exceptions raised
+    by them are logged and otherwise ignored, so that searching never fails because of a hook.
+
+    Attributes:
+        counts_rule_attempts (bool): If True, queries are parsed with a parser counting its grammar rule attempts, which
+            are then available in :attr:`QueryTrace.rule_attempts`. This slows the parsing down a bit.
+    """
+    counts_rule_attempts = False
+
+    def on_stage(self, trace, event):
+        """Called when a stage of the translation finishes.
+
+        Args:
+            trace (QueryTrace): The trace of the query being translated (not finished yet).
+            event (StageEvent): The stage that just finished.
+        """
+
+    def on_query(self, trace):
+        """Called when the translation of a query finishes, either normally or through the fallback.
+
+        Args:
+            trace (QueryTrace): The trace of the translated query.
+        """
+
+
+class StageEvent(object):
+    """A finished stage of a translation.
+
+    Attributes:
+        stage (six.text_type): One of the ``STAGE_*`` constants.
+        duration (float): Time spent in the stage, in seconds.
+        input_size (int): Size of the stage's input: characters of the query for the ``decode``, ``parse`` and
+            ``fallback`` stages and number of nodes of the input tree for the ``restructure`` and ``es`` stages.
+        node_count (int): Number of nodes of the tree the stage produced, for ``parse`` and ``restructure``, else None.
+        fallback_reason (six.text_type): One of the ``FALLBACK_*`` constants if the stage failed or, for the
+            ``fallback`` stage, the reason the fallback happened. Otherwise None.
+    """
+    __slots__ = ('stage', 'duration', 'input_size', 'node_count', 'fallback_reason')
+
+    def __init__(self, stage, duration, input_size=None, node_count=None, fallback_reason=None):
+        self.stage = stage
+        self.duration = duration
+        self.input_size = input_size
+        self.node_count = node_count
+        self.fallback_reason = fallback_reason
+
+    def __repr__(self):
+        return '%s(%r, %r, input_size=%r, node_count=%r, fallback_reason=%r)' % (
+            self.__class__.__name__, self.stage, self.duration, self.input_size, self.node_count, self.fallback_reason
+        )
+
+
+class QueryTrace(object):
+    """Collects the :class:`StageEvent` of a ``parse_query`` call and forwards them to the hooks.
+
+    Attributes:
+        query_str (six.text_type): The (decoded) query. None until the ``decode`` stage is done.
+        stages (list): The :class:`StageEvent` of the finished stages, in order.
+        fallback_reason (six.text_type): Why the query fell back to a match-all-fields query, or None.
+        cache_hit (bool): Whether the translation came from the query cache, None if caching is disabled.
+        rule_attempts (int): How many grammar rules the parser attempted, if one of the hooks has
+            :attr:`ParseQueryHooks.counts_rule_attempts` set, otherwise None.
+        duration (float): Total time spent in ``parse_query``, in seconds. None until the trace is finished.
+    """
+
+    def __init__(self, hooks):
+        self.query_str = None
+        self.stages = []
+        self.fallback_reason = None
+        self.cache_hit = None
+        self.rule_attempts = 0 if any(registered.counts_rule_attempts for registered in hooks) else None
+        self.duration = None
+        self._hooks = hooks
+        self._start = timer()
+
+    def record_stage(self, stage, start, input_size=None, node_count=None, fallback_reason=None, end=None):
+        """Records a stage that started at ``start`` (a :data:`timer` value) and finished at ``end``, by default just
+        now.
+
+        Passing ``end`` keeps the work done for the event itself (e.g. counting the nodes of the output tree) out of
+        the stage duration.
+        """
+        event = StageEvent(stage, (timer() if end is None else end) - start, input_size, node_count, fallback_reason)
+        self.stages.append(event)
+        for hooks in self._hooks:
+            try:
+                hooks.on_stage(self, event)
+            except Exception:
+                logger.exception('Hook ' + repr(hooks) + ' crashed on stage "' + stage + '".')
+
+    def finish(self):
+        self.duration = timer() - self._start
+        for hooks in self._hooks:
+            try:
+                hooks.on_query(self)
+            except Exception:
+                logger.exception('Hook ' + repr(hooks) + ' crashed on query.')
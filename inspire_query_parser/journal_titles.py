@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+"""
+Precomputed conversions of journal titles and volumes, for journal queries.
+
+Journal queries (e.g. ``j Phys.Rev,D85,1``) convert their title and volume from the old publication info format to the
+new one (``Phys.Rev.D`` and ``85``) with ``inspire_schemas.utils.convert_old_publication_info_to_new``. For the hot
+journals, the conversions can be precomputed in a JSON table, built from a file of journal query values, one per
+line::
+
+    python -m inspire_query_parser.journal_titles journal_query_values.txt journal_titles.json
+
+and enabled with::
+
+    set_journal_title_table(JournalTitleTable('journal_titles.json'))
+
+The table is only read by the first journal query.
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import io
+import json
+import sys
+import threading
+
+import six
+
+from inspire_query_parser.caching import bump_config_generation
+
+JOURNAL_TITLE = 'journal_title'
+JOURNAL_VOLUME = 'journal_volume'
+
+_journal_title_table = None
+
+
+def set_journal_title_table(journal_title_table):
+    """Sets the table consulted by the journal queries.
+
+    Args:
+        journal_title_table (JournalTitleTable): The table, or None for disabling it.
+    """
+    global _journal_title_table
+    _journal_title_table = journal_title_table
+    bump_config_generation()
+
+
+def get_journal_title_table():
+    """Returns the table consulted by the journal queries or None if there's none."""
+    return _journal_title_table
+
+
+def split_journal_query_value(journal_query_value):
+    """Splits a journal query value on commas, e.g. ``Phys.Rev,D85,1`` to ``['Phys.Rev', 'D85', '1']``."""
+    return [value.strip() for value in journal_query_value.split(',') if value]
+
+
+class JournalTitleTable(object):
+    """A mapping from old (journal title, journal volume) to their new publication info fields, kept in a JSON file.
+
+    The file is a JSON object from journal title to an object from journal volume (empty for no volume) to the
+    converted ``journal_title``, ``journal_volume`` and possibly ``year``.
+
+    Args:
+        path (str): The JSON file, which is read on the first :meth:`convert` call.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._table = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._table is None:
+                with io.open(self.path, encoding='utf-8') as table_file:
+                    self._table = json.load(table_file)
+        return self._table
+
+    def convert(self, old_publication_info):
+        """Converts old_publication_info like ``convert_old_publication_info_to_new``, if its title and volume are in
+        the table.
+
+        Returns:
+            dict: The new publication info or None if it's not in the table.
+        """
+        table = self._table if self._table is not None else self._load()
+        try:
+            converted_fields = table[old_publication_info[JOURNAL_TITLE]][
+                old_publication_info.get(JOURNAL_VOLUME, '')
+            ]
+        except KeyError:
+            return None
+
+        new_publication_info = dict(old_publication_info)
+        new_publication_info.update(converted_fields)
+        return new_publication_info
+
+    @staticmethod
+    def build(journal_query_values, path):
+        """Converts the titles and volumes of journal_query_values and writes their table to path.
+
+        Args:
+            journal_query_values (iterable): Journal query values, e.g. ``Phys.Rev,D85``. Their third part (page or
+                article id) is ignored, since it's not affected by the conversion.
+            path (str): Where to write the table.
+
+        Returns:
+            int: The number of distinct titles and volumes written.
+        """
+        from inspire_schemas.utils import convert_old_publication_info_to_new
+
+        table = {}
+        count = 0
+        for journal_query_value in journal_query_values:
+            values = split_journal_query_value(journal_query_value)
+            old_publication_info = {
+                key: value for key, value in zip((JOURNAL_TITLE, JOURNAL_VOLUME), values) if value
+            }
+            if JOURNAL_TITLE not in old_publication_info:
+                continue
+
+            volumes = table.setdefault(old_publication_info[JOURNAL_TITLE], {})
+            volume = old_publication_info.get(JOURNAL_VOLUME, '')
+            if volume not in volumes:
+                volumes[volume] = convert_old_publication_info_to_new([old_publication_info])[0]
+                count += 1
+
+        with io.open(path, 'w', encoding='utf-8') as table_file:
+            table_file.write(six.text_type(json.dumps(table, ensure_ascii=False, indent=1, sort_keys=True)))
+
+        return count
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='python -m inspire_query_parser.journal_titles',
+        description='Builds a precomputed journal title conversions table.',
+    )
+    parser.add_argument('journal_query_values', help='UTF-8 file of journal query values (e.g. "Phys.Rev,D85"), '
+                                                     'one per line.')
+    parser.add_argument('output', help='Where to write the table.')
+    args = parser.parse_args(argv)
+
+    with io.open(args.journal_query_values, encoding='utf-8') as journal_query_values_file:
+        count = JournalTitleTable.build(
+            (line.strip() for line in journal_query_values_file if line.strip()), args.output
+        )
+
+    print('Wrote {} journal titles and volumes to {}.'.format(count, args.output))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+"""
+In-process metrics of :func:`inspire_query_parser.parsing_driver.parse_query`.
+
+:class:`MetricsRegistry` is a :class:`inspire_query_parser.hooks.ParseQueryHooks` keeping latency histograms per stage,
+counters per fallback reason and cache hit/miss counters::
+
+    registry = MetricsRegistry()
+    register_hooks(registry)
+    ...
+    registry.snapshot()  # To be exported by e.g. a Prometheus collector or a statsd pusher.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+from bisect import bisect_left
+import threading
+
+from inspire_query_parser.hooks import (
+    FALLBACK_ELASTIC_SEARCH_VISITOR_CRASH, FALLBACK_EMPTY_ES_QUERY, FALLBACK_RESTRUCTURING_VISITOR_CRASH,
+    FALLBACK_SYNTAX_ERROR, FALLBACK_UNRECOGNIZED_TEXT, STAGE_DECODE, STAGE_ES, STAGE_FALLBACK, STAGE_PARSE,
+    STAGE_RESTRUCTURE, ParseQueryHooks)
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+"""Upper bounds (in seconds, inclusive) of the latency histogram buckets. An implicit ``+Inf`` bucket follows."""
+
+STAGE_TOTAL = 'total'
+"""Pseudo-stage of the latency histogram of the whole ``parse_query`` call."""
+
+STAGES = (STAGE_DECODE, STAGE_PARSE, STAGE_RESTRUCTURE, STAGE_ES, STAGE_FALLBACK, STAGE_TOTAL)
+
+FALLBACK_REASONS = (
+    FALLBACK_UNRECOGNIZED_TEXT,
+    FALLBACK_SYNTAX_ERROR,
+    FALLBACK_RESTRUCTURING_VISITOR_CRASH,
+    FALLBACK_ELASTIC_SEARCH_VISITOR_CRASH,
+    FALLBACK_EMPTY_ES_QUERY,
+)
+
+
+class _Shard(object):
+    """The metrics recorded by a single thread. Only that thread ever writes to it."""
+
+    def __init__(self, bucket_count):
+        self.bucket_counts = {stage: [0] * bucket_count for stage in STAGES}
+        self.latency_sums = dict.fromkeys(STAGES, 0.0)
+        self.fallbacks = dict.fromkeys(FALLBACK_REASONS, 0)
+        self.queries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+class MetricsRegistry(ParseQueryHooks):
+    """Latency histograms and counters of ``parse_query``, fed by the hooks API.
+
+    Each thread records into its own shard, so the hot path takes no lock and never contends with other threads or
+    with :meth:`snapshot`, which sums up the shards. A snapshot taken while queries are being recorded might thus miss
+    the latest few updates, but every counter it reports is monotonic.
+
+    Args:
+        latency_buckets (tuple): Sorted upper bounds of the latency histogram buckets, in seconds.
+    """
+
+    def __init__(self, latency_buckets=DEFAULT_LATENCY_BUCKETS):
+        self.latency_buckets = tuple(latency_buckets)
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+
+    def _get_shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = _Shard(len(self.latency_buckets) + 1)
+            with self._shards_lock:  # Once per thread.
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def observe_latency(self, stage, duration):
+        """Records duration (in seconds) in the histogram of stage."""
+        shard = self._get_shard()
+        shard.bucket_counts[stage][bisect_left(self.latency_buckets, duration)] += 1
+        shard.latency_sums[stage] += duration
+
+    def on_stage(self, trace, event):
+        self.observe_latency(event.stage, event.duration)
+
+    def on_query(self, trace):
+        shard = self._get_shard()
+        shard.queries += 1
+        if trace.fallback_reason:
+            shard.fallbacks[trace.fallback_reason] += 1
+        if trace.cache_hit is True:
+            shard.cache_hits += 1
+        elif trace.cache_hit is False:
+            shard.cache_misses += 1
+        self.observe_latency(STAGE_TOTAL, trace.duration)
+
+    def snapshot(self):
+        """Returns the current values of all the metrics.
+
+        Returns:
+            dict: With the following keys:
+                - ``queries``: number of ``parse_query`` calls.
+                - ``fallbacks``: a dict from fallback reason to number of queries that fell back for it.
+                - ``cache_hits`` and ``cache_misses``: query cache lookups (zero if caching is disabled).
+                - ``latency``: a dict from stage (and ``total``) to its histogram, itself a dict with ``buckets``, a
+                  list of ``(upper bound, cumulative count)`` pairs ending with ``float('inf')`` (as Prometheus
+                  expects), ``count`` and ``sum`` (in seconds).
+        """
+        with self._shards_lock:
+            shards = list(self._shards)
+
+        upper_bounds = self.latency_buckets + (float('inf'),)
+        latency = {}
+        for stage in STAGES:
+            counts = [0] * len(upper_bounds)
+            latency_sum = 0.0
+            for shard in shards:
+                for index, count in enumerate(shard.bucket_counts[stage]):
+                    counts[index] += count
+                latency_sum += shard.latency_sums[stage]
+
+            cumulative_counts = []
+            cumulative_count = 0
+            for count in counts:
+                cumulative_count += count
+                cumulative_counts.append(cumulative_count)
+
+            latency[stage] = {
+                'buckets': list(zip(upper_bounds, cumulative_counts)),
+                'count': cumulative_count,
+                'sum': latency_sum,
+            }
+
+        return {
+            'queries': sum(shard.queries for shard in shards),
+            'fallbacks': {reason: sum(shard.fallbacks[reason] for shard in shards) for reason in FALLBACK_REASONS},
+            'cache_hits': sum(shard.cache_hits for shard in shards),
+            'cache_misses': sum(shard.cache_misses for shard in shards),
+            'latency': latency,
+        }
+
+    def reset(self):
+        """Drops all the recorded metrics. Not meant to be called while queries are being recorded."""
+        with self._shards_lock:
+            self._shards = []
+            self._local = threading.local()
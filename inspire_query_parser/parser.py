@@ -44,16 +44,17 @@ class CaseInsensitiveKeyword(Keyword):
     All subtypes must declare a grammar attribute with an Enum of accepted keywords/literals.
     """
     def __init__(self, keyword):
-        """Adds lowercase keyword to the keyword table."""
+        """Lowercases keyword.
+
+        Unlike ``Keyword``, it doesn't add keyword to the (global) ``Keyword.table``, since instances are also created
+        while parsing, possibly by many threads at once. The keywords of the grammar are in :data:`DSL_KEYWORDS`.
+        """
         try:
             self.grammar
         except AttributeError:
             raise GrammarValueError(self.__class__.__name__ + " expects a grammar attribute (Enum).")
 
-        keyword = keyword.lower()
-        if keyword not in Keyword.table:
-            Keyword.table[keyword] = self
-        self.name = keyword
+        self.name = keyword.lower()
 
     @classmethod
     def parse(cls, parser, text, pos):
@@ -163,7 +164,7 @@ class ListRule(ast.ListOp):
 # #### Keywords ####
 class And(CIKeyword):
     """
-    The reason for defining an Enum grammar of Keywords is for populating the Keyword.table for checking whether
+    The reason for defining an Enum grammar of Keywords is for populating DSL_KEYWORDS for checking whether
     terminal symbols are actually DSL keywords.
     """
     regex = re.compile(r"(and|\+|&)", re.IGNORECASE)
@@ -176,7 +177,7 @@ class And(CIKeyword):
 
 class Or(CIKeyword):
     """
-    The reason for defining an Enum grammar of Keywords is for populating the Keyword.table for checking whether
+    The reason for defining an Enum grammar of Keywords is for populating DSL_KEYWORDS for checking whether
     terminal symbols are actually DSL keywords.
     """
     regex = re.compile(r"(or|\|)", re.IGNORECASE)
@@ -189,11 +190,17 @@ class Or(CIKeyword):
 
 class Not(CIKeyword):
     """
-    The reason for defining an Enum grammar of Keywords is for populating the Keyword.table for checking whether
+    The reason for defining an Enum grammar of Keywords is for populating DSL_KEYWORDS for checking whether
     terminal symbols are actually DSL keywords.
     """
     regex = re.compile(r"(not|-)", re.IGNORECASE)
     grammar = Enum(K("not"), K("-"))
+
+
+DSL_KEYWORDS = frozenset(
+    six.text_type(keyword) for keyword_class in (And, Or, Not) for keyword in keyword_class.grammar.keys()
+)
+"""The (lowercase) DSL keywords, which can't be terminals, unless parenthesized."""
 # ########################
 
 
@@ -259,8 +266,7 @@ class SimpleValueUnit(LeafRule):
             Handles a special case of tokens where a ':' is needed (for `texkey` queries).
 
             If we're parsing text not in parentheses, then some DSL keywords (e.g. And, Or, Not, defined above) should
-            not be recognized as terminals, thus we check if they are in the Keywords table (namespace like structure
-            handled by PyPeg).
+            not be recognized as terminals, thus we check if they are in DSL_KEYWORDS.
             This is done only when we are not parsing a parenthesized SimpleValue.
 
             Also, helps in supporting more implicit-and queries cases (last two checks).
@@ -276,7 +282,7 @@ class SimpleValueUnit(LeafRule):
 
             # Check if token is a DSL keyword. Disable this check in the case where the parser isn't parsing a
             # parenthesized terminal.
-            if not parser._parsing_parenthesized_terminal and matched_token.lower() in Keyword.table:
+            if not parser._parsing_parenthesized_terminal and matched_token.lower() in DSL_KEYWORDS:
                 return text, SyntaxError("found DSL keyword: " + matched_token)
 
             remaining_text = text[len(matched_token):]
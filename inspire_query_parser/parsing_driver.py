@@ -24,12 +24,21 @@
 
 from __future__ import absolute_import, print_function, unicode_literals
 
+from datetime import date
+import gc
+import json
 import logging
 
 import six
 
+from inspire_query_parser.caching import get_config_generation, get_query_cache
+from inspire_query_parser.hooks import (
+    FALLBACK_ELASTIC_SEARCH_VISITOR_CRASH, FALLBACK_EMPTY_ES_QUERY, FALLBACK_RESTRUCTURING_VISITOR_CRASH,
+    FALLBACK_SYNTAX_ERROR, FALLBACK_UNRECOGNIZED_TEXT, STAGE_DECODE, STAGE_ES, STAGE_FALLBACK, STAGE_PARSE,
+    STAGE_RESTRUCTURE, QueryTrace, count_tree_nodes, get_hooks, timer)
 from inspire_query_parser.parser import Query
-from inspire_query_parser.stateful_pypeg_parser import StatefulParser
+from inspire_query_parser.stateful_pypeg_parser import (
+    RuleAttemptCountingParser, StatefulParser)
 from inspire_query_parser.utils.format_parse_tree import emit_tree_format
 from inspire_query_parser.visitors.elastic_search_visitor import \
     ElasticSearchVisitor
@@ -38,13 +47,50 @@ from inspire_query_parser.visitors.restructuring_visitor import \
 
 logger = logging.getLogger(__name__)
 
+WARM_UP_QUERIES = (
+    # Find prefix, Invenio and SPIRES keywords, implicit and, boolean queries among simple values.
+    'find a T.A. Aibergenov and date = 1986',
+    "FIN author:'ellis'",
+    'author:ellis and Ti:boson',
+    "dotted.keyword:'bar'",
+    'fulltext:boson and (reference:Ellis or reference "Ellis")',
+    'exactauthor:M.Vanderhaeghen.1 and ac: 42',
+    "-author ellis OR title 'boson' | t higgs",
+    "author:ellis j title:'boson' reference:M.N.1",
+    'find cn atlas not tc c',
+    'author (pardo, f AND slavich) OR (author:bernreuther and not date:2017)',
+    # Ranges, comparisons and date specifiers.
+    'd 2015->2017 and cited:1->9',
+    'date > 2000-10 and date before 2000-12',
+    'date >= nov 2000 and d<=2005',
+    'date 1978+ + -ac 100+',
+    'topcite 200+ and ac > 10 and refs 5->10',
+    'date today - 2 and de yesterday and de this month - 1 and de last month',
+    # Journal, author, value kinds and the other keywords.
+    'f author ellis, j and patrignani and j Chin.Phys.',
+    'j Phys.Rev,D85,1 and eprint arxiv:1709.04302',
+    'a J.Smith.1 or a Caro-Estevez, Jose Luis or a Ellis, J',
+    't "exact title" or t \'partial\' or t /regex.*/ or t wild*card',
+    'texkey Ellis:2017abc or doi 10.1103/PhysRevD.85.012001 or rn CERN-TH-2017 or tc p or cn cms',
+    'higgs boson',
+    'title γ-radiation',
+)
+"""Queries going through every grammar path and kind of ElasticSearch query generation, for :func:`warm_up`."""
 
-def parse_query(query_str):
+_json_encoder = json.JSONEncoder(sort_keys=True)
+"""Serializes the ElasticSearch queries, like ``json.dumps(es_query, sort_keys=True)``, which creates an encoder per
+call when given options."""
+
+
+def parse_query(query_str, parser=None):
     """
     Drives the whole logic, by parsing, restructuring and finally, generating an ElasticSearch query.
 
     Args:
         query_str (six.text_types): the given query to be translated to an ElasticSearch query
+        parser (StatefulParser): The parser of the query, e.g. an :class:`InstrumentedStatefulParser` collecting
+            statistics per grammar rule, instead of the driver's one. The rule attempts of the query trace aren't
+            counted with it. It isn't used on cache hits.
 
     Returns:
         six.text_types: Return an ElasticSearch query.
@@ -52,62 +98,233 @@ def parse_query(query_str):
     Notes:
         In case there's an error, an ElasticSearch `multi_match` query is generated with its `query` value, being the
         query_str argument.
+
+        If a cache backend has been set with :func:`inspire_query_parser.caching.set_query_cache`, translations are
+        looked up in it first. Cache keys are prefixed with the current date, since date specifiers (e.g. "today")
+        make the translation depend on it, and with the generation of the settings changing the translations (see
+        :func:`inspire_query_parser.caching.bump_config_generation`).
+
+        Hooks registered with :func:`inspire_query_parser.hooks.register_hooks` are called around each stage.
     """
-    def _generate_match_all_fields_query():
-        # Strip colon character (special character for ES)
-        stripped_query_str = ' '.join(query_str.replace(':', ' ').split())
-        return {'multi_match': {'query': stripped_query_str, 'fields': ['_all'], 'zero_terms_query': 'all'}}
+    return _drive_translation(query_str, serialize=False, parser=parser)
+
+
+def parse_query_json(query_str):
+    """Like :func:`parse_query`, but returns the ElasticSearch query serialized to JSON.
+
+    Args:
+        query_str (six.text_types): the given query to be translated to an ElasticSearch query
+
+    Returns:
+        bytes: The UTF-8 encoded JSON of the ElasticSearch query, with sorted keys, i.e. the same bytes as
+        ``json.dumps(parse_query(query_str), sort_keys=True).encode('utf-8')``.
+
+    Notes:
+        On cache hits, the cached JSON is returned as is, without building the ElasticSearch query from it.
+    """
+    return _drive_translation(query_str, serialize=True)
+
+
+def _drive_translation(query_str, serialize, parser=None):
+    """Implements :func:`parse_query` and, if serialize, :func:`parse_query_json`."""
+    hooks = get_hooks()
+    trace = QueryTrace(hooks) if hooks else None
+
+    if trace is not None:
+        start = timer()
 
     if not isinstance(query_str, six.text_type):
         query_str = six.text_type(query_str.decode('utf-8'))
 
-    logger.info('Parsing: "' + query_str + '\".')
+    if trace is not None:
+        trace.query_str = query_str
+        trace.record_stage(STAGE_DECODE, start, input_size=len(query_str))
+
+    cache = get_query_cache()
+    if cache is None:
+        es_query = _translate_query(query_str, trace, parser)
+        if serialize:
+            serialized_es_query = _json_encoder.encode(es_query)
+    else:
+        cache_key = '{} {} {}'.format(date.today().isoformat(), get_config_generation(), query_str)
+        serialized_es_query = cache.get(cache_key)
+        if trace is not None:
+            trace.cache_hit = serialized_es_query is not None
+
+        if serialized_es_query is None:
+            es_query = _translate_query(query_str, trace, parser)
+            serialized_es_query = _json_encoder.encode(es_query)
+            cache.set(cache_key, serialized_es_query)
+        elif not serialize:
+            es_query = json.loads(serialized_es_query)
 
-    parser = StatefulParser()
-    rst_visitor = RestructuringVisitor()
-    es_visitor = ElasticSearchVisitor()
+    if serialize:
+        result = serialized_es_query.encode('utf-8')
+    else:
+        result = es_query
+
+    if trace is not None:
+        trace.finish()
+
+    return result
+
+
+def _translate_query(query_str, trace=None, parser=None):
+    """Runs the parsing, restructuring and ElasticSearch query generation steps for the (decoded) query_str.
+
+    If a :class:`QueryTrace` is given, each stage is timed and recorded in it. If a parser is given, it parses the
+    query.
+    """
+    def _generate_match_all_fields_query(fallback_reason):
+        if trace is not None:
+            start = timer()
+
+        # Strip colon character (special character for ES)
+        stripped_query_str = ' '.join(query_str.replace(':', ' ').split())
+        es_query = {'multi_match': {'query': stripped_query_str, 'fields': ['_all'], 'zero_terms_query': 'all'}}
+
+        if trace is not None:
+            trace.fallback_reason = fallback_reason
+            trace.record_stage(STAGE_FALLBACK, start, input_size=len(query_str), fallback_reason=fallback_reason)
+        return es_query
+
+    logger.info('Parsing: "%s".', query_str)
+
+    counts_rule_attempts = trace is not None and trace.rule_attempts is not None
+    if parser is not None:
+        if counts_rule_attempts:
+            trace.rule_attempts = None  # The given parser doesn't count them.
+            counts_rule_attempts = False
+    elif counts_rule_attempts:
+        parser = RuleAttemptCountingParser()  # Created per query, since its count is.
+    else:
+        parser = StatefulParser()
+
+    if trace is not None:
+        start = timer()
 
     try:
         unrecognized_text, parse_tree = parser.parse(query_str, Query)
+        if counts_rule_attempts:
+            trace.rule_attempts = parser.rule_attempts
 
         if unrecognized_text:  # Usually, should never happen.
-            msg = 'Parser returned unrecognized text: "' + unrecognized_text + \
-                  '" for query: "' + query_str + '".'
+            msg = 'Parser returned unrecognized text: "%s" for query: "%s".'
 
             if query_str == unrecognized_text and parse_tree is None:
                 # Didn't recognize anything.
-                logger.warn(msg)
-                return _generate_match_all_fields_query()
+                logger.warning(msg, unrecognized_text, query_str)
+                if trace is not None:
+                    trace.record_stage(
+                        STAGE_PARSE, start, input_size=len(query_str), fallback_reason=FALLBACK_UNRECOGNIZED_TEXT
+                    )
+                return _generate_match_all_fields_query(FALLBACK_UNRECOGNIZED_TEXT)
             else:
                 msg += 'Continuing with recognized parse tree.'
-            logger.warn(msg)
+            logger.warning(msg, unrecognized_text, query_str)
 
     except SyntaxError as e:
-        logger.warn('Parser syntax error (' + six.text_type(e) + ') with query: "' + query_str +
-                    '". Continuing with a match_all with the given query.')
-        return _generate_match_all_fields_query()
+        logger.warning('Parser syntax error (%s) with query: "%s". Continuing with a match_all with the given query.',
+                       e, query_str)
+        if trace is not None:
+            if counts_rule_attempts:
+                trace.rule_attempts = parser.rule_attempts
+            trace.record_stage(STAGE_PARSE, start, input_size=len(query_str), fallback_reason=FALLBACK_SYNTAX_ERROR)
+        return _generate_match_all_fields_query(FALLBACK_SYNTAX_ERROR)
+
+    if trace is not None:
+        end = timer()
+        parse_tree_node_count = count_tree_nodes(parse_tree)
+        trace.record_stage(STAGE_PARSE, start, input_size=len(query_str), node_count=parse_tree_node_count, end=end)
+        start = timer()
 
     # Try-Catch-all exceptions for visitors, so that search functionality never fails for the user.
     try:
-        restructured_parse_tree = parse_tree.accept(rst_visitor)
-        logger.debug('Parse tree: \n' + emit_tree_format(restructured_parse_tree))
+        restructured_parse_tree = parse_tree.accept(RestructuringVisitor())
+        if trace is not None:
+            end = timer()
+            restructured_parse_tree_node_count = count_tree_nodes(restructured_parse_tree)
+            trace.record_stage(
+                STAGE_RESTRUCTURE, start, input_size=parse_tree_node_count,
+                node_count=restructured_parse_tree_node_count, end=end
+            )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Parse tree: \n%s', emit_tree_format(restructured_parse_tree))
 
     except Exception as e:
-        logger.exception(
-            RestructuringVisitor.__name__ + " crashed" + (": " + six.text_type(e) + ".") if six.text_type(e) else '.'
-        )
-        return _generate_match_all_fields_query()
+        logger.exception('%s crashed%s', RestructuringVisitor.__name__, _format_exception_message(e))
+        if trace is not None:
+            trace.record_stage(
+                STAGE_RESTRUCTURE, start, input_size=parse_tree_node_count,
+                fallback_reason=FALLBACK_RESTRUCTURING_VISITOR_CRASH
+            )
+        return _generate_match_all_fields_query(FALLBACK_RESTRUCTURING_VISITOR_CRASH)
+
+    if trace is not None:
+        start = timer()
 
     try:
-        es_query = restructured_parse_tree.accept(es_visitor)
+        es_query = restructured_parse_tree.accept(ElasticSearchVisitor())
     except Exception as e:
-        logger.exception(
-            ElasticSearchVisitor.__name__ + " crashed" + (": " + six.text_type(e) + ".") if six.text_type(e) else '.'
+        logger.exception('%s crashed%s', ElasticSearchVisitor.__name__, _format_exception_message(e))
+        if trace is not None:
+            trace.record_stage(
+                STAGE_ES, start, input_size=restructured_parse_tree_node_count,
+                fallback_reason=FALLBACK_ELASTIC_SEARCH_VISITOR_CRASH
+            )
+        return _generate_match_all_fields_query(FALLBACK_ELASTIC_SEARCH_VISITOR_CRASH)
+
+    if trace is not None:
+        trace.record_stage(
+            STAGE_ES, start, input_size=restructured_parse_tree_node_count,
+            fallback_reason=None if es_query else FALLBACK_EMPTY_ES_QUERY
         )
-        return _generate_match_all_fields_query()
 
     if not es_query:
         # Case where an empty query was generated (i.e. date query with malformed date, e.g. "d < 200").
-        return _generate_match_all_fields_query()
+        logger.warning('Empty ElasticSearch query generated for query: "%s". Continuing with a match_all with the '
+                       'given query.', query_str)
+        return _generate_match_all_fields_query(FALLBACK_EMPTY_ES_QUERY)
 
     return es_query
+
+
+def _format_exception_message(exception):
+    message = six.text_type(exception)
+    return ': ' + message + '.' if message else '.'
+
+
+def warm_up(queries=WARM_UP_QUERIES, freeze=True):
+    """Prepares a pre-fork master process, so that its workers share its memory and don't pay for their first queries.
+
+    Translates queries, which imports the dependencies needed only by some kinds of queries and loads the journal title
+    table, if one is set. Then, collects the garbage and moves the remaining objects (grammar classes, compiled regexes,
+    configuration, etc.) to the permanent generation with ``gc.freeze()``, so that the garbage collections of the
+    workers don't write to (thus copy) the memory pages they share with the master.
+
+    Args:
+        queries (iterable): The queries to translate, by default :data:`WARM_UP_QUERIES`.
+        freeze (bool): Whether to freeze the objects. ``gc.freeze()`` is only available in Python 3.7+.
+
+    Returns:
+        int: The number of frozen objects, 0 if nothing was frozen.
+
+    Notes:
+        Call it right before forking the workers. The query cache isn't used, since the queries are translated for
+        their side effects.
+
+        For sharing as many pages as possible, the master can also call ``gc.disable()`` early, so that the objects
+        freed during its start-up don't leave holes in the shared pages, and the workers ``gc.enable()`` right after
+        the fork.
+    """
+    for query_str in queries:
+        if not isinstance(query_str, six.text_type):
+            query_str = six.text_type(query_str.decode('utf-8'))
+        _translate_query(query_str)
+
+    if not freeze or not hasattr(gc, 'freeze'):
+        return 0
+
+    gc.collect()
+    gc.freeze()
+    return gc.get_freeze_count()
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+"""
+Structured, sampled and non-blocking logging of :func:`inspire_query_parser.parsing_driver.parse_query` calls.
+
+By default, the package logs through the standard :mod:`logging` machinery, synchronously, with an INFO record for
+every query. :func:`enable_query_logging` switches to the structured mode::
+
+    query_logging = enable_query_logging(logging.StreamHandler(), sample_rate=0.01)
+    ...
+    query_logging.stop()
+
+In the structured mode:
+    - Each sampled query produces a single INFO record on the ``inspire_query_parser.queries`` logger, carrying a
+      ``query_event`` dict (query, duration and stage breakdown, fallback reason and cache outcome), which
+      :class:`JsonFormatter` renders as one JSON object per line. Queries are sampled at ``sample_rate``.
+    - The fallbacks to a match-all-fields query are logged only by the driver, with a WARNING record (or an ERROR one,
+      with the traceback, for a crash), whether their query is sampled or not.
+    - The records of all the ``inspire_query_parser`` loggers are handed to a bounded queue and emitted by a background
+      thread, so request threads never block on log I/O, nor pay for formatting. When the queue is full, records are
+      dropped and counted in :attr:`QueryLogging.dropped`.
+
+The levels and the propagation of the loggers are left to the application:
+    - The query records are at INFO level, thus the ``inspire_query_parser.queries`` logger needs an effective level of
+      INFO or lower, e.g. with ``logging.getLogger(QUERY_LOGGER_NAME).setLevel(logging.INFO)``.
+    - The driver logs an INFO record for every query on the ``inspire_query_parser.parsing_driver`` logger. Setting its
+      level to WARNING keeps only its fallbacks.
+    - The records still propagate to the handlers of the application (e.g. the root logger's), in the request threads.
+      Setting ``logging.getLogger('inspire_query_parser').propagate = False`` emits them only through the given
+      handlers.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import json
+import logging
+import random
+
+from six.moves import queue
+
+from inspire_query_parser.hooks import ParseQueryHooks, register_hooks, unregister_hooks
+
+try:
+    from logging.handlers import QueueHandler, QueueListener
+except ImportError:  # Python 2
+    QueueHandler = QueueListener = None
+
+QUERY_LOGGER_NAME = 'inspire_query_parser.queries'
+
+_PACKAGE_LOGGER_NAME = 'inspire_query_parser'
+
+
+class QueryLogHook(ParseQueryHooks):
+    """Logs one structured INFO record per sampled query.
+
+    Args:
+        sample_rate (float): Fraction, between 0 and 1, of the queries to log. The fallbacks to a match-all-fields query
+            are sampled like the other queries, since the driver logs them already.
+        logger (logging.Logger): Where to log, by default the ``inspire_query_parser.queries`` logger.
+    """
+
+    def __init__(self, sample_rate=1.0, logger=None):
+        self.sample_rate = sample_rate
+        self.logger = logger or logging.getLogger(QUERY_LOGGER_NAME)
+        self._random = random.random
+
+    def on_query(self, trace):
+        if self.sample_rate < 1.0 and self._random() >= self.sample_rate:
+            return
+
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+
+        query_event = {
+            'query': trace.query_str,
+            'duration': trace.duration,
+            'stages': {event.stage: event.duration for event in trace.stages},
+            'fallback_reason': trace.fallback_reason,
+            'cache_hit': trace.cache_hit,
+            'sample_rate': self.sample_rate,
+        }
+        self.logger.info('Query "%s" translated in %.6fs.', trace.query_str, trace.duration,
+                         extra={'query_event': query_event})
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as single-line JSON objects, including the ``query_event`` of :class:`QueryLogHook` records."""
+
+    def format(self, record):
+        document = {
+            'timestamp': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        query_event = getattr(record, 'query_event', None)
+        if query_event is not None:
+            document.update(query_event)
+        if record.exc_info:
+            document['exception'] = self.formatException(record.exc_info)
+        return json.dumps(document, sort_keys=True)
+
+
+if QueueHandler is not None:
+    class _DroppingQueueHandler(QueueHandler):
+        """A :class:`QueueHandler` that never blocks and leaves the formatting to the listener's thread."""
+
+        def __init__(self, record_queue):
+            super(_DroppingQueueHandler, self).__init__(record_queue)
+            self.dropped = 0
+
+        def prepare(self, record):
+            # The default implementation formats the message in the calling thread. The arguments of the package's
+            # records are immutable (text and numbers), thus they can be formatted later, by the listener.
+            return record
+
+        def enqueue(self, record):
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+
+
+class QueryLogging(object):
+    """Handle on the structured logging mode, as returned by :func:`enable_query_logging`."""
+
+    def __init__(self, hook, queue_handler, listener):
+        self.hook = hook
+        self._queue_handler = queue_handler
+        self._listener = listener
+
+    @property
+    def dropped(self):
+        """Number of records dropped because the queue was full."""
+        return self._queue_handler.dropped
+
+    def stop(self):
+        """Flushes the pending records and restores the default, synchronous, logging."""
+        unregister_hooks(self.hook)
+
+        logging.getLogger(_PACKAGE_LOGGER_NAME).removeHandler(self._queue_handler)
+        self._listener.stop()
+
+
+def enable_query_logging(*handlers, **kwargs):
+    """Switches to the structured, sampled and non-blocking logging mode.
+
+    The levels and the propagation of the loggers aren't changed, see :mod:`inspire_query_parser.query_logging`.
+
+    Args:
+        handlers (logging.Handler): Where the records are eventually emitted, from a background thread. Handlers
+            without a formatter get a :class:`JsonFormatter`.
+        sample_rate (float): Fraction of the successfully translated queries to log, 1% by default.
+        queue_size (int): Maximum number of records waiting to be emitted, 10000 by default.
+
+    Returns:
+        QueryLogging: Its :meth:`QueryLogging.stop` method switches back to the default logging.
+    """
+    sample_rate = kwargs.pop('sample_rate', 0.01)
+    queue_size = kwargs.pop('queue_size', 10000)
+    if kwargs:
+        raise TypeError('Unexpected keyword arguments: ' + ', '.join(sorted(kwargs)) + '.')
+
+    if QueueHandler is None:
+        raise RuntimeError('Structured query logging requires Python 3.2 or later.')
+
+    for handler in handlers:
+        if handler.formatter is None:
+            handler.setFormatter(JsonFormatter())
+
+    record_queue = queue.Queue(queue_size)
+    queue_handler = _DroppingQueueHandler(record_queue)
+    listener = QueueListener(record_queue, *handlers, respect_handler_level=True)
+
+    hook = QueryLogHook(sample_rate, logging.getLogger(QUERY_LOGGER_NAME))
+    listener.start()
+    logging.getLogger(_PACKAGE_LOGGER_NAME).addHandler(queue_handler)
+    register_hooks(hook)
+
+    return QueryLogging(hook, queue_handler, listener)
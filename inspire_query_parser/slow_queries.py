@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+"""
+Bounded record of the slowest :func:`inspire_query_parser.parsing_driver.parse_query` calls.
+
+:class:`SlowQueryLog` is a :class:`inspire_query_parser.hooks.ParseQueryHooks` keeping the ``size`` slowest
+translations of the last ``window`` seconds::
+
+    slow_query_log = SlowQueryLog(size=20, window=600)
+    register_hooks(slow_query_log)
+    slow_query_log.install_signal_handler()  # ``kill -USR1 <pid>`` dumps the log to JSON.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import heapq
+import io
+import itertools
+import json
+import logging
+import os
+import signal
+import tempfile
+import threading
+import time
+
+from inspire_query_parser.hooks import STAGE_PARSE, ParseQueryHooks
+
+logger = logging.getLogger(__name__)
+
+
+class SlowQueryLog(ParseQueryHooks):
+    """Keeps the ``size`` slowest translations of the last ``window`` seconds, with their stage breakdown.
+
+    Entries live in a min-heap on duration, thus a query faster than all the recorded ones is rejected after a single
+    comparison. Expired entries are dropped lazily, when the oldest entry expires or when the entries are read.
+
+    Args:
+        size (int): Maximum number of entries.
+        window (float): Entries older than this many seconds are dropped. None for keeping them forever.
+        count_rule_attempts (bool): Whether to record the number of grammar rule attempts of each query. Off by
+            default, since the traced queries are then parsed by a :class:`RuleAttemptCountingParser`, instead of a
+            :class:`StatefulParser`, with a per attempt overhead. Thus, enable it for a diagnosis, rather than in a log
+            running all the time. When disabled, the ``rule_attempts`` of the entries are None.
+    """
+
+    def __init__(self, size=50, window=600, count_rule_attempts=False):
+        self.size = size
+        self.window = window
+        self.counts_rule_attempts = count_rule_attempts
+        self._heap = []
+        self._oldest_timestamp = None
+        self._counter = itertools.count()  # Tie-breaker, so that heap items never compare their entries.
+        self._lock = threading.Lock()
+
+    def on_query(self, trace):
+        now = time.time()
+        heap = self._heap
+        is_expiring = self.window is not None and self._oldest_timestamp is not None and \
+            now - self.window > self._oldest_timestamp
+        if len(heap) >= self.size and heap and trace.duration <= heap[0][0] and not is_expiring:
+            return
+
+        entry = {
+            'query': trace.query_str,
+            'duration': trace.duration,
+            'timestamp': now,
+            'stages': {event.stage: event.duration for event in trace.stages},
+            'node_count': next((event.node_count for event in trace.stages if event.stage == STAGE_PARSE), None),
+            'rule_attempts': trace.rule_attempts,
+            'fallback_reason': trace.fallback_reason,
+            'cache_hit': trace.cache_hit,
+        }
+
+        with self._lock:
+            if is_expiring:
+                self._drop_expired(now)
+
+            item = (trace.duration, next(self._counter), entry)
+            if len(self._heap) < self.size:
+                heapq.heappush(self._heap, item)
+            elif self._heap and trace.duration > self._heap[0][0]:
+                heapq.heapreplace(self._heap, item)
+            else:
+                return
+
+            if self._oldest_timestamp is None:
+                self._oldest_timestamp = now
+
+    def _drop_expired(self, now):
+        cutoff = now - self.window
+        heap = [item for item in self._heap if item[2]['timestamp'] >= cutoff]
+        heapq.heapify(heap)
+        self._heap = heap
+        self._oldest_timestamp = min(item[2]['timestamp'] for item in heap) if heap else None
+
+    def entries(self):
+        """Returns the recorded entries, slowest first.
+
+        Doesn't take any lock, so that it can be called from a signal handler interrupting a recording thread.
+
+        Returns:
+            list: Dicts with the ``query``, its ``duration`` and the ``timestamp`` it was recorded at, the duration of
+            each of its ``stages``, the ``node_count`` of its parse tree, its ``rule_attempts``, ``fallback_reason``
+            and ``cache_hit``.
+        """
+        heap = list(self._heap)
+        if self.window is not None:
+            cutoff = time.time() - self.window
+            heap = [item for item in heap if item[2]['timestamp'] >= cutoff]
+        return [item[2] for item in sorted(heap, reverse=True)]
+
+    def clear(self):
+        with self._lock:
+            self._heap = []
+            self._oldest_timestamp = None
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.entries(), sort_keys=True, **kwargs)
+
+    def dump(self, path):
+        """Writes the entries, as JSON, to path."""
+        with io.open(path, 'w', encoding='utf-8') as dump_file:
+            dump_file.write(self.to_json(indent=2))
+
+    def install_signal_handler(self, signum=getattr(signal, 'SIGUSR1', None), path=None):
+        """Dumps the entries to path whenever the process receives the given signal.
+
+        Must be called from the main thread.
+
+        Args:
+            signum (int): The signal number, SIGUSR1 by default.
+            path (str): Where to dump the entries. By default, ``inspire_query_parser_slow_queries_<pid>.json`` in
+                the temporary directory, where ``<pid>`` is the process id at the time the signal is received.
+
+        Returns:
+            The previous handler of the signal.
+        """
+        def _dump_on_signal(received_signum, frame):
+            dump_path = path or os.path.join(
+                tempfile.gettempdir(), 'inspire_query_parser_slow_queries_{}.json'.format(os.getpid())
+            )
+            try:
+                self.dump(dump_path)
+            except Exception:
+                logger.exception('Dumping the slow query log to "' + dump_path + '" failed.')
+            else:
+                logger.warning('Slow query log dumped to "' + dump_path + '".')
+
+        return signal.signal(signum, _dump_on_signal)
@@ -20,12 +20,29 @@
 # granted to it by virtue of its status as an Intergovernmental Organization
 # or submit itself to any jurisdiction.
 
+"""
+Parser classes driving the parsing of the grammar defined in :mod:`inspire_query_parser.parser`.
+
+Besides :class:`StatefulParser`, the module provides :class:`InstrumentedStatefulParser`, which collects per grammar
+rule statistics into a :class:`RuleStatistics`, and the lighter :class:`RuleAttemptCountingParser`, which only counts
+rule attempts. Instrumentation is opt-in: :class:`StatefulParser` doesn't pay for it.
+"""
+
+from __future__ import absolute_import, division, unicode_literals
+
+import json
+import timeit
+
 from pypeg2 import Parser
 
 
 class StatefulParser(Parser):
     """Defines a stateful parser for encapsulating parsing flags functionality.
 
+    A parser can be shared by many threads: each :meth:`parse` call runs on its own parsing context, a copy of the
+    parser made by :meth:`_create_parsing_context`, which holds the flags and the packrat memory of that call. The
+    grammar rules get the parsing context as their ``parser`` argument, so they never modify the shared parser.
+
     Attributes:
         _parsing_parenthesized_terminal (bool):
             Signifies whether the parser is trying to identify a parenthesized terminal. Used for disabling the
@@ -39,6 +56,10 @@ class StatefulParser(Parser):
 
         _parsing_texkey_expression (bool):
             Signifies whether we are parsing a `texkey` expression which has special value in which we must accept ':'.
+
+        _is_parsing_context (bool):
+            Whether this is the parsing context of a :meth:`parse` call. Grammar rules parsing sub-grammars (with
+            ``parser.parse``) keep on using it.
     """
 
     def __init__(self):
@@ -46,3 +67,168 @@ class StatefulParser(Parser):
         self._parsing_parenthesized_terminal = False
         self._parsing_parenthesized_simple_values_expression = False
         self._parsing_texkey_expression = False
+        self._is_parsing_context = False
+
+    def parse(self, text, thing, filename=None):
+        if self._is_parsing_context:
+            return super(StatefulParser, self).parse(text, thing, filename)
+
+        parsing_context = self._create_parsing_context()
+        try:
+            return parsing_context.parse(text, thing, filename)
+        finally:
+            self._finish_parsing_context(parsing_context)
+
+    def _create_parsing_context(self):
+        """Returns a copy of the parser, with the configuration and flags of the parser and a state of its own.
+
+        Subclasses with state of their own should extend it.
+        """
+        parsing_context = self.__class__.__new__(self.__class__)
+        parsing_context.__dict__.update(self.__dict__)
+        parsing_context._is_parsing_context = True
+        parsing_context.last_error = None
+        parsing_context.text = None
+        parsing_context._memory = {}
+        parsing_context._got_endl = True
+        parsing_context._contiguous = False
+        parsing_context._got_regex = False
+        return parsing_context
+
+    def _finish_parsing_context(self, parsing_context):
+        """Called with the parsing context of each :meth:`parse` call, once it's done, even if it failed."""
+
+
+class RuleStatistics(object):
+    """Parse statistics per grammar rule class, aggregated over any number of parses.
+
+    For each rule, the following are recorded:
+        * attempts, successes and failures: how many times the rule was tried and its outcome.
+        * characters_consumed: total input consumed by the successful attempts (including trailing whitespace).
+        * cumulative_time: seconds spent in the rule, including its sub-rules.
+        * self_time: seconds spent in the rule, excluding its sub-rules.
+    """
+    FIELDS = ('attempts', 'successes', 'failures', 'characters_consumed', 'cumulative_time', 'self_time')
+
+    def __init__(self):
+        self._rules = {}
+
+    def record(self, rule_name, success, characters_consumed, duration, self_time):
+        try:
+            rule = self._rules[rule_name]
+        except KeyError:
+            rule = self._rules[rule_name] = [0, 0, 0, 0, 0.0, 0.0]
+
+        rule[0] += 1
+        if success:
+            rule[1] += 1
+            rule[3] += characters_consumed
+        else:
+            rule[2] += 1
+        rule[4] += duration
+        rule[5] += self_time
+
+    @property
+    def total_attempts(self):
+        return sum(rule[0] for rule in self._rules.values())
+
+    def merge(self, other):
+        """Adds the statistics of another :class:`RuleStatistics` into this one."""
+        for rule_name, other_rule in other._rules.items():
+            rule = self._rules.setdefault(rule_name, [0, 0, 0, 0, 0.0, 0.0])
+            for idx, value in enumerate(other_rule):
+                rule[idx] += value
+
+    def reset(self):
+        self._rules = {}
+
+    def as_dict(self):
+        """Returns ``{rule name: {field: value}}``."""
+        return {
+            rule_name: dict(zip(RuleStatistics.FIELDS, rule))
+            for rule_name, rule in self._rules.items()
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.as_dict(), sort_keys=True, **kwargs)
+
+    def format_table(self, sort_by='cumulative_time'):
+        """Returns a text table of the statistics, one rule per line, sorted descending on the given field."""
+        sort_idx = RuleStatistics.FIELDS.index(sort_by)
+        lines = ['{:<28}{:>10}{:>10}{:>10}{:>12}{:>12}{:>12}'.format(
+            'rule', 'attempts', 'successes', 'failures', 'chars', 'cum (ms)', 'self (ms)'
+        )]
+        for rule_name, rule in sorted(self._rules.items(), key=lambda item: item[1][sort_idx], reverse=True):
+            lines.append('{:<28}{:>10}{:>10}{:>10}{:>12}{:>12.3f}{:>12.3f}'.format(
+                rule_name, rule[0], rule[1], rule[2], rule[3], rule[4] * 1000, rule[5] * 1000
+            ))
+        return '\n'.join(lines)
+
+
+class RuleAttemptCountingParser(StatefulParser):
+    """A :class:`StatefulParser` counting, in ``rule_attempts``, how many times it attempted to parse a grammar rule.
+
+    The count isn't thread-safe, thus a counting parser shouldn't be shared by many threads.
+    """
+
+    def __init__(self):
+        super(RuleAttemptCountingParser, self).__init__()
+        self.rule_attempts = 0
+
+    def _create_parsing_context(self):
+        parsing_context = super(RuleAttemptCountingParser, self)._create_parsing_context()
+        parsing_context.rule_attempts = 0
+        return parsing_context
+
+    def _finish_parsing_context(self, parsing_context):
+        self.rule_attempts += parsing_context.rule_attempts
+
+    def _parse(self, text, thing, *args):
+        if isinstance(thing, type):
+            self.rule_attempts += 1
+        return super(RuleAttemptCountingParser, self)._parse(text, thing, *args)
+
+
+class InstrumentedStatefulParser(StatefulParser):
+    """A :class:`StatefulParser` that records statistics for each grammar rule class it attempts to parse.
+
+    Args:
+        statistics (RuleStatistics): Where to record the statistics. Pass the same instance to many parsers for
+            aggregating the statistics of many queries. By default, a new one is created. Recording isn't thread-safe,
+            thus the statistics (and the parser) shouldn't be shared by many threads.
+    """
+    timer = staticmethod(timeit.default_timer)
+
+    def __init__(self, statistics=None):
+        super(InstrumentedStatefulParser, self).__init__()
+        self.statistics = statistics if statistics is not None else RuleStatistics()
+        self._children_time = []
+
+    def _create_parsing_context(self):
+        parsing_context = super(InstrumentedStatefulParser, self)._create_parsing_context()
+        parsing_context._children_time = []
+        return parsing_context
+
+    def _parse(self, text, thing, *args):
+        if not isinstance(thing, type):  # Not a rule class, but an inline grammar element (regex, tuple, list...).
+            return super(InstrumentedStatefulParser, self)._parse(text, thing, *args)
+
+        self._children_time.append(0.0)
+        start = self.timer()
+        try:
+            remaining_text, result = super(InstrumentedStatefulParser, self)._parse(text, thing, *args)
+        finally:
+            duration = self.timer() - start
+            children_time = self._children_time.pop()
+            if self._children_time:
+                self._children_time[-1] += duration
+
+        success = not isinstance(result, SyntaxError)
+        self.statistics.record(
+            thing.__name__,
+            success,
+            len(text) - len(remaining_text) if success else 0,
+            duration,
+            duration - children_time,
+        )
+        return remaining_text, result
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+"""
+CBOR (RFC 8949) encoding of the ElasticSearch queries, which ElasticSearch accepts as request bodies with the
+``application/cbor`` content type.
+
+The values keep the semantics they have in JSON: booleans stay booleans (e.g. ``{'term': {'core': True}}``), integers
+stay integers and floats (e.g. the boosts of :meth:`ElasticSearchVisitor._generate_term_query`) stay floats, even if
+their value is integral. Map keys are sorted, like ``json.dumps(es_query, sort_keys=True)`` does, so that the same
+query always gives the same bytes.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import struct
+
+import six
+
+CBOR_CONTENT_TYPE = 'application/cbor'
+
+_MAJOR_TYPE_UNSIGNED_INTEGER = 0
+_MAJOR_TYPE_NEGATIVE_INTEGER = 1
+_MAJOR_TYPE_BYTE_STRING = 2
+_MAJOR_TYPE_TEXT_STRING = 3
+_MAJOR_TYPE_ARRAY = 4
+_MAJOR_TYPE_MAP = 5
+
+_FALSE = b'\xf4'
+_TRUE = b'\xf5'
+_NULL = b'\xf6'
+
+_FLOAT32 = struct.Struct('>Bf')
+_FLOAT64 = struct.Struct('>Bd')
+_ARGUMENT_STRUCTS = (
+    (0x100, 24, struct.Struct('>BB')),
+    (0x10000, 25, struct.Struct('>BH')),
+    (0x100000000, 26, struct.Struct('>BI')),
+    (0x10000000000000000, 27, struct.Struct('>BQ')),
+)
+
+_SMALL_HEADS = [
+    [six.int2byte(major_type << 5 | argument) for argument in range(24)] for major_type in range(8)
+]
+"""The heads (i.e. the initial byte) of the arguments smaller than 24, which fit in them, for each major type."""
+
+
+def _encode_head(major_type, argument, chunks):
+    if argument < 24:
+        chunks.append(_SMALL_HEADS[major_type][argument])
+        return
+
+    for limit, additional_information, argument_struct in _ARGUMENT_STRUCTS:
+        if argument < limit:
+            chunks.append(argument_struct.pack(major_type << 5 | additional_information, argument))
+            return
+
+    raise ValueError('Integer {} is out of the range of CBOR integers.'.format(argument))
+
+
+def _encode_text(value, chunks):
+    data = value.encode('utf-8')
+    _encode_head(_MAJOR_TYPE_TEXT_STRING, len(data), chunks)
+    chunks.append(data)
+
+
+def _encode_float(value, chunks):
+    # The shortest of the single and double precision encodings which keeps the value.
+    try:
+        encoded_value = _FLOAT32.pack(0xfa, value)
+    except OverflowError:
+        encoded_value = None
+
+    if encoded_value is None or _FLOAT32.unpack(encoded_value)[1] != value:
+        encoded_value = _FLOAT64.pack(0xfb, value)
+    chunks.append(encoded_value)
+
+
+def _encode(value, chunks):
+    # Checked before the integers, since bool is a subclass of int.
+    if value is True:
+        chunks.append(_TRUE)
+    elif value is False:
+        chunks.append(_FALSE)
+    elif value is None:
+        chunks.append(_NULL)
+    elif isinstance(value, six.text_type):
+        _encode_text(value, chunks)
+    elif isinstance(value, dict):
+        _encode_head(_MAJOR_TYPE_MAP, len(value), chunks)
+        for key in sorted(value):
+            if isinstance(key, bytes) and six.PY2:
+                key = key.decode('utf-8')
+            if not isinstance(key, six.text_type):
+                raise TypeError('Keys must be strings, not {!r}.'.format(key))
+            _encode_text(key, chunks)
+            _encode(value[key], chunks)
+    elif isinstance(value, (list, tuple)):
+        _encode_head(_MAJOR_TYPE_ARRAY, len(value), chunks)
+        for item in value:
+            _encode(item, chunks)
+    elif isinstance(value, six.integer_types):
+        if value >= 0:
+            _encode_head(_MAJOR_TYPE_UNSIGNED_INTEGER, value, chunks)
+        else:
+            _encode_head(_MAJOR_TYPE_NEGATIVE_INTEGER, -1 - value, chunks)
+    elif isinstance(value, float):
+        _encode_float(value, chunks)
+    elif isinstance(value, bytes):
+        if six.PY2:  # A native string, which json serializes as text.
+            _encode_text(value.decode('utf-8'), chunks)
+        else:
+            _encode_head(_MAJOR_TYPE_BYTE_STRING, len(value), chunks)
+            chunks.append(value)
+    else:
+        raise TypeError('Object of type {} is not CBOR serializable.'.format(type(value).__name__))
+
+
+def encode_cbor(value):
+    """Encodes an ElasticSearch query (or any JSON-like value) to CBOR.
+
+    Args:
+        value: The value, made of dicts (whose keys must be strings), lists, tuples, strings, integers, floats,
+            booleans and None, like the ones generated by the :class:`ElasticSearchVisitor`.
+
+    Returns:
+        bytes: The CBOR encoding of value, with definite length maps and arrays, and the map keys sorted.
+
+    Raises:
+        TypeError: If value contains an object of another type, or a map key which isn't a string.
+        ValueError: If value contains an integer out of the 64 bits range of the CBOR integers.
+    """
+    chunks = []
+    _encode(value, chunks)
+    return b''.join(chunks)
@@ -34,6 +34,9 @@ INDENTATION = 4
 def emit_tree_format(tree, verbose=False):
     """Returns a tree representation of a parse tree.
 
+    The tree is walked iteratively and the output is streamed into a list of lines, so that rendering takes time linear
+    in the size of the output, whatever the depth of the tree.
+
     Arguments:
         tree:           the parse tree whose tree representation is to be generated
         verbose (bool): if True prints the parse tree to be formatted
@@ -43,70 +46,64 @@ def emit_tree_format(tree, verbose=False):
     """
     if verbose:
         print("Converting: " + repr(tree))
-    ret_str = __recursive_formatter(tree)
-    return ret_str
-
-
-def __emit_symbol_at_level_str(symbol, level, is_last=False):
-    def emit_prefix():
-        ret_str = ""
-        prefix = ("└── " if is_last else "├── ") if level != 0 else ""
-        for i in range(level - INDENTATION):
-            if i % INDENTATION == 0:
-                ret_str += "│"
-            else:
-                ret_str += " "
-        return ret_str + prefix
-
-    return emit_prefix() + symbol + "\n"
-
-
-def __recursive_formatter(node, level=-INDENTATION):
-    new_level = INDENTATION + level
-
-    if isinstance(node, Leaf):
-        value = "" if not repr(node.value) else node.__class__.__name__ \
-                                                + " {" + (node.value if node.value else "") + "}"
 
-        ret_str = __emit_symbol_at_level_str(value, new_level) if value != "" else ""
-
-    elif isinstance(node, six.text_type):
-        value = "" if not repr(node) or repr(node) == "None" \
-            else "Text {" + node + "}"
-
-        ret_str = __emit_symbol_at_level_str(value, new_level) if value != "" else ""
-
-    else:
-        ret_str = __emit_symbol_at_level_str(node.__class__.__name__, new_level)
-        if isinstance(node, UnaryOp):
-            ret_str += __recursive_formatter(node.op, new_level)
-            if not node.op:
-                ret_str = ""
+    lines = []
+    prefixes = {}
+
+    def emit(symbol, level, is_last=False):
+        try:
+            prefix = prefixes[level, is_last]
+        except KeyError:
+            prefix = prefixes[level, is_last] = __emit_prefix(level, is_last)
+        lines.append(prefix + symbol + "\n")
+
+    # Each stack item is either a (node, level) pair to format or a (symbol, level) pair of a list's closing symbol,
+    # marked by a third True item.
+    stack = [(tree, 0)]
+    while stack:
+        item = stack.pop()
+        if len(item) == 3:
+            emit(item[0], item[1], True)
+            continue
+
+        node, level = item
+        if isinstance(node, Leaf):
+            emit(node.__class__.__name__ + " {" + (node.value if node.value else "") + "}", level)
+
+        elif isinstance(node, six.text_type):
+            emit("Text {" + node + "}", level)
+
+        elif isinstance(node, UnaryOp):
+            if node.op:
+                emit(node.__class__.__name__, level)
+                stack.append((node.op, level + INDENTATION))
 
         elif isinstance(node, BinaryOp):
-            try:
-                if isinstance(node, BooleanRule):
-                    ret_str = __emit_symbol_at_level_str(
-                        node.__class__.__name__ + " {" + str(node.bool_op) + "}",
-                        new_level
-                    )
-            except AttributeError:
-                pass
-            ret_str += __recursive_formatter(node.left, new_level)
-            ret_str += __recursive_formatter(node.right, new_level)
+            symbol = node.__class__.__name__
+            if isinstance(node, BooleanRule) and hasattr(node, 'bool_op'):
+                symbol += " {" + str(node.bool_op) + "}"
+            emit(symbol, level)
+            stack.append((node.right, level + INDENTATION))
+            stack.append((node.left, level + INDENTATION))
 
         elif isinstance(node, ListOp):
+            emit(node.__class__.__name__, level)
+            stack.append(("▆", level, True))
             try:
-                len(node.children)
-                for c in node.children:
-                    ret_str += __recursive_formatter(c, new_level)
+                children = list(node.children)
             except TypeError:
-                ret_str += __recursive_formatter(node.children, new_level)
-            ret_str += __emit_symbol_at_level_str("▆", new_level, True)
+                children = [node.children]
+            stack.extend((child, level + INDENTATION) for child in reversed(children))
 
-        elif not node:
-            return ""
-        else:
+        elif node:
             raise TypeError("Unexpected base type: " + repr(type(node)))
 
-    return ret_str
+    return "".join(lines)
+
+
+def __emit_prefix(level, is_last=False):
+    indentation_unit = "│" + " " * (INDENTATION - 1)
+    prefix = indentation_unit * ((level - INDENTATION) // INDENTATION)
+    if level != 0:
+        prefix += "└── " if is_last else "├── "
+    return prefix
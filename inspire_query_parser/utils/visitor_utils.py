@@ -22,22 +22,141 @@
 
 from __future__ import absolute_import, unicode_literals
 
-from datetime import date
-from dateutil.relativedelta import relativedelta
-from dateutil.parser import parse
+from datetime import date, timedelta
 import re
 from unidecode import unidecode
 
-from inspire_utils.name import ParsedName
-
-from inspire_utils.date import PartialDate
-
 from inspire_query_parser.ast import GenericValue
+from inspire_query_parser.caching import (LRUCache, bump_config_generation,
+                                          get_config_generation)
 from inspire_query_parser.config import (DATE_LAST_MONTH_REGEX_PATTERN,
-                                         DATE_SPECIFIERS_COLLECTION,
                                          DATE_THIS_MONTH_REGEX_PATTERN,
                                          DATE_TODAY_REGEX_PATTERN,
                                          DATE_YESTERDAY_REGEX_PATTERN)
+from inspire_query_parser.journal_titles import get_journal_title_table, split_journal_query_value
+
+
+AUTHOR_NAME_ANALYSIS_CACHE_SIZE = 4096
+"""Number of distinct author names whose :class:`AuthorNameAnalysis` is kept."""
+
+BAI_REGEX = re.compile(r'^((\w|-|\')+\.)+\d+$', re.UNICODE | re.IGNORECASE)
+"""Matches INSPIRE author identifiers (BAI), e.g. ``J.Smith.1``."""
+
+
+def _is_initial(name_part):
+    return len(name_part) == 1 or u'.' in name_part
+
+
+class AuthorNameAnalysis(object):
+    """The analysis of an author name, shared by all the author query helpers.
+
+    Each property is computed on first access only, since not every query needs all of them. Use
+    :func:`analyze_author_name` for getting the (cached) analysis of a name.
+
+    Attributes:
+        name (six.text_type): The analyzed name, as given.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    @property
+    def parsed_name(self):
+        """The ``ParsedName`` of the name."""
+        try:
+            return self._parsed_name
+        except AttributeError:
+            # Imported here (and in the other properties), since ``inspire_utils.name`` imports ``nameparser``, which
+            # is slow to import and only needed by author queries.
+            from inspire_utils.name import ParsedName
+
+            self._parsed_name = ParsedName(self.name)
+            return self._parsed_name
+
+    @property
+    def _loaded_parsed_name(self):
+        """The ``parsed_name``, after the validations of ``ParsedName.loads`` (which raises for empty names)."""
+        if not self.name or self.name.isspace():
+            from inspire_utils.name import ParsedName
+
+            return ParsedName.loads(self.name)
+        return self.parsed_name
+
+    @property
+    def transliterated_parsed_name(self):
+        """The ``ParsedName`` of the transliterated (unidecoded) name, raises ``ValueError`` for empty names."""
+        try:
+            return self._transliterated_parsed_name
+        except AttributeError:
+            transliterated_name = unidecode(self.name)
+            if transliterated_name == self.name:
+                self._transliterated_parsed_name = self._loaded_parsed_name
+            else:
+                from inspire_utils.name import ParsedName
+
+                self._transliterated_parsed_name = ParsedName.loads(transliterated_name)
+            return self._transliterated_parsed_name
+
+    @property
+    def normalized_name(self):
+        """The name normalized by ``inspire_utils.name.normalize_name``, None for empty names."""
+        try:
+            return self._normalized_name
+        except AttributeError:
+            from inspire_utils.name import normalize_name
+
+            self._normalized_name = normalize_name(self.name)
+            return self._normalized_name
+
+    @property
+    def is_bai(self):
+        """Whether the name is an INSPIRE author identifier (BAI), e.g. ``J.Smith.1``."""
+        try:
+            return self._is_bai
+        except AttributeError:
+            self._is_bai = bool(BAI_REGEX.match(self.name))
+            return self._is_bai
+
+    @property
+    def contains_fullnames(self):
+        """See :func:`author_name_contains_fullnames`."""
+        try:
+            return self._contains_fullnames
+        except AttributeError:
+            parsed_name = self.parsed_name
+            self._contains_fullnames = \
+                len(parsed_name) != 1 and not any([_is_initial(name_part) for name_part in parsed_name])
+            return self._contains_fullnames
+
+    @property
+    def has_only_initials(self):
+        """Whether all the parts of the name are initials, raises ``ValueError`` for empty names."""
+        try:
+            return self._has_only_initials
+        except AttributeError:
+            self._has_only_initials = all([_is_initial(name_part) for name_part in self._loaded_parsed_name])
+            return self._has_only_initials
+
+    @property
+    def minimal_name_variations(self):
+        """See :func:`generate_minimal_name_variations`. A tuple, since it's shared."""
+        try:
+            return self._minimal_name_variations
+        except AttributeError:
+            self._minimal_name_variations = tuple(_generate_minimal_name_variations(self.transliterated_parsed_name))
+            return self._minimal_name_variations
+
+
+_author_name_analyses = LRUCache(AUTHOR_NAME_ANALYSIS_CACHE_SIZE)
+
+
+def analyze_author_name(author_name):
+    """Returns the :class:`AuthorNameAnalysis` of author_name, from a LRU cache of the most recent distinct names."""
+    analysis = _author_name_analyses.get(author_name)
+    if analysis is None:
+        analysis = AuthorNameAnalysis(author_name)
+        _author_name_analyses.set(author_name, analysis)
+    return analysis
 
 
 def author_name_contains_fullnames(author_name):
@@ -47,27 +166,12 @@ def author_name_contains_fullnames(author_name):
           bool: True if name has only full name parts, e.g. 'Ellis John', False otherwise. So for example, False is
             returned for 'Ellis, J.' or 'Ellis'.
     """
-    def _is_initial(name_part):
-        return len(name_part) == 1 or u'.' in name_part
-
-    parsed_name = ParsedName(author_name)
-
-    if len(parsed_name) == 1:
-        return False
-    elif any([_is_initial(name_part) for name_part in parsed_name]):
-        return False
-
-    return True
+    return analyze_author_name(author_name).contains_fullnames
 
 
 def _name_variation_has_only_initials(name):
     """Detects whether the name variation consists only from initials."""
-    def _is_initial(name_variation):
-        return len(name_variation) == 1 or u'.' in name_variation
-
-    parsed_name = ParsedName.loads(name)
-
-    return all([_is_initial(name_part) for name_part in parsed_name])
+    return analyze_author_name(name).has_only_initials
 
 
 def generate_minimal_name_variations(author_name):
@@ -86,8 +190,10 @@ def generate_minimal_name_variations(author_name):
         ParsedName, otherwise the name is parsed differently. E.g. 'Caro-Estevez' as is, it's a lastname, if we replace
         the '-' with ' ', then it's a firstname and lastname.
     """
-    parsed_name = ParsedName.loads(unidecode(author_name))
+    return list(analyze_author_name(author_name).minimal_name_variations)
 
+
+def _generate_minimal_name_variations(parsed_name):
     if len(parsed_name) > 1:
         lastnames = parsed_name.last.replace('-', ' ')
 
@@ -123,34 +229,131 @@ ES_DATE_MATH_ROUNDING_MONTH = "||/M"
 ES_DATE_MATH_ROUNDING_DAY = "||/d"
 
 
-def _compile_date_regexes(date_specifier_patterns):
-    date_specifier_regexes = {}
-    for date_specifier in date_specifier_patterns:
-        date_specifier_regexes[date_specifier] = re.compile(date_specifier, re.IGNORECASE)
-    return date_specifier_regexes
-
+DATE_SPECIFIERS_CONVERSION_CACHE_SIZE = 1024
+"""Number of distinct date specifier values whose conversion is kept, for the current day."""
 
-DATE_SPECIFIERS_REGEXES = _compile_date_regexes(DATE_SPECIFIERS_COLLECTION)
+DATE_SPECIFIERS_REGEXES = {}
 """Mapping from date specifier text to date specifier compiled regexes."""
 
+DATE_SPECIFIERS_CONVERSION_HANDLERS = {}
+"""Mapping that depending on the date-specifier (key), returns the handler that converts the textual date to date."""
+
+
+class _DateSpecifiersMatcher(object):
+    """All the registered date specifiers, combined in a single regex.
+
+    Attributes:
+        regex: An alternation of the date specifier patterns, each one in a ``date_specifier_<index>`` named group.
+        handlers (dict): Mapping from group name to conversion handler.
+        first_characters (frozenset): The characters a date specifier can start with, None if unknown.
+    """
+
+    def __init__(self, date_specifier_patterns_and_handlers):
+        group_patterns = []
+        self.handlers = {}
+        self.first_characters = set()
+        for index, (date_specifier_patterns, handler) in enumerate(date_specifier_patterns_and_handlers):
+            group_name = 'date_specifier_{}'.format(index)
+            group_patterns.append('(?P<{}>{})'.format(group_name, date_specifier_patterns))
+            self.handlers[group_name] = handler
+
+            first_character = _get_literal_first_character(date_specifier_patterns)
+            if first_character is None or self.first_characters is None:
+                self.first_characters = None
+            else:
+                self.first_characters.update((first_character.lower(), first_character.upper()))
+
+        self.regex = re.compile('|'.join(group_patterns), re.IGNORECASE) if group_patterns else None
+        if self.first_characters is not None:
+            self.first_characters = frozenset(self.first_characters)
+
+
+def _get_literal_first_character(pattern):
+    """Returns the character any match of pattern starts with, or None if it's not obvious from the pattern."""
+    if pattern[:1].isalnum() and pattern[1:2] not in ('?', '*', '{') and '|' not in pattern:
+        return pattern[0]
+    return None
+
+
+_date_specifier_patterns_and_handlers = []
+_date_specifiers_matcher = _DateSpecifiersMatcher(())
+_converted_date_specifiers = LRUCache(DATE_SPECIFIERS_CONVERSION_CACHE_SIZE)
+
 
 def register_date_conversion_handler(date_specifier_patterns):
     """Decorator for registering handlers that convert text dates to dates.
 
     Args:
         date_specifier_patterns (str): the date specifier (in regex pattern format) for which the handler is registered
+
+    Notes:
+        Registering a handler for an already registered pattern replaces it. All the patterns are matched at once, with
+        a single regex, so registering new ones (e.g. ``last\\s+year``) doesn't add another pass over the values.
+
+        The handler gets the text following the date specifier (e.g. `` - 2`` for ``today - 2``) and returns the date
+        string. Its results are cached until the end of the day.
     """
 
     def _decorator(func):
-        global DATE_SPECIFIERS_CONVERSION_HANDLERS
-        DATE_SPECIFIERS_CONVERSION_HANDLERS[DATE_SPECIFIERS_REGEXES[date_specifier_patterns]] = func
+        regex = re.compile(date_specifier_patterns, re.IGNORECASE)
+        DATE_SPECIFIERS_REGEXES[date_specifier_patterns] = regex
+        DATE_SPECIFIERS_CONVERSION_HANDLERS[regex] = func
+
+        _update_date_specifiers(date_specifier_patterns, func)
         return func
 
     return _decorator
 
 
-DATE_SPECIFIERS_CONVERSION_HANDLERS = {}
-"""Mapping that depending on the date-specifier (key), returns the handler that converts the textual date to date."""
+def unregister_date_conversion_handler(date_specifier_patterns):
+    """Unregisters the handler of a date specifier. Unknown date specifiers are ignored."""
+    regex = DATE_SPECIFIERS_REGEXES.pop(date_specifier_patterns, None)
+    DATE_SPECIFIERS_CONVERSION_HANDLERS.pop(regex, None)
+
+    _update_date_specifiers(date_specifier_patterns, None)
+
+
+def _update_date_specifiers(date_specifier_patterns, handler):
+    global _date_specifiers_matcher
+
+    patterns_and_handlers = [
+        (patterns, registered_handler)
+        for patterns, registered_handler in _date_specifier_patterns_and_handlers
+        if patterns != date_specifier_patterns
+    ]
+    if handler is not None:
+        patterns_and_handlers.append((date_specifier_patterns, handler))
+    _date_specifier_patterns_and_handlers[:] = patterns_and_handlers
+
+    _date_specifiers_matcher = _DateSpecifiersMatcher(patterns_and_handlers)
+    _converted_date_specifiers.clear()
+    bump_config_generation()
+
+
+def convert_date_specifier(value):
+    """Converts a value starting with a date specifier (e.g. ``today - 2``) to a date string.
+
+    Returns:
+        six.text_type: The date, or None if value doesn't start with a registered date specifier.
+    """
+    matcher = _date_specifiers_matcher
+    if not value or matcher.regex is None or \
+            (matcher.first_characters is not None and value[0] not in matcher.first_characters):
+        return None
+
+    regexp_match = matcher.regex.match(value)
+    if not regexp_match:
+        return None
+
+    cache_key = (date.today(), value)
+    converted_date = _converted_date_specifiers.get(cache_key)
+    if converted_date is not None:
+        return converted_date
+
+    relative_date_specifier_suffix = value.split(regexp_match.group())[1]
+    converted_date = str(matcher.handlers[regexp_match.lastgroup](relative_date_specifier_suffix))
+    _converted_date_specifiers.set(cache_key, converted_date)
+    return converted_date
 
 
 def _extract_number_from_text(text):
@@ -168,8 +371,11 @@ def _convert_date_to_string(start_date, relative_delta=None):
     return str(start_date - relative_delta) if relative_delta is not None else str(start_date)
 
 
+# The handlers import ``dateutil.relativedelta`` on first use, since it's only needed by date specifier queries.
 @register_date_conversion_handler(DATE_TODAY_REGEX_PATTERN)
 def convert_today_date_specifier(relative_date_specifier_suffix):
+    from dateutil.relativedelta import relativedelta
+
     start_date = date.today()
     relative_delta = (
         relativedelta(days=_extract_number_from_text(relative_date_specifier_suffix))
@@ -181,6 +387,8 @@ def convert_today_date_specifier(relative_date_specifier_suffix):
 
 @register_date_conversion_handler(DATE_YESTERDAY_REGEX_PATTERN)
 def convert_yesterday_date_specifier(relative_date_specifier_suffix):
+    from dateutil.relativedelta import relativedelta
+
     start_date = date.today() - relativedelta(days=1)
     relative_delta = (
         relativedelta(days=_extract_number_from_text(relative_date_specifier_suffix))
@@ -192,6 +400,8 @@ def convert_yesterday_date_specifier(relative_date_specifier_suffix):
 
 @register_date_conversion_handler(DATE_THIS_MONTH_REGEX_PATTERN)
 def convert_this_month_date(relative_date_specifier_suffix):
+    from dateutil.relativedelta import relativedelta
+
     start_date = date.today()
     relative_delta = (
         relativedelta(months=_extract_number_from_text(relative_date_specifier_suffix))
@@ -203,6 +413,8 @@ def convert_this_month_date(relative_date_specifier_suffix):
 
 @register_date_conversion_handler(DATE_LAST_MONTH_REGEX_PATTERN)
 def convert_last_month_date(relative_date_specifier_suffix):
+    from dateutil.relativedelta import relativedelta
+
     start_date = date.today() - relativedelta(months=1)
     relative_delta = (
         relativedelta(months=_extract_number_from_text(relative_date_specifier_suffix))
@@ -249,6 +461,48 @@ def _truncate_wildcard_from_date(date_value):
     return '-'.join(date_parts)
 
 
+DATE_NORMALIZATION_CACHE_SIZE = 4096
+"""Number of distinct date values whose parsed :class:`PartialDate` is kept."""
+
+ISO_DATE_REGEX = re.compile(r'^([1-9]\d{3})(?:-(0?[1-9]|1[0-2])(?:-(0?[1-9]|[12]\d|3[01]))?)?$')
+"""Matches ``YYYY``, ``YYYY-MM`` and ``YYYY-MM-DD`` dates, the latter two also with single digit months and days."""
+
+_parsed_date_values = LRUCache(DATE_NORMALIZATION_CACHE_SIZE)
+
+
+def _parse_date_value(date_value):
+    """Parses date_value like ``PartialDate.parse``, without going through ``dateutil`` for ISO dates.
+
+    Returns:
+        PartialDate: The parsed date, None if it's not a date.
+    """
+    # Imported here (and in the other date helpers), since ``inspire_utils.date`` imports ``babel``, which is slow to
+    # import and only needed by date queries.
+    from inspire_utils.date import PartialDate
+
+    iso_date_match = ISO_DATE_REGEX.match(date_value)
+    if iso_date_match:
+        year, month, day = (int(part) if part else None for part in iso_date_match.groups())
+        try:
+            return PartialDate(year, month, day)
+        except ValueError:
+            pass  # E.g. '2017-02-30', let ``PartialDate.parse`` reject it.
+
+    try:
+        return PartialDate.parse(date_value)
+    except ValueError:
+        return None
+
+
+def parse_date_value(date_value):
+    """Returns the :class:`PartialDate` of date_value, or None if it's not a date, from a LRU cache."""
+    partial_date = _parsed_date_values.get(date_value)
+    if partial_date is None:
+        partial_date = _parse_date_value(date_value) or False
+        _parsed_date_values.set(date_value, partial_date)
+    return partial_date or None
+
+
 def _truncate_date_value_according_on_date_field(field, date_value):
     """Truncates date value (to year only) according to the given date field.
 
@@ -264,13 +518,14 @@ def _truncate_date_value_according_on_date_field(field, date_value):
         value is used. This is needed for ElasticSearch to be able to do comparisons on dates that have only year, which
         fails if being queried with a date with more .
     """
-    try:
-        partial_date = PartialDate.parse(date_value)
-    except ValueError:
+    partial_date = parse_date_value(date_value)
+    if partial_date is None:
         return None
 
     if field in ES_MAPPING_HEP_DATE_ONLY_YEAR:
-        truncated_date = PartialDate.from_parts(partial_date.year)
+        from inspire_utils.date import PartialDate
+
+        truncated_date = PartialDate(partial_date.year)
     else:
         truncated_date = partial_date
 
@@ -286,19 +541,17 @@ def _get_next_date_from_partial_date(partial_date):
     Returns:
         PartialDate: The next date from the given partial date.
     """
-    relativedelta_arg = 'years'
+    from inspire_utils.date import PartialDate
 
-    if partial_date.month:
-        relativedelta_arg = 'months'
     if partial_date.day:
-        relativedelta_arg = 'days'
+        next_date = date(partial_date.year, partial_date.month, partial_date.day) + timedelta(days=1)
+        return PartialDate(next_date.year, next_date.month, next_date.day)
 
-    next_date = parse(partial_date.dumps()) + relativedelta(**{relativedelta_arg: 1})
-    return PartialDate.from_parts(
-        next_date.year,
-        next_date.month if partial_date.month else None,
-        next_date.day if partial_date.day else None
-    )
+    if partial_date.month:
+        year, zero_based_month = divmod(partial_date.year * 12 + partial_date.month, 12)
+        return PartialDate(year, zero_based_month + 1)
+
+    return PartialDate(partial_date.year + 1)
 
 
 def _get_proper_elastic_search_date_rounding_format(partial_date):
@@ -361,6 +614,69 @@ def update_date_value_in_operator_value_pairs_for_fieldname(field, operator_valu
     return updated_operator_value_pairs
 
 
+# #### Journal queries related utils ####
+JOURNAL_CONVERSION_CACHE_SIZE = 1024
+"""Number of distinct journal query values whose new publication info is kept."""
+
+_converted_journal_query_values = LRUCache(JOURNAL_CONVERSION_CACHE_SIZE)
+
+
+def convert_journal_query_value(publication_info_keys, journal_query_value):
+    """Converts a journal query value (old publication info, e.g. ``Phys.Rev,D85,1``) to the new publication info.
+
+    Args:
+        publication_info_keys (tuple): The publication info keys of the comma-separated parts of the value.
+        journal_query_value (six.text_type): The value.
+
+    Returns:
+        dict: The new publication info, shared between the calls for the same value, thus it must not be modified.
+
+    Notes:
+        The conversions are looked up in a LRU cache of the most recent distinct values first, then in the
+        precomputed journal title table, if one has been set with
+        :func:`inspire_query_parser.journal_titles.set_journal_title_table`, and only then done with
+        ``inspire_schemas.utils.convert_old_publication_info_to_new``. The cached conversions are keyed by the
+        configuration generation too, so that they aren't reused once another table is set.
+    """
+    cache_key = (get_config_generation(), publication_info_keys, journal_query_value)
+    new_publication_info = _converted_journal_query_values.get(cache_key)
+    if new_publication_info is not None:
+        return new_publication_info
+
+    old_publication_info = {
+        key: value
+        for key, value
+        in zip(publication_info_keys, split_journal_query_value(journal_query_value))
+        if value
+    }
+
+    journal_title_table = get_journal_title_table()
+    if journal_title_table is not None:
+        new_publication_info = journal_title_table.convert(old_publication_info)
+
+    if new_publication_info is None:
+        # Imported here, since importing ``inspire_schemas.utils`` takes longer than all the rest of the package.
+        from inspire_schemas.utils import convert_old_publication_info_to_new
+
+        # We are always assuming that the returned list will not be empty. In the situation of a journal query with no
+        # value, a malformed query will be generated instead.
+        new_publication_info = convert_old_publication_info_to_new([old_publication_info])[0]
+
+    _converted_journal_query_values.set(cache_key, new_publication_info)
+    return new_publication_info
+
+
+_inspire_utils_force_list = None
+
+
+def force_list(data):
+    """``inspire_utils.helpers.force_list``, imported on first use, since ``inspire_utils.helpers`` imports ``lxml``."""
+    global _inspire_utils_force_list
+    if _inspire_utils_force_list is None:
+        from inspire_utils.helpers import force_list as _inspire_utils_force_list
+    return _inspire_utils_force_list(data)
+
+
 # #### Generic ElasticSearch DSL generation helpers ####
 def generate_match_query(field, value, with_operator_and):
     """Helper for generating a match query.
@@ -30,15 +30,12 @@ from __future__ import absolute_import, unicode_literals
 from itertools import product
 import logging
 from pypeg2 import whitespace
-import re
 import six
 from unicodedata import normalize
 
-from inspire_schemas.utils import convert_old_publication_info_to_new
-from inspire_utils.helpers import force_list
-from inspire_utils.name import normalize_name
-
 from inspire_query_parser import ast
+from inspire_query_parser.author_dictionary import get_author_dictionary
+from inspire_query_parser.caching import bump_config_generation
 from inspire_query_parser.config import (
     DEFAULT_ES_OPERATOR_FOR_MALFORMED_QUERIES,
     ES_MUST_QUERY,
@@ -46,10 +43,12 @@ from inspire_query_parser.config import (
 from inspire_query_parser.utils.visitor_utils import (
     ES_RANGE_EQ_OPERATOR,
     _truncate_date_value_according_on_date_field,
+    BAI_REGEX,
     _truncate_wildcard_from_date,
-    author_name_contains_fullnames,
+    analyze_author_name,
+    convert_journal_query_value,
+    force_list,
     generate_match_query,
-    generate_minimal_name_variations,
     generate_nested_query,
     update_date_value_in_operator_value_pairs_for_fieldname,
     wrap_queries_in_bool_clauses_if_more_than_one,
@@ -64,6 +63,14 @@ class FieldVariations(object):
     raw = 'raw'
 
 
+class ValueTypes(object):
+    """Value node types whose query generation can be customized per keyword, see ``KEYWORD_HANDLERS``."""
+    value = 'value'
+    wildcard_value = 'wildcard_value'
+    exact_match_value = 'exact_match_value'
+    partial_match_value = 'partial_match_value'
+
+
 class ElasticSearchVisitor(Visitor):
     """Converts a parse tree to an ElasticSearch query.
 
@@ -137,8 +144,13 @@ class ElasticSearchVisitor(Visitor):
 
     AUTHORS_NAME_VARIATIONS_FIELD = 'authors.name_variations'
     AUTHORS_BAI_FIELD = 'authors.ids.value'
-    BAI_REGEX = re.compile(r'^((\w|-|\')+\.)+\d+$', re.UNICODE | re.IGNORECASE)
+    BAI_REGEX = BAI_REGEX
     AUTHORS_NESTED_QUERY_PATH = 'authors'
+    AUTHOR_FILTER_STRATEGY_PRODUCT = 'product'
+    AUTHOR_FILTER_STRATEGY_COMPACT = 'compact'
+    AUTHOR_FILTER_STRATEGY = AUTHOR_FILTER_STRATEGY_PRODUCT
+    """How :meth:`_generate_author_query` filters on the name variations, see there. Change it with
+    :meth:`set_author_filter_strategy`, which also invalidates the cached translations."""
     DATE_NESTED_FIELDS = [
         'publication_info.year',
     ]
@@ -167,10 +179,10 @@ class ElasticSearchVisitor(Visitor):
         if bai_field_variation not in (FieldVariations.search, FieldVariations.raw):
             raise ValueError('Non supported field variation "{}".'.format(bai_field_variation))
 
-        normalized_author_name = normalize_name(node_value).strip('.')
+        author_name_analysis = analyze_author_name(node_value)
+        normalized_author_name = author_name_analysis.normalized_name.strip('.')
 
-        if ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['author'] and \
-                ElasticSearchVisitor.BAI_REGEX.match(node_value):
+        if ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['author'] and author_name_analysis.is_bai:
             return [ElasticSearchVisitor.AUTHORS_BAI_FIELD + '.' + bai_field_variation]
 
         elif not whitespace.search(normalized_author_name) and \
@@ -194,16 +206,56 @@ class ElasticSearchVisitor(Visitor):
 
             Additionally, doing a ``match`` with ``"operator": "and"`` in order to be even more exact in our search, by
             requiring that ``full_name`` field contains both
+
+            The name variations are looked up in the precomputed author dictionary first, if one has been set with
+            :func:`inspire_query_parser.author_dictionary.set_author_dictionary`.
+
+            With the ``product`` ``AUTHOR_FILTER_STRATEGY`` (the default), a full name filter has one clause per pair
+            of name variations. The ``compact`` strategy generates the equivalent filter of a ``terms`` query on the
+            name variations and the ``match`` queries of the distinct name variations, i.e. a linear number of clauses.
         """
-        name_variations = [name_variation.lower()
-                           for name_variation
-                           in generate_minimal_name_variations(author_name)]
+        author_dictionary = get_author_dictionary()
+        author_dictionary_entry = author_dictionary.get(author_name) if author_dictionary is not None else None
+        if author_dictionary_entry is not None:
+            name_variations = author_dictionary_entry.name_variations
+            contains_fullnames = author_dictionary_entry.contains_fullnames
+        else:
+            author_name_analysis = analyze_author_name(author_name)
+            name_variations = [name_variation.lower()
+                               for name_variation
+                               in author_name_analysis.minimal_name_variations]
+            contains_fullnames = author_name_analysis.contains_fullnames
+
+        if self.AUTHOR_FILTER_STRATEGY == ElasticSearchVisitor.AUTHOR_FILTER_STRATEGY_COMPACT and name_variations:
+            author_filter = self._generate_compact_author_filter(name_variations, contains_fullnames)
+        else:
+            author_filter = {
+                'bool': {
+                    'should': self._generate_product_author_filter(name_variations, contains_fullnames)
+                }
+            }
+
+        query = {
+            'bool': {
+                'filter': author_filter,
+                'must': {
+                    'match': {
+                        ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['author']: author_name
+                    }
+                }
+            }
+        }
 
+        return generate_nested_query(ElasticSearchVisitor.AUTHORS_NESTED_QUERY_PATH, query)
+
+    @staticmethod
+    def _generate_product_author_filter(name_variations, contains_fullnames):
+        """Generates the ``should`` clauses of the ``product`` author filter, see :meth:`_generate_author_query`."""
         # When the query contains sufficient data, i.e. full names, e.g. ``Mele, Salvatore`` (and not ``Mele, S`` or
         # ``Mele``) we can improve our filtering in order to filter out results containing records with authors that
         # have the same non lastnames prefix, e.g. 'Mele, Samuele'.
-        if author_name_contains_fullnames(author_name):
-            specialized_author_filter = [
+        if contains_fullnames:
+            return [
                 {
                     'bool': {
                         'must': [
@@ -221,30 +273,48 @@ class ElasticSearchVisitor(Visitor):
                 in product(name_variations, name_variations)
             ]
 
-        else:
-            # In the case of initials or even single lastname search, filter with only the name variations.
-            specialized_author_filter = [
-                {'term': {ElasticSearchVisitor.AUTHORS_NAME_VARIATIONS_FIELD: name_variation}}
-                for name_variation in name_variations
-            ]
+        # In the case of initials or even single lastname search, filter with only the name variations.
+        return [
+            {'term': {ElasticSearchVisitor.AUTHORS_NAME_VARIATIONS_FIELD: name_variation}}
+            for name_variation in name_variations
+        ]
 
-        query = {
+    @staticmethod
+    def _generate_compact_author_filter(name_variations, contains_fullnames):
+        """Generates the ``compact`` author filter, see :meth:`_generate_author_query`.
+
+        Notes:
+            Some (any) pair of name variations matching, the first one with a ``term`` and the second one with a
+            ``match`` having ``"operator": "and"``, is equivalent to some name variation matching with a ``term`` and
+            some name variation matching with a ``match``. Also, the ``match`` of name variations differing only in the
+            order of their words (e.g. ``ellis john`` and ``john ellis``) require the same tokens, so only the first one,
+            in alphabetical order, is kept.
+        """
+        terms_query = {'terms': {ElasticSearchVisitor.AUTHORS_NAME_VARIATIONS_FIELD: list(name_variations)}}
+        if not contains_fullnames:
+            return terms_query
+
+        match_queries = []
+        seen_words = set()
+        for name_variation in sorted(name_variations):
+            words = frozenset(name_variation.split())
+            if words not in seen_words:
+                seen_words.add(words)
+                match_queries.append(generate_match_query(
+                    ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['author'],
+                    name_variation,
+                    with_operator_and=True
+                ))
+
+        return {
             'bool': {
-                'filter': {
-                    'bool': {
-                        'should': specialized_author_filter
-                    }
-                },
-                'must': {
-                    'match': {
-                        ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['author']: author_name
-                    }
-                }
+                'must': [
+                    terms_query,
+                    match_queries[0] if len(match_queries) == 1 else {'bool': {'should': match_queries}},
+                ]
             }
         }
 
-        return generate_nested_query(ElasticSearchVisitor.AUTHORS_NESTED_QUERY_PATH, query)
-
     def _generate_exact_author_query(self, author_name_or_bai):
         """Generates a term query handling authors and BAIs.
 
@@ -256,14 +326,15 @@ class ElasticSearchVisitor(Visitor):
             E.g. Searching for 'Smith, J.' is the same as searching for: 'Smith, J', 'smith, j.', 'smith j', 'j smith',
             'j. smith', 'J Smith', 'J. Smith'.
         """
-        if ElasticSearchVisitor.BAI_REGEX.match(author_name_or_bai):
+        author_name_analysis = analyze_author_name(author_name_or_bai)
+        if author_name_analysis.is_bai:
             bai = author_name_or_bai.lower()
             query = self._generate_term_query(
                 '.'.join((ElasticSearchVisitor.AUTHORS_BAI_FIELD, FieldVariations.search)),
                 bai
             )
         else:
-            author_name = normalize('NFKC', normalize_name(author_name_or_bai)).lower()
+            author_name = normalize('NFKC', author_name_analysis.normalized_name).lower()
             query = self._generate_term_query(
                 ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['exact-author'],
                 author_name
@@ -484,35 +555,14 @@ class ElasticSearchVisitor(Visitor):
                 & volume, title & volume & artid/page_start}.
 
         Returns:
-            (dict) The new publication info.
+            (dict) The new publication info, which must not be modified, since it's cached.
         """
-        # Prepare old publication info for :meth:`inspire_schemas.utils.convert_old_publication_info_to_new`.
-        publication_info_keys = [
+        publication_info_keys = (
             ElasticSearchVisitor.JOURNAL_TITLE,
             ElasticSearchVisitor.JOURNAL_VOLUME,
             third_journal_field,
-        ]
-        values_list = [
-            value.strip()
-            for value
-            in old_publication_info_values.split(',')
-            if value
-        ]
-
-        old_publication_info = [
-            {
-                key: value
-                for key, value
-                in zip(publication_info_keys, values_list)
-                if value
-            }
-        ]
-
-        # We are always assuming that the returned list will not be empty. In the situation of a journal query with no
-        # value, a malformed query will be generated instead.
-        new_publication_info = convert_old_publication_info_to_new(old_publication_info)[0]
-
-        return new_publication_info
+        )
+        return convert_journal_query_value(publication_info_keys, old_publication_info_values)
 
     def _generate_journal_nested_queries(self, value):
         """Generates ElasticSearch nested query(s).
@@ -569,6 +619,106 @@ class ElasticSearchVisitor(Visitor):
             ElasticSearchVisitor.JOURNAL_FIELDS_PREFIX,
             wrap_queries_in_bool_clauses_if_more_than_one(queries_for_each_field, use_must_clause=True)
         )
+
+    def _resolve_keyword(self, keyword, fieldnames):
+        """Returns the keyword whose handlers apply to a query on fieldnames, or None for unknown keywords."""
+        if keyword in self.KEYWORD_TO_ES_FIELDNAME:
+            return keyword
+        if isinstance(fieldnames, six.string_types):
+            return self.ES_FIELDNAME_TO_KEYWORD.get(fieldnames)
+        return None
+
+    def _generate_wildcard_value_query(self, node, fieldnames):
+        bai_fieldnames = self._generate_fieldnames_if_bai_query(
+            node.value,
+            bai_field_variation=FieldVariations.search,
+            query_bai_field_if_dots_in_name=True
+        )
+
+        return self._generate_query_string_query(
+            node.value,
+            fieldnames=bai_fieldnames or fieldnames,
+            analyze_wildcard=True
+        )
+
+    # #### Keyword handlers, see ``KEYWORD_HANDLERS`` ####
+    def _generate_author_value_query(self, node, fieldnames):
+        bai_fieldnames = self._generate_fieldnames_if_bai_query(
+            node.value,
+            bai_field_variation=FieldVariations.search,
+            query_bai_field_if_dots_in_name=True
+        )
+        if bai_fieldnames:
+            if len(bai_fieldnames) == 1:
+                query = {"match": {bai_fieldnames[0]: node.value}}
+                return generate_nested_query(ElasticSearchVisitor.AUTHORS_NESTED_QUERY_PATH, query)
+            else:
+                # Not an exact BAI pattern match, but node's value looks like BAI (no spaces and dots),
+                # e.g. `S.Mele`. In this case generate a partial match query.
+                return self.visit_partial_match_value(node, bai_fieldnames)
+
+        return self._generate_author_query(node.value)
+
+    def _generate_author_wildcard_value_query(self, node, fieldnames):
+        query = self._generate_wildcard_value_query(node, fieldnames)
+        return generate_nested_query(ElasticSearchVisitor.AUTHORS_NESTED_QUERY_PATH, query)
+
+    def _generate_author_exact_match_value_query(self, node, fieldnames):
+        bai_fieldnames = self._generate_fieldnames_if_bai_query(
+            node.value,
+            bai_field_variation=FieldVariations.raw,
+            query_bai_field_if_dots_in_name=False
+        )
+
+        term_queries = [
+            generate_nested_query(ElasticSearchVisitor.AUTHORS_NESTED_QUERY_PATH, {'term': {field: node.value}})
+            for field in (bai_fieldnames or fieldnames)
+        ]
+        return wrap_queries_in_bool_clauses_if_more_than_one(term_queries, use_must_clause=False)
+
+    def _generate_exact_author_value_query(self, node, fieldnames):
+        return self._generate_exact_author_query(node.value)
+
+    def _generate_date_value_query(self, node, fieldnames):
+        # Date queries with simple values are transformed into range queries, among the given and the exact next date,
+        # according to the granularity of the given date.
+        return self._generate_range_queries(force_list(fieldnames), {ES_RANGE_EQ_OPERATOR: node.value})
+
+    def _generate_date_wildcard_value_query(self, node, fieldnames):
+        return self._generate_date_with_wildcard_query(node.value)
+
+    def _generate_date_exact_match_value_query(self, node, fieldnames):
+        term_queries = []
+        for field in fieldnames:
+            term_query = \
+                {'term': {field: _truncate_date_value_according_on_date_field(field, node.value).dumps()}}
+
+            term_queries.append(
+                generate_nested_query(ElasticSearchVisitor.DATE_NESTED_QUERY_PATH, term_query)
+                if field in ElasticSearchVisitor.DATE_NESTED_FIELDS
+                else term_query
+            )
+        return wrap_queries_in_bool_clauses_if_more_than_one(term_queries, use_must_clause=False)
+
+    def _generate_date_partial_match_value_query(self, node, fieldnames):
+        # Date queries with partial values are transformed into range queries, among the given and the exact next
+        # date, according to the granularity of the given date.
+        if node.contains_wildcard:
+            return self._generate_date_with_wildcard_query(node.value)
+
+        return self._generate_range_queries(force_list(fieldnames), {ES_RANGE_EQ_OPERATOR: node.value})
+
+    def _generate_irn_value_query(self, node, fieldnames):
+        return {'term': {fieldnames: ''.join(('SPIRES-', node.value))}}
+
+    def _generate_journal_value_query(self, node, fieldnames):
+        return self._generate_journal_nested_queries(node.value)
+
+    def _generate_title_value_query(self, node, fieldnames):
+        return self._generate_title_queries(node.value)
+
+    def _generate_type_code_value_query(self, node, fieldnames):
+        return self._generate_type_code_query(node.value)
     # ################
 
     def visit_empty_query(self, node):
@@ -611,23 +761,24 @@ class ElasticSearchVisitor(Visitor):
 
     def visit_keyword_op(self, node):
         # For this visitor, the decision on which type of ElasticSearch query to generate, relies mainly on the leaves.
-        # Thus, the fieldname is propagated to them, so that they generate query type, depending on their type.
-        fieldname = node.left.accept(self)
-        return node.right.accept(self, fieldname)
+        # Thus, the fieldname and the keyword are propagated to them, so that they generate query type, depending on
+        # their type and on the handlers registered for the keyword.
+        fieldnames = node.left.accept(self)
+        return node.right.accept(self, fieldnames, self._resolve_keyword(node.left.value, fieldnames))
 
-    def visit_range_op(self, node, fieldnames):
+    def visit_range_op(self, node, fieldnames, keyword=None):
         return self._generate_range_queries(force_list(fieldnames), {'gte': node.left.value, 'lte': node.right.value})
 
-    def visit_greater_than_op(self, node, fieldnames):
+    def visit_greater_than_op(self, node, fieldnames, keyword=None):
         return self._generate_range_queries(force_list(fieldnames), {'gt': node.op.value})
 
-    def visit_greater_equal_than_op(self, node, fieldnames):
+    def visit_greater_equal_than_op(self, node, fieldnames, keyword=None):
         return self._generate_range_queries(force_list(fieldnames), {'gte': node.op.value})
 
-    def visit_less_than_op(self, node, fieldnames):
+    def visit_less_than_op(self, node, fieldnames, keyword=None):
         return self._generate_range_queries(force_list(fieldnames), {'lt': node.op.value})
 
-    def visit_less_equal_than_op(self, node, fieldnames):
+    def visit_less_equal_than_op(self, node, fieldnames, keyword=None):
         return self._generate_range_queries(force_list(fieldnames), {'lte': node.op.value})
 
     def visit_nested_keyword_op(self, node):  # TODO Cannot be completed as of yet.
@@ -635,102 +786,54 @@ class ElasticSearchVisitor(Visitor):
 
     def visit_keyword(self, node):
         # If no keyword is found, return the original node value (case of an unknown keyword).
-        return ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME.get(node.value, node.value)
+        return self.KEYWORD_TO_ES_FIELDNAME.get(node.value, node.value)
 
-    def visit_value(self, node, fieldnames=None):
+    def visit_value(self, node, fieldnames=None, keyword=None):
         if not fieldnames:
             fieldnames = '_all'
+        if keyword is None:
+            keyword = self._resolve_keyword(None, fieldnames)
 
         if node.contains_wildcard:
-            if ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['date'] == fieldnames:
-                return self._generate_date_with_wildcard_query(node.value)
+            handler = self.KEYWORD_HANDLERS[ValueTypes.wildcard_value].get(keyword)
+            if handler:
+                return handler(self, node, fieldnames)
+            return self._generate_wildcard_value_query(node, fieldnames)
 
-            bai_fieldnames = self._generate_fieldnames_if_bai_query(
-                node.value,
-                bai_field_variation=FieldVariations.search,
-                query_bai_field_if_dots_in_name=True
-            )
+        handler = self.KEYWORD_HANDLERS[ValueTypes.value].get(keyword)
+        if handler:
+            return handler(self, node, fieldnames)
 
-            query = self._generate_query_string_query(
-                node.value,
-                fieldnames=bai_fieldnames or fieldnames,
-                analyze_wildcard=True
-            )
-
-            if ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['author'] == fieldnames:
-                return generate_nested_query(ElasticSearchVisitor.AUTHORS_NESTED_QUERY_PATH, query)
-            return query
-        else:
-            if isinstance(fieldnames, list):
-                if ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['date'] == fieldnames:
-                    # Date queries with simple values are transformed into range queries, among the given and the exact
-                    # next date, according to the granularity of the given date.
-                    return self._generate_range_queries(force_list(fieldnames), {ES_RANGE_EQ_OPERATOR: node.value})
-
-                if ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['journal'] == fieldnames:
-                    return self._generate_journal_nested_queries(node.value)
-
-                return {
-                    'multi_match': {
-                        'fields': fieldnames,
-                        'query': node.value,
-                    }
+        if isinstance(fieldnames, list):
+            return {
+                'multi_match': {
+                    'fields': fieldnames,
+                    'query': node.value,
                 }
-            else:
-                if ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['author'] == fieldnames:
-                    bai_fieldnames = self._generate_fieldnames_if_bai_query(
-                        node.value,
-                        bai_field_variation=FieldVariations.search,
-                        query_bai_field_if_dots_in_name=True
-                    )
-                    if bai_fieldnames:
-                        if len(bai_fieldnames) == 1:
-                            query = {"match": {bai_fieldnames[0]: node.value}}
-                            return generate_nested_query(ElasticSearchVisitor.AUTHORS_NESTED_QUERY_PATH, query)
-                        else:
-                            # Not an exact BAI pattern match, but node's value looks like BAI (no spaces and dots),
-                            # e.g. `S.Mele`. In this case generate a partial match query.
-                            return self.visit_partial_match_value(node, bai_fieldnames)
-
-                    return self._generate_author_query(node.value)
-
-                elif ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['exact-author'] == fieldnames:
-                    return self._generate_exact_author_query(node.value)
-
-                elif ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['irn'] == fieldnames:
-                    return {'term': {fieldnames: ''.join(('SPIRES-', node.value))}}
-
-                elif ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['title'] == fieldnames:
-                    return self._generate_title_queries(node.value)
-
-                elif ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['type-code'] == fieldnames:
-                    return self._generate_type_code_query(node.value)
+            }
 
-                elif fieldnames not in ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME.values():
-                    colon_value = ':'.join([fieldnames, node.value])
-                    given_field_query = generate_match_query(fieldnames, node.value, with_operator_and=True)
-                    texkey_query = self._generate_term_query('texkeys.raw', colon_value, boost=2.0)
-                    _all_field_query = generate_match_query('_all', colon_value, with_operator_and=True)
-                    return wrap_queries_in_bool_clauses_if_more_than_one([given_field_query, texkey_query, _all_field_query],
-                                                                         use_must_clause=False)
+        if keyword is None:
+            colon_value = ':'.join([fieldnames, node.value])
+            given_field_query = generate_match_query(fieldnames, node.value, with_operator_and=True)
+            texkey_query = self._generate_term_query('texkeys.raw', colon_value, boost=2.0)
+            _all_field_query = generate_match_query('_all', colon_value, with_operator_and=True)
+            return wrap_queries_in_bool_clauses_if_more_than_one([given_field_query, texkey_query, _all_field_query],
+                                                                 use_must_clause=False)
 
-                return generate_match_query(fieldnames, node.value, with_operator_and=True)
+        return generate_match_query(fieldnames, node.value, with_operator_and=True)
 
-    def visit_exact_match_value(self, node, fieldnames=None):
+    def visit_exact_match_value(self, node, fieldnames=None, keyword=None):
         """Generates a term query (exact search in ElasticSearch)."""
         if not fieldnames:
             fieldnames = ['_all']
         else:
             fieldnames = force_list(fieldnames)
+        if keyword is None:
+            keyword = self._resolve_keyword(None, fieldnames[0] if len(fieldnames) == 1 else None)
 
-        if ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['exact-author'] == fieldnames[0]:
-            return self._generate_exact_author_query(node.value)
-
-        elif ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['type-code'] == fieldnames[0]:
-            return self._generate_type_code_query(node.value)
-
-        elif ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['journal'] == fieldnames:
-            return self._generate_journal_nested_queries(node.value)
+        handler = self.KEYWORD_HANDLERS[ValueTypes.exact_match_value].get(keyword)
+        if handler:
+            return handler(self, node, fieldnames)
 
         bai_fieldnames = self._generate_fieldnames_if_bai_query(
             node.value,
@@ -738,45 +841,17 @@ class ElasticSearchVisitor(Visitor):
             query_bai_field_if_dots_in_name=False
         )
 
-        if ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['date'] == fieldnames:
-            term_queries = []
-            for field in fieldnames:
-                term_query =  \
-                    {'term': {field: _truncate_date_value_according_on_date_field(field, node.value).dumps()}}
-
-                term_queries.append(
-                    generate_nested_query(ElasticSearchVisitor.DATE_NESTED_QUERY_PATH, term_query)
-                    if field in ElasticSearchVisitor.DATE_NESTED_FIELDS
-                    else term_query
-                )
-        elif ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['author'] in fieldnames:
-            term_queries = [
-                generate_nested_query(ElasticSearchVisitor.AUTHORS_NESTED_QUERY_PATH, {'term': {field: node.value}})
-                for field in (bai_fieldnames or fieldnames)
-            ]
-        else:
-            term_queries = [{'term': {field: node.value}} for field in (bai_fieldnames or fieldnames)]
-
+        term_queries = [{'term': {field: node.value}} for field in (bai_fieldnames or fieldnames)]
         return wrap_queries_in_bool_clauses_if_more_than_one(term_queries, use_must_clause=False)
 
-    def visit_partial_match_value(self, node, fieldnames=None):
+    def visit_partial_match_value(self, node, fieldnames=None, keyword=None):
         """Generates a query which looks for a substring of the node's value in the given fieldname."""
-        if ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['date'] == fieldnames:
-            # Date queries with partial values are transformed into range queries, among the given and the exact
-            # next date, according to the granularity of the given date.
-            if node.contains_wildcard:
-                return self._generate_date_with_wildcard_query(node.value)
+        if keyword is None:
+            keyword = self._resolve_keyword(None, fieldnames)
 
-            return self._generate_range_queries(force_list(fieldnames), {ES_RANGE_EQ_OPERATOR: node.value})
-
-        if ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['exact-author'] == fieldnames:
-            return self._generate_exact_author_query(node.value)
-
-        elif ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['type-code'] == fieldnames:
-            return self._generate_type_code_query(node.value)
-
-        elif ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['journal'] == fieldnames:
-            return self._generate_journal_nested_queries(node.value)
+        handler = self.KEYWORD_HANDLERS[ValueTypes.partial_match_value].get(keyword)
+        if handler:
+            return handler(self, node, fieldnames)
 
         # Add wildcard token as prefix and suffix.
         value = \
@@ -799,14 +874,110 @@ class ElasticSearchVisitor(Visitor):
 
         return query
 
-    def visit_regex_value(self, node, fieldname):
+    def visit_regex_value(self, node, fieldname, keyword=None):
         query = {
             'regexp': {
                 fieldname: node.value
             }
         }
 
-        if ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME['author'] == fieldname:
+        if keyword is None:
+            keyword = self._resolve_keyword(None, fieldname)
+        if keyword == 'author':
             return generate_nested_query(ElasticSearchVisitor.AUTHORS_NESTED_QUERY_PATH, query)
 
         return query
+
+    # #### Keyword handlers ####
+    KEYWORD_HANDLERS = {
+        ValueTypes.value: {
+            'author': _generate_author_value_query,
+            'date': _generate_date_value_query,
+            'exact-author': _generate_exact_author_value_query,
+            'irn': _generate_irn_value_query,
+            'journal': _generate_journal_value_query,
+            'title': _generate_title_value_query,
+            'type-code': _generate_type_code_value_query,
+        },
+        ValueTypes.wildcard_value: {
+            'author': _generate_author_wildcard_value_query,
+            'date': _generate_date_wildcard_value_query,
+        },
+        ValueTypes.exact_match_value: {
+            'author': _generate_author_exact_match_value_query,
+            'date': _generate_date_exact_match_value_query,
+            'exact-author': _generate_exact_author_value_query,
+            'journal': _generate_journal_value_query,
+            'type-code': _generate_type_code_value_query,
+        },
+        ValueTypes.partial_match_value: {
+            'date': _generate_date_partial_match_value_query,
+            'exact-author': _generate_exact_author_value_query,
+            'journal': _generate_journal_value_query,
+            'type-code': _generate_type_code_value_query,
+        },
+    }
+    """Mapping from value type (see :class:`ValueTypes`) to a mapping from keyword to the handler generating the query.
+
+    A handler is called as ``handler(visitor, node, fieldnames)``, with ``node`` being the value node and
+    ``fieldnames`` the keyword's ElasticSearch field(s). Values of keywords without a handler are queried generically.
+    Use :meth:`register_keyword_handler` for adding handlers.
+    """
+
+    ES_FIELDNAME_TO_KEYWORD = {
+        fieldnames: keyword
+        for keyword, fieldnames in KEYWORD_TO_ES_FIELDNAME.items()
+        if isinstance(fieldnames, six.string_types)
+    }
+    """Reverse of :attr:`KEYWORD_TO_ES_FIELDNAME`, for keywords mapped to a single field.
+
+    Queries on a fieldname given as keyword (e.g. ``authors.full_name:ellis``) are handled like its keyword's queries.
+    """
+
+    @classmethod
+    def register_keyword_handler(cls, keyword, value_type, handler, fieldnames=None):
+        """Registers a handler generating the queries of a keyword, for one value type.
+
+        Args:
+            keyword (six.text_type): The keyword, as found in the restructured parse tree (e.g. ``author``). Keywords
+                unknown to the grammar can be queried in the ``keyword:value`` form.
+            value_type (six.text_type): One of the :class:`ValueTypes`.
+            handler (callable): Called as ``handler(visitor, node, fieldnames)``, returns the ElasticSearch query.
+            fieldnames (six.text_type or list): If given, the ElasticSearch field(s) the keyword maps to.
+
+        Notes:
+            Registering on a subclass doesn't affect its parent classes.
+        """
+        if value_type not in cls.KEYWORD_HANDLERS:
+            raise ValueError('Unknown value type "{}".'.format(value_type))
+
+        if 'KEYWORD_HANDLERS' not in cls.__dict__:
+            cls.KEYWORD_HANDLERS = {
+                handlers_value_type: dict(handlers)
+                for handlers_value_type, handlers in cls.KEYWORD_HANDLERS.items()
+            }
+        cls.KEYWORD_HANDLERS[value_type][keyword] = handler
+
+        if fieldnames is not None:
+            if 'KEYWORD_TO_ES_FIELDNAME' not in cls.__dict__:
+                cls.KEYWORD_TO_ES_FIELDNAME = dict(cls.KEYWORD_TO_ES_FIELDNAME)
+                cls.ES_FIELDNAME_TO_KEYWORD = dict(cls.ES_FIELDNAME_TO_KEYWORD)
+            cls.KEYWORD_TO_ES_FIELDNAME[keyword] = fieldnames
+            if isinstance(fieldnames, six.string_types):
+                cls.ES_FIELDNAME_TO_KEYWORD[fieldnames] = keyword
+
+        bump_config_generation()
+
+    @classmethod
+    def set_author_filter_strategy(cls, author_filter_strategy):
+        """Sets the :attr:`AUTHOR_FILTER_STRATEGY`.
+
+        Args:
+            author_filter_strategy (six.text_type): Either :attr:`AUTHOR_FILTER_STRATEGY_PRODUCT` or
+                :attr:`AUTHOR_FILTER_STRATEGY_COMPACT`.
+        """
+        if author_filter_strategy not in (cls.AUTHOR_FILTER_STRATEGY_PRODUCT, cls.AUTHOR_FILTER_STRATEGY_COMPACT):
+            raise ValueError('Unknown author filter strategy "{}".'.format(author_filter_strategy))
+
+        cls.AUTHOR_FILTER_STRATEGY = author_filter_strategy
+        bump_config_generation()
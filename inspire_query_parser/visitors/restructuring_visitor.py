@@ -29,6 +29,7 @@ Additionally, the date specifier conversion handlers logic is defined.
 
 from __future__ import absolute_import, unicode_literals
 
+import copy
 import logging
 
 from inspire_query_parser import ast
@@ -38,8 +39,7 @@ from inspire_query_parser.ast import (AndOp, ExactMatchValue, Keyword,
                                       QueryWithMalformedPart, RegexValue, ValueOp)
 from inspire_query_parser.parser import (And, ComplexValue,
                                          SimpleValueBooleanQuery)
-from inspire_query_parser.utils.visitor_utils import \
-    DATE_SPECIFIERS_CONVERSION_HANDLERS
+from inspire_query_parser.utils.visitor_utils import convert_date_specifier
 from inspire_query_parser.visitors.visitor_impl import Visitor
 
 logger = logging.getLogger(__name__)
@@ -58,6 +58,8 @@ def _restructure_if_volume_follows_journal(left, right):
     Notes:
         This happens to support queries like "journal Phys.Rev. and vol d85". Appends the value of KeywordOp with
         Keyword 'volume' and discards 'volume' KeywordOp node from the tree.
+
+        The journal KeywordOp isn't modified, a new one is created with the appended value.
     """
     def _get_volume_keyword_op_and_remaining_subtree(right_subtree):
         if isinstance(right_subtree, NotOp) and isinstance(right_subtree.op, KeywordOp) \
@@ -82,7 +84,9 @@ def _restructure_if_volume_follows_journal(left, right):
 
     volume_node, remaining_subtree = volume_and_remaining_subtree
     if volume_node:
-        left.right.value = ','.join([journal_value, volume_node.right.value])
+        journal_value_node = copy.copy(left.right)
+        journal_value_node.value = ','.join([journal_value, volume_node.right.value])
+        left = KeywordOp(left.left, journal_value_node)
 
     return AndOp(left, remaining_subtree) if remaining_subtree else left
 
@@ -118,6 +122,61 @@ def _convert_simple_value_boolean_query_to_and_boolean_queries(tree, keyword):
     return new_tree_root
 
 
+def restructure_query(children):
+    """Restructures a :class:`Query`, given its restructured children."""
+    if len(children) == 1:
+        result = children[0]
+        if isinstance(result, (ast.Value, ast.ExactMatchValue)) \
+                or isinstance(result, ast.PartialMatchValue) \
+                or isinstance(result, ast.RegexValue):
+            # The only Values that can be standalone queries are the above.
+            return ast.ValueOp(result)
+        return result
+
+    # Case in which we have both a recognized query and a malformed one.
+    return QueryWithMalformedPart(children[0], children[1])
+
+
+def restructure_boolean_query(left, right, bool_op):
+    """Converts a :class:`BooleanQuery`, given its restructured operands, into an AndOp or OrOp node."""
+    is_journal_keyword_op = isinstance(left, KeywordOp) and left.left == Keyword('journal')
+
+    if is_journal_keyword_op:
+        journal_and_volume_conjunction = _restructure_if_volume_follows_journal(left, right)
+
+        if journal_and_volume_conjunction:
+            return journal_and_volume_conjunction
+
+    return AndOp(left, right) if isinstance(bool_op, And) else OrOp(left, right)
+
+
+def restructure_simple_query(op):
+    """Restructures a :class:`SimpleQuery`, given its restructured op."""
+    if isinstance(op, SimpleValueBooleanQuery):
+        # Case in which the node is a simple value boolean query not paired with a keyword query. e.g. 'foo and bar'
+        return _convert_simple_value_boolean_query_to_and_boolean_queries(op, None)
+    elif isinstance(op, ast.Value):
+        # Case in which the node is a SimpleQuery(Value(...)) e.g. for a value query "Ellis"
+        return ast.ValueOp(op)
+
+    return op
+
+
+def restructure_keyword_query(keyword, value):
+    """Transforms a keyword query, given its restructured keyword and value, into a :class:`KeywordOp`.
+
+    Notes:
+        In case the value being a :class:`SimpleValueBooleanQuery`, the subtree is transformed to chained
+        :class:`AndOp` queries containing :class:`KeywordOp`, whose keyword is the keyword of the current node and
+        values, all the :class:`SimpleValueBooleanQuery` values (either :class:`SimpleValues` or
+        :class:`SimpleValueNegation`.)
+    """
+    if isinstance(value, SimpleValueBooleanQuery):
+        return _convert_simple_value_boolean_query_to_and_boolean_queries(value, keyword)
+
+    return KeywordOp(keyword, value)
+
+
 class RestructuringVisitor(Visitor):
     """Converts the output of the parser to a more compact and restructured parse tree.
 
@@ -130,20 +189,7 @@ class RestructuringVisitor(Visitor):
         return ast.NotOp(node.op.accept(self))
 
     def visit_query(self, node):
-        result = [child.accept(self) for child in node.children]
-
-        if len(result) == 1:
-            result = result[0]
-            if isinstance(result, (ast.Value, ast.ExactMatchValue)) \
-                    or isinstance(result, ast.PartialMatchValue) \
-                    or isinstance(result, ast.RegexValue):
-                # The only Values that can be standalone queries are the above.
-                return ast.ValueOp(result)
-        else:
-            # Case in which we have both a recognized query and a malformed one.
-            return QueryWithMalformedPart(result[0], result[1])
-
-        return result
+        return restructure_query([child.accept(self) for child in node.children])
 
     def visit_malformed_query_words(self, node):
         return ast.MalformedQuery(node.children)
@@ -159,18 +205,7 @@ class RestructuringVisitor(Visitor):
 
     def visit_boolean_query(self, node):
         """Convert BooleanRule into AndOp or OrOp nodes."""
-        left = node.left.accept(self)
-        right = node.right.accept(self)
-
-        is_journal_keyword_op = isinstance(left, KeywordOp) and left.left == Keyword('journal')
-
-        if is_journal_keyword_op:
-            journal_and_volume_conjunction = _restructure_if_volume_follows_journal(left, right)
-
-            if journal_and_volume_conjunction:
-                return journal_and_volume_conjunction
-
-        return AndOp(left, right) if isinstance(node.bool_op, And) else OrOp(left, right)
+        return restructure_boolean_query(node.left.accept(self), node.right.accept(self), node.bool_op)
 
     def visit_simple_value_boolean_query(self, node):
         """
@@ -190,15 +225,7 @@ class RestructuringVisitor(Visitor):
         return self._create_not_op(node)
 
     def visit_simple_query(self, node):
-        node = node.op.accept(self)
-        if isinstance(node, SimpleValueBooleanQuery):
-            # Case in which the node is a simple value boolean query not paired with a keyword query. e.g. 'foo and bar'
-            return _convert_simple_value_boolean_query_to_and_boolean_queries(node, None)
-        elif isinstance(node, ast.Value):
-            # Case in which the node is a SimpleQuery(Value(...)) e.g. for a value query "Ellis"
-            return ast.ValueOp(node)
-
-        return node
+        return restructure_simple_query(node.op.accept(self))
 
     def visit_not_query(self, node):
         return self._create_not_op(node)
@@ -212,13 +239,7 @@ class RestructuringVisitor(Visitor):
             values, all the :class:`SimpleValueBooleanQuery` values (either :class:`SimpleValues` or
             :class:`SimpleValueNegation`.)
         """
-        keyword = node.left.accept(self)
-        value = node.right.accept(self)
-
-        if isinstance(value, SimpleValueBooleanQuery):
-            return _convert_simple_value_boolean_query_to_and_boolean_queries(value, keyword)
-
-        return KeywordOp(keyword, value)
+        return restructure_keyword_query(node.left.accept(self), node.right.accept(self))
 
     def visit_invenio_keyword_query(self, node):
         """Transform an :class:`InvenioKeywordQuery` into a :class:`KeywordOp`.
@@ -235,12 +256,7 @@ class RestructuringVisitor(Visitor):
             # The keywords whose values aren't an InspireKeyword are simple strings.
             keyword = Keyword(node.left)
 
-        value = node.right.accept(self)
-
-        if isinstance(value, SimpleValueBooleanQuery):
-            return _convert_simple_value_boolean_query_to_and_boolean_queries(value, keyword)
-
-        return KeywordOp(keyword, value)
+        return restructure_keyword_query(keyword, node.right.accept(self))
 
     def visit_nested_keyword_query(self, node):
         return ast.NestedKeywordOp(Keyword(node.left), node.right.accept(self))
@@ -303,12 +319,9 @@ class RestructuringVisitor(Visitor):
 
     def visit_simple_value(self, node):
         # In case of date specifiers convert relative or text date to normal date.
-        for regexp, date_conversion_handler in DATE_SPECIFIERS_CONVERSION_HANDLERS.items():
-            date_value = node.value
-            regexp_match = regexp.match(node.value)
-            if regexp_match:
-                relative_date_specifier_suffix = date_value.split(regexp_match.group())[1]
-                return ast.Value(str(date_conversion_handler(relative_date_specifier_suffix)))
+        converted_date = convert_date_specifier(node.value)
+        if converted_date is not None:
+            return ast.Value(converted_date)
 
         # Normal text value
         return ast.Value(node.value, True if ast.GenericValue.WILDCARD_TOKEN in node.value else False)
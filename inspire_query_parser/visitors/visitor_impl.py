@@ -38,8 +38,16 @@ def camel_to_snake_case(name):
     return all_cap_re.sub(r'\1_\2', s1).lower()
 
 
+_visitor_method_names = {}
+"""Cache of the visitor method name of each node class."""
+
+
 class Visitor(object):
     def visit(self, node, *args, **kwargs):
-        method_name = 'visit_{}'.format(camel_to_snake_case(type(node).__name__))
+        node_type = type(node)
+        try:
+            method_name = _visitor_method_names[node_type]
+        except KeyError:
+            method_name = _visitor_method_names[node_type] = 'visit_{}'.format(camel_to_snake_case(node_type.__name__))
         visitor_method = getattr(self, method_name)
         return visitor_method(node, *args, **kwargs)
@@ -81,6 +81,12 @@ setup(
     install_requires=install_requires,
     tests_require=tests_require,
     extras_require=extras_require,
+    entry_points={
+        'console_scripts': [
+            'inspire-query-parser-author-dictionary = inspire_query_parser.author_dictionary:main',
+            'inspire-query-parser-journal-titles = inspire_query_parser.journal_titles:main',
+        ],
+    },
     classifiers=[
         'Development Status :: 4 - Beta',
         'Environment :: Web Environment',
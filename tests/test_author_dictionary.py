@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+from __future__ import absolute_import, unicode_literals
+
+import io
+
+import pytest
+
+from inspire_query_parser.author_dictionary import (
+    AuthorDictionary, AuthorDictionaryEntry, get_author_dictionary, main, set_author_dictionary)
+from inspire_query_parser.parsing_driver import parse_query
+from inspire_query_parser.utils.visitor_utils import generate_minimal_name_variations
+
+NAMES = [
+    'Ellis, John',
+    ('Mele, Salvatore', ('S.Mele.1',)),
+    ('Mele, Salvatore', ('S.Mele.2', 'S.Mele.1')),
+    'Vurës, John I',
+    'Smith, J.',
+    '  ',
+]
+
+
+@pytest.fixture
+def author_dictionary(tmpdir):
+    path = str(tmpdir.join('authors.dict'))
+    AuthorDictionary.build(NAMES, path)
+    author_dictionary = AuthorDictionary.open(path)
+    yield author_dictionary
+    author_dictionary.close()
+
+
+def test_author_dictionary_lookup(author_dictionary):
+    assert len(author_dictionary) == 4
+
+    assert author_dictionary.get('Mele, Salvatore') == AuthorDictionaryEntry(
+        'Mele, Salvatore',
+        True,
+        tuple(generate_minimal_name_variations('Mele, Salvatore')),
+        ('S.Mele.1', 'S.Mele.2'),
+    )
+    assert author_dictionary.get('Smith, J.').contains_fullnames is False
+    assert author_dictionary.get('Vurës, John I').name_variations == \
+        tuple(generate_minimal_name_variations('Vurës, John I'))
+
+
+def test_author_dictionary_lookup_collapses_whitespace_but_keeps_case(author_dictionary):
+    assert author_dictionary.get(' Ellis,  John ').name == 'Ellis, John'
+    assert author_dictionary.get('ellis, john') is None
+    assert author_dictionary.get('Ellis, Jonathan') is None
+
+
+def test_author_dictionary_rejects_other_files(tmpdir):
+    path = tmpdir.join('not_a_dictionary')
+    path.write_binary(b'\0' * 64)
+
+    with pytest.raises(ValueError):
+        AuthorDictionary.open(str(path))
+
+
+def test_empty_author_dictionary(tmpdir):
+    path = str(tmpdir.join('authors.dict'))
+    assert AuthorDictionary.build([], path) == 0
+
+    assert AuthorDictionary.open(path).get('Ellis, John') is None
+
+
+def test_author_queries_are_identical_with_the_author_dictionary(author_dictionary):
+    queries = ['a Ellis, John', 'a Mele, Salvatore', 'a Vurës, John I', 'a Smith, J.', 'a Ellis, J and t higgs']
+    expected_es_queries = [parse_query(query_str) for query_str in queries]
+
+    set_author_dictionary(author_dictionary)
+    try:
+        assert get_author_dictionary() is author_dictionary
+        assert [parse_query(query_str) for query_str in queries] == expected_es_queries
+    finally:
+        set_author_dictionary(None)
+
+
+def test_author_dictionary_cli(tmpdir, capsys):
+    names_path = str(tmpdir.join('names.tsv'))
+    dictionary_path = str(tmpdir.join('authors.dict'))
+    with io.open(names_path, 'w', encoding='utf-8') as names_file:
+        names_file.write('Ellis, John\tJ.Ellis.1, J.Ellis.2\nMele, Salvatore\n')
+
+    assert main([names_path, dictionary_path]) == 0
+    assert 'Wrote 2 names' in capsys.readouterr()[0]
+
+    author_dictionary = AuthorDictionary.open(dictionary_path)
+    assert author_dictionary.get('Ellis, John').bai_candidates == ('J.Ellis.1', 'J.Ellis.2')
+    assert author_dictionary.get('Mele, Salvatore').bai_candidates == ()
+    author_dictionary.close()
+
+
+def test_author_queries_use_the_author_dictionary():
+    class FakeAuthorDictionary(object):
+        def get(self, author_name):
+            return AuthorDictionaryEntry(author_name, False, ('ellis j', 'j ellis'), ())
+
+    set_author_dictionary(FakeAuthorDictionary())
+    try:
+        es_query = parse_query('a Ellis, John')
+    finally:
+        set_author_dictionary(None)
+
+    assert es_query['nested']['query']['bool']['filter']['bool']['should'] == [
+        {'term': {'authors.name_variations': 'ellis j'}},
+        {'term': {'authors.name_variations': 'j ellis'}},
+    ]
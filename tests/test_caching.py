@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+from __future__ import absolute_import, unicode_literals
+
+import json
+import multiprocessing
+import sys
+
+import mock
+import pytest
+
+from inspire_query_parser import parse_query, parse_query_json
+from inspire_query_parser.author_dictionary import set_author_dictionary
+from inspire_query_parser.caching import (LocalQueryCache,
+                                          SharedMemoryQueryCache,
+                                          get_config_generation,
+                                          set_query_cache, stable_hash)
+from inspire_query_parser.journal_titles import set_journal_title_table
+from inspire_query_parser.stateful_pypeg_parser import StatefulParser
+from inspire_query_parser.utils.visitor_utils import (
+    register_date_conversion_handler, unregister_date_conversion_handler)
+from inspire_query_parser.visitors.elastic_search_visitor import (
+    ElasticSearchVisitor, ValueTypes)
+
+requires_shared_memory = pytest.mark.skipif(sys.version_info < (3, 8), reason='requires multiprocessing.shared_memory')
+
+
+@pytest.fixture
+def shared_cache():
+    cache = SharedMemoryQueryCache.create(num_buckets=4, ways=2, slot_size=256, lock_stripes=2)
+    yield cache
+    cache.close()
+    cache.unlink()
+
+
+def test_stable_hash_is_identical_for_text_and_its_utf8_encoding():
+    assert stable_hash('γ-radiation') == stable_hash('γ-radiation'.encode('utf-8'))
+
+
+def test_local_query_cache_evicts_least_recently_used_entry():
+    cache = LocalQueryCache(max_size=2)
+    cache.set('a ellis', '1')
+    cache.set('t boson', '2')
+    cache.get('a ellis')
+    cache.set('j Phys.Rev.D', '3')
+
+    assert cache.get('t boson') is None
+    assert cache.get('a ellis') == '1'
+    assert cache.get('j Phys.Rev.D') == '3'
+    assert len(cache) == 2
+
+
+@requires_shared_memory
+def test_shared_memory_query_cache_round_trip(shared_cache):
+    shared_cache.set('a γ-radiation', '{"match": {"_all": "γ"}}')
+
+    assert shared_cache.get('a γ-radiation') == '{"match": {"_all": "γ"}}'
+    assert shared_cache.get('a ellis') is None
+
+
+@requires_shared_memory
+def test_shared_memory_query_cache_overwrites_existing_key(shared_cache):
+    shared_cache.set('a ellis', '1')
+    shared_cache.set('a ellis', '2')
+
+    assert shared_cache.get('a ellis') == '2'
+
+
+@requires_shared_memory
+def test_shared_memory_query_cache_skips_values_larger_than_a_slot(shared_cache):
+    shared_cache.set('abstract', 'x' * 1024)
+
+    assert shared_cache.get('abstract') is None
+
+
+@requires_shared_memory
+def test_shared_memory_query_cache_is_bounded(shared_cache):
+    for i in range(100):
+        shared_cache.set('a ellis {}'.format(i), '{}'.format(i))
+
+    hits = [i for i in range(100) if shared_cache.get('a ellis {}'.format(i)) is not None]
+    assert 0 < len(hits) <= shared_cache.num_buckets * shared_cache.ways
+    assert shared_cache.get('a ellis 99') == '99'
+
+
+@requires_shared_memory
+def test_shared_memory_query_cache_wraps_the_sequence_numbers_around(shared_cache):
+    slot_header = SharedMemoryQueryCache.SLOT_HEADER
+    slot_offsets = [
+        shared_cache._slot_offset(bucket, way)
+        for bucket in range(shared_cache.num_buckets) for way in range(shared_cache.ways)
+    ]
+    for offset in slot_offsets:
+        slot_header.pack_into(shared_cache._buf, offset, SharedMemoryQueryCache.SEQUENCE_MASK - 1, 0, 0, 0)
+
+    shared_cache.set('a ellis', '1')
+    assert shared_cache.get('a ellis') == '1'
+    shared_cache.clear()
+    assert shared_cache.get('a ellis') is None
+
+    sequences = [slot_header.unpack_from(shared_cache._buf, offset)[0] for offset in slot_offsets]
+    assert sorted(sequences) == [0] * (len(sequences) - 1) + [2]
+
+
+@requires_shared_memory
+def test_shared_memory_query_cache_clear(shared_cache):
+    shared_cache.set('a ellis', '1')
+    shared_cache.clear()
+
+    assert shared_cache.get('a ellis') is None
+
+
+def _write_to_cache(cache, key, value):
+    cache.set(key, value)
+
+
+@requires_shared_memory
+def test_shared_memory_query_cache_is_shared_with_forked_processes(shared_cache):
+    process = multiprocessing.get_context('fork').Process(
+        target=_write_to_cache, args=(shared_cache, 'a ellis', 'from child')
+    )
+    process.start()
+    process.join()
+
+    assert shared_cache.get('a ellis') == 'from child'
+
+
+@mock.patch('inspire_query_parser.parsing_driver.StatefulParser', side_effect=StatefulParser)
+def test_parse_query_uses_cache(mocked_parser):
+    cache = LocalQueryCache()
+    set_query_cache(cache)
+    try:
+        first = parse_query('subject astrophysics')
+        second = parse_query('subject astrophysics')
+    finally:
+        set_query_cache(None)
+
+    assert first == second
+    assert mocked_parser.call_count == 1
+    assert len(cache) == 1
+
+
+@mock.patch('inspire_query_parser.parsing_driver.StatefulParser', side_effect=StatefulParser)
+def test_parse_query_json_returns_the_cached_json(mocked_parser):
+    cache = LocalQueryCache()
+    set_query_cache(cache)
+    try:
+        es_query = parse_query('subject astrophysics')
+        with mock.patch('inspire_query_parser.parsing_driver.json.loads') as mocked_loads:
+            serialized_es_query = parse_query_json('subject astrophysics')
+    finally:
+        set_query_cache(None)
+
+    assert serialized_es_query == json.dumps(es_query, sort_keys=True).encode('utf-8')
+    assert not mocked_loads.called
+    assert mocked_parser.call_count == 1
+
+
+def test_parse_query_does_not_use_the_translations_cached_before_a_setting_change():
+    set_query_cache(LocalQueryCache())
+    try:
+        product_es_query = parse_query('a ellis, j')
+        ElasticSearchVisitor.set_author_filter_strategy(ElasticSearchVisitor.AUTHOR_FILTER_STRATEGY_COMPACT)
+        try:
+            compact_es_query = parse_query('a ellis, j')
+        finally:
+            ElasticSearchVisitor.set_author_filter_strategy(ElasticSearchVisitor.AUTHOR_FILTER_STRATEGY_PRODUCT)
+    finally:
+        set_query_cache(None)
+
+    set_query_cache(None)
+    ElasticSearchVisitor.set_author_filter_strategy(ElasticSearchVisitor.AUTHOR_FILTER_STRATEGY_COMPACT)
+    try:
+        uncached_compact_es_query = parse_query('a ellis, j')
+    finally:
+        ElasticSearchVisitor.set_author_filter_strategy(ElasticSearchVisitor.AUTHOR_FILTER_STRATEGY_PRODUCT)
+
+    assert compact_es_query == uncached_compact_es_query
+    assert compact_es_query != product_es_query
+
+
+class _KeywordHandlerRegisteringVisitor(ElasticSearchVisitor):
+    """Isolates the registered keyword handlers from the ElasticSearchVisitor."""
+
+
+def _register_and_unregister_date_specifier():
+    register_date_conversion_handler('next\\s+century')(lambda text: '2100')
+    unregister_date_conversion_handler('next\\s+century')
+
+
+@pytest.mark.parametrize(
+    'change_setting',
+    [
+        lambda: set_author_dictionary(None),
+        lambda: set_journal_title_table(None),
+        lambda: ElasticSearchVisitor.set_author_filter_strategy(ElasticSearchVisitor.AUTHOR_FILTER_STRATEGY_PRODUCT),
+        lambda: _KeywordHandlerRegisteringVisitor.register_keyword_handler(
+            'foo', ValueTypes.value, lambda visitor, node, fieldnames: {}
+        ),
+        _register_and_unregister_date_specifier,
+    ]
+)
+def test_settings_changing_the_translations_bump_the_config_generation(change_setting):
+    config_generation = get_config_generation()
+
+    change_setting()
+
+    assert get_config_generation() > config_generation
+
+
+def test_set_author_filter_strategy_rejects_unknown_strategies():
+    with pytest.raises(ValueError):
+        ElasticSearchVisitor.set_author_filter_strategy('unknown')
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+from __future__ import absolute_import, unicode_literals
+
+import binascii
+
+import pytest
+
+from inspire_query_parser import parse_query
+from inspire_query_parser.utils.cbor_encoder import encode_cbor
+
+
+@pytest.mark.parametrize(
+    ['value', 'expected_hex'],
+    [
+        # The examples of RFC 8949 (Appendix A), except the floats which it encodes as half precision.
+        (0, '00'),
+        (23, '17'),
+        (24, '1818'),
+        (100, '1864'),
+        (1000, '1903e8'),
+        (1000000, '1a000f4240'),
+        (1000000000000, '1b000000e8d4a51000'),
+        (18446744073709551615, '1bffffffffffffffff'),
+        (-1, '20'),
+        (-1000, '3903e7'),
+        (1.1, 'fb3ff199999999999a'),
+        (100000.0, 'fa47c35000'),
+        (3.4028234663852886e+38, 'fa7f7fffff'),
+        (1.0e+300, 'fb7e37e43c8800759c'),
+        (False, 'f4'),
+        (True, 'f5'),
+        (None, 'f6'),
+        ('', '60'),
+        ('IETF', '6449455446'),
+        ('ü', '62c3bc'),
+        ('水', '63e6b0b4'),
+        ([], '80'),
+        ([1, [2, 3], (4, 5)], '8301820203820405'),
+        ({}, 'a0'),
+        ({'b': [2, 3], 'a': 1}, 'a26161016162820203'),
+        ('a' * 24, '7818' + '61' * 24),
+    ]
+)
+def test_encode_cbor(value, expected_hex):
+    assert binascii.hexlify(encode_cbor(value)).decode('ascii') == expected_hex
+
+
+def test_encode_cbor_keeps_the_json_value_semantics_of_the_es_queries():
+    # A boolean, not the integer 1.
+    assert encode_cbor(parse_query('tc core')) == b'\xa1\x65match\xa1\x64core\xf5'
+
+    # The boost of the texkey term query is a float, even if integral.
+    texkey_term_query = encode_cbor(parse_query('Ellis:2017abc')['bool']['should'][1])
+    assert b'\x65boost\xfa\x40\x00\x00\x00' in texkey_term_query
+    assert encode_cbor({'boost': 2}) == b'\xa1\x65boost\x02'
+
+
+@pytest.mark.parametrize(
+    ['value', 'expected_exception'],
+    [
+        ({1: 'a'}, TypeError),
+        (object(), TypeError),
+        (2 ** 64, ValueError),
+    ]
+)
+def test_encode_cbor_raises_on_values_out_of_json(value, expected_exception):
+    with pytest.raises(expected_exception):
+        encode_cbor(value)
@@ -23,12 +23,17 @@
 
 from __future__ import print_function, unicode_literals
 
+from itertools import product
+import re
+
 import mock
+import pytest
 
 from inspire_query_parser import parser, parse_query
 from inspire_query_parser.config import ES_MUST_QUERY, ES_SHOULD_QUERY
 from inspire_query_parser.stateful_pypeg_parser import StatefulParser
-from inspire_query_parser.visitors.elastic_search_visitor import ElasticSearchVisitor
+from inspire_query_parser.utils.visitor_utils import generate_minimal_name_variations
+from inspire_query_parser.visitors.elastic_search_visitor import ElasticSearchVisitor, ValueTypes
 from inspire_query_parser.visitors.restructuring_visitor import RestructuringVisitor
 
 
@@ -2215,3 +2220,148 @@ def test_elastic_search_visitor_type_code_with_known_partial_value_mapping_and_q
 
     generated_es_query = _parse_query(query_str)
     assert generated_es_query == expected_es_query
+
+
+def test_elastic_search_visitor_resolves_es_fieldname_given_as_keyword_like_its_keyword():
+    assert _parse_query('authors.full_name:ellis') == _parse_query('author:ellis')
+
+
+def test_elastic_search_visitor_register_keyword_handler():
+    class CustomElasticSearchVisitor(ElasticSearchVisitor):
+        pass
+
+    def generate_orcid_query(visitor, node, fieldnames):
+        return {'term': {fieldnames: node.value.upper()}}
+
+    CustomElasticSearchVisitor.register_keyword_handler(
+        'orcid', ValueTypes.value, generate_orcid_query, fieldnames='authors.ids.value'
+    )
+
+    _, parse_tree = StatefulParser().parse('orcid:0000-0002-1825-009x', parser.Query)
+    parse_tree = parse_tree.accept(RestructuringVisitor())
+
+    expected_es_query = {'term': {'authors.ids.value': '0000-0002-1825-009X'}}
+    assert parse_tree.accept(CustomElasticSearchVisitor()) == expected_es_query
+    assert 'orcid' not in ElasticSearchVisitor.KEYWORD_TO_ES_FIELDNAME
+    assert 'orcid' not in ElasticSearchVisitor.KEYWORD_HANDLERS[ValueTypes.value]
+    assert 'multi_match' not in parse_tree.accept(ElasticSearchVisitor())
+
+
+def test_elastic_search_visitor_register_keyword_handler_rejects_unknown_value_type():
+    class CustomElasticSearchVisitor(ElasticSearchVisitor):
+        pass
+
+    with pytest.raises(ValueError):
+        CustomElasticSearchVisitor.register_keyword_handler('orcid', 'range', lambda visitor, node, fieldnames: {})
+
+
+AUTHOR_FILTER_EQUIVALENCE_CORPUS = [
+    'Ellis',
+    'Ellis, J',
+    'Ellis, J.',
+    'Ellis, John',
+    'Ellis, Jonathan',
+    'John Ellis',
+    'Ellis, John Richard',
+    'Ellis, J. R.',
+    'Mele, Salvatore',
+    'Mele, Samuele',
+    'Mele Salvatore',
+    'Caro-Estevez, Jose Luis',
+    'de la Cruz, Maria',
+    'van der Berg, Jan Willem',
+    'Vurës, John I',
+    'Çelik, Ümit',
+    'Smith, John Jr.',
+    'Smith, J. Jr.',
+    "O'Connor, Sean",
+    'Kim, Jae Hoon Kyung Min',
+]
+"""Author names queried with both author filter strategies, and also used as the indexed authors."""
+
+
+def _tokens(text):
+    return set(re.findall(r'\w+', text.lower(), re.UNICODE))
+
+
+def _matches(query, author):
+    """Evaluates the subset of the ES query DSL used by the author filters against an indexed author."""
+    query_type, query_body = next(iter(query.items()))
+    if query_type == 'bool':
+        must = query_body.get('must', [])
+        should = query_body.get('should', [])
+        return all(_matches(clause, author) for clause in (must if isinstance(must, list) else [must])) and \
+            (not should or any(_matches(clause, author) for clause in should))
+    if query_type == 'term':
+        return next(iter(query_body.values())) in author['authors.name_variations']
+    if query_type == 'terms':
+        return bool(set(next(iter(query_body.values()))) & author['authors.name_variations'])
+    if query_type == 'match':
+        match_query = next(iter(query_body.values()))
+        assert match_query['operator'] == 'and'
+        return _tokens(match_query['query']) <= _tokens(author['authors.full_name'])
+    raise AssertionError('Unexpected query type ' + query_type)
+
+
+def _author_filter(author_name, author_filter_strategy):
+    class AuthorFilterElasticSearchVisitor(ElasticSearchVisitor):
+        AUTHOR_FILTER_STRATEGY = author_filter_strategy
+
+    es_query = AuthorFilterElasticSearchVisitor()._generate_author_query(author_name)
+    return es_query['nested']['query']['bool']['filter']
+
+
+def _count_clauses(query):
+    if isinstance(query, dict):
+        return sum(_count_clauses(value) for value in query.values()) + \
+            sum(1 for key in query if key in ('term', 'terms', 'match'))
+    if isinstance(query, list):
+        return sum(_count_clauses(value) for value in query)
+    return 0
+
+
+def test_elastic_search_visitor_compact_author_filter_is_equivalent_to_product():
+    authors = [
+        {
+            'authors.full_name': author_name,
+            'authors.name_variations': set(generate_minimal_name_variations(author_name.lower())) |
+            set(variation.lower() for variation in generate_minimal_name_variations(author_name)),
+        }
+        for author_name in AUTHOR_FILTER_EQUIVALENCE_CORPUS
+    ]
+
+    for author_name, author in product(AUTHOR_FILTER_EQUIVALENCE_CORPUS, authors):
+        product_filter = _author_filter(author_name, ElasticSearchVisitor.AUTHOR_FILTER_STRATEGY_PRODUCT)
+        compact_filter = _author_filter(author_name, ElasticSearchVisitor.AUTHOR_FILTER_STRATEGY_COMPACT)
+        assert _matches(product_filter, author) == _matches(compact_filter, author), \
+            (author_name, author['authors.full_name'])
+
+        assert _count_clauses(compact_filter) <= _count_clauses(product_filter)
+
+
+def test_elastic_search_visitor_compact_author_filter():
+    expected_filter = {
+        'bool': {
+            'must': [
+                {'terms': {'authors.name_variations': ['ellis john', 'ellis j', 'john ellis', 'john e']}},
+                {
+                    'bool': {
+                        'should': [
+                            {'match': {'authors.full_name': {'query': 'ellis john', 'operator': 'and'}}},
+                            {'match': {'authors.full_name': {'query': 'ellis j', 'operator': 'and'}}},
+                            {'match': {'authors.full_name': {'query': 'john e', 'operator': 'and'}}},
+                        ]
+                    }
+                }
+            ]
+        }
+    }
+
+    compact_filter = _author_filter('Ellis, John', ElasticSearchVisitor.AUTHOR_FILTER_STRATEGY_COMPACT)
+    assert ordered(compact_filter) == ordered(expected_filter)
+    assert _count_clauses(compact_filter) == 4
+    assert _count_clauses(_author_filter('Ellis, John', ElasticSearchVisitor.AUTHOR_FILTER_STRATEGY_PRODUCT)) == 32
+
+    expected_initials_filter = {'terms': {'authors.name_variations': ['ellis j', 'j ellis']}}
+    assert ordered(_author_filter('Ellis, J', ElasticSearchVisitor.AUTHOR_FILTER_STRATEGY_COMPACT)) == \
+        ordered(expected_initials_filter)
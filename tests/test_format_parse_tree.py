@@ -37,3 +37,25 @@ def test_format_parse_tree_handles_unicode_nodes():
     parse_tree = Query([Statement(Expression(SimpleQuery(InvenioKeywordQuery('unicode-keyword-φοο',
                                                                              Value(SimpleValue('γ-radiation'))))))])
     assert emit_tree_format(parse_tree, verbose=True)
+
+
+def test_format_parse_tree_handles_deep_trees():
+    parse_tree = SimpleValue('foo')
+    for _ in range(3000):
+        parse_tree = Value(parse_tree)
+
+    lines = emit_tree_format(parse_tree).splitlines()
+
+    assert len(lines) == 3001
+    assert lines[0] == 'Value'
+    assert lines[-1].endswith('├── SimpleValue {foo}')
+
+
+def test_format_parse_tree_handles_wide_trees():
+    parse_tree = Query([Statement(Expression(SimpleQuery(Value(SimpleValue(str(i)))))) for i in range(2000)])
+
+    lines = emit_tree_format(parse_tree).splitlines()
+
+    assert len(lines) == 2 + 2000 * 5
+    assert lines[0] == 'Query'
+    assert lines[-1] == '▆'
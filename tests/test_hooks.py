@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+from __future__ import absolute_import, unicode_literals
+
+import time
+
+import mock
+import pytest
+
+from inspire_query_parser.ast import AndOp, KeywordOp, Keyword, Value
+from inspire_query_parser.caching import LocalQueryCache, set_query_cache
+from inspire_query_parser.hooks import (FALLBACK_SYNTAX_ERROR, FALLBACK_UNRECOGNIZED_TEXT, ParseQueryHooks,
+                                        count_tree_nodes, get_hooks, register_hooks, unregister_hooks)
+from inspire_query_parser.parsing_driver import parse_query
+
+
+class RecordingHooks(ParseQueryHooks):
+    def __init__(self):
+        self.events = []
+        self.traces = []
+
+    def on_stage(self, trace, event):
+        self.events.append(event)
+
+    def on_query(self, trace):
+        self.traces.append(trace)
+
+
+@pytest.fixture
+def hooks():
+    recording_hooks = RecordingHooks()
+    register_hooks(recording_hooks)
+    yield recording_hooks
+    unregister_hooks(recording_hooks)
+
+
+def test_register_and_unregister_hooks():
+    first, second = ParseQueryHooks(), ParseQueryHooks()
+
+    register_hooks(first)
+    register_hooks(second)
+    register_hooks(first)
+    assert get_hooks() == (first, second)
+
+    unregister_hooks(first)
+    unregister_hooks(first)
+    assert get_hooks() == (second,)
+
+    unregister_hooks(second)
+    assert get_hooks() == ()
+
+
+def test_count_tree_nodes():
+    tree = AndOp(KeywordOp(Keyword('author'), Value('ellis')), KeywordOp(Keyword('title'), Value('boson')))
+
+    assert count_tree_nodes(tree) == 7
+    assert count_tree_nodes(None) == 0
+
+
+def test_hooks_receive_every_stage(hooks):
+    parse_query(b'author ellis and title boson')
+
+    assert [event.stage for event in hooks.events] == ['decode', 'parse', 'restructure', 'es']
+    decode, parse, restructure, es = hooks.events
+    assert decode.input_size == parse.input_size == len('author ellis and title boson')
+    assert parse.node_count == restructure.input_size
+    assert restructure.node_count == es.input_size == 7
+    assert all(event.duration >= 0 and event.fallback_reason is None for event in hooks.events)
+
+    trace, = hooks.traces
+    assert trace.query_str == 'author ellis and title boson'
+    assert trace.stages == hooks.events
+    assert trace.fallback_reason is None
+    assert trace.cache_hit is None
+    assert trace.duration >= sum(event.duration for event in hooks.events)
+
+
+def test_stage_durations_do_not_include_counting_the_tree_nodes(hooks):
+    def slowly_count_tree_nodes(tree):
+        time.sleep(0.1)
+        return count_tree_nodes(tree)
+
+    with mock.patch('inspire_query_parser.parsing_driver.count_tree_nodes', side_effect=slowly_count_tree_nodes):
+        parse_query('title boson')
+
+    assert [event.stage for event in hooks.events] == ['decode', 'parse', 'restructure', 'es']
+    assert all(event.duration < 0.1 for event in hooks.events)
+    assert hooks.traces[0].duration >= 0.2
+
+
+@mock.patch('inspire_query_parser.parsing_driver.StatefulParser')
+def test_hooks_receive_fallback_reason(mocked_parser, hooks):
+    mocked_parser.return_value.parse.return_value = ('unrecognized query', None)
+
+    parse_query('unrecognized query')
+
+    assert [event.stage for event in hooks.events] == ['decode', 'parse', 'fallback']
+    assert hooks.events[1].fallback_reason == hooks.events[2].fallback_reason == FALLBACK_UNRECOGNIZED_TEXT
+    assert hooks.traces[0].fallback_reason == FALLBACK_UNRECOGNIZED_TEXT
+
+
+@mock.patch('inspire_query_parser.parsing_driver.StatefulParser')
+def test_hooks_receive_syntax_error_fallback(mocked_parser, hooks):
+    mocked_parser.return_value.parse.side_effect = SyntaxError()
+
+    parse_query('query')
+
+    assert hooks.traces[0].fallback_reason == FALLBACK_SYNTAX_ERROR
+    assert [event.stage for event in hooks.events] == ['decode', 'parse', 'fallback']
+
+
+def test_hooks_receive_cache_hits(hooks):
+    set_query_cache(LocalQueryCache())
+    try:
+        parse_query('title boson')
+        parse_query('title boson')
+    finally:
+        set_query_cache(None)
+
+    assert [trace.cache_hit for trace in hooks.traces] == [False, True]
+    assert [event.stage for event in hooks.traces[1].stages] == ['decode']
+
+
+def test_crashing_hooks_do_not_break_parse_query(hooks):
+    crashing_hooks = mock.Mock(spec=ParseQueryHooks)
+    crashing_hooks.on_stage.side_effect = ValueError()
+    crashing_hooks.on_query.side_effect = ValueError()
+    register_hooks(crashing_hooks)
+    try:
+        es_query = parse_query('title boson')
+    finally:
+        unregister_hooks(crashing_hooks)
+
+    assert es_query == parse_query('title boson')
+    assert len(hooks.traces) == 2
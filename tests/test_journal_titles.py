@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+from __future__ import absolute_import, unicode_literals
+
+import io
+
+import mock
+import pytest
+
+from inspire_query_parser.journal_titles import (
+    JournalTitleTable, get_journal_title_table, main, set_journal_title_table)
+from inspire_query_parser.parsing_driver import parse_query
+from inspire_query_parser.utils.visitor_utils import (
+    _converted_journal_query_values, convert_journal_query_value)
+
+
+@pytest.fixture(autouse=True)
+def clear_converted_journal_query_values():
+    _converted_journal_query_values.clear()
+    yield
+    _converted_journal_query_values.clear()
+
+
+@pytest.fixture
+def journal_title_table(tmpdir):
+    path = str(tmpdir.join('journal_titles.json'))
+    JournalTitleTable.build(['Phys.Rev,D85', 'Phys.Rev,D85,1', 'Phys.Lett.B', 'Phys.Rev.Lett.,62,1825'], path)
+    return JournalTitleTable(path)
+
+
+def test_journal_title_table_convert(journal_title_table):
+    assert journal_title_table.convert({'journal_title': 'Phys.Rev', 'journal_volume': 'D85', 'page_start': '1'}) == \
+        {'journal_title': 'Phys.Rev D', 'journal_volume': '85', 'page_start': '1'}
+    assert journal_title_table.convert({'journal_title': 'Phys.Lett.B'}) == {'journal_title': 'Phys.Lett.B'}
+    assert journal_title_table.convert({'journal_title': 'Phys.Rev', 'journal_volume': 'D86'}) is None
+    assert journal_title_table.convert({'journal_volume': 'D86'}) is None
+
+
+def test_journal_title_table_is_loaded_lazily(tmpdir):
+    journal_title_table = JournalTitleTable(str(tmpdir.join('missing.json')))
+
+    with pytest.raises(IOError):
+        journal_title_table.convert({'journal_title': 'Phys.Rev'})
+
+
+def test_journal_queries_use_the_journal_title_table(journal_title_table):
+    queries = ['j Phys.Rev,D85', 'j Phys.Rev,D85,1', 'j Phys.Lett.B', 'j Phys.Rev.Lett.,62,1825', 'j Phys.Rev,D86']
+    expected_es_queries = [parse_query(query_str) for query_str in queries]
+    _converted_journal_query_values.clear()
+
+    set_journal_title_table(journal_title_table)
+    try:
+        assert get_journal_title_table() is journal_title_table
+        with mock.patch(
+            'inspire_schemas.utils.convert_old_publication_info_to_new',
+            wraps=lambda old_publication_infos: [dict(old_publication_infos[0])],
+        ) as mocked_convert:
+            es_queries = [parse_query(query_str) for query_str in queries[:-1]]
+            assert not mocked_convert.called
+
+            parse_query('j Phys.Rev,D86')
+            assert mocked_convert.called
+    finally:
+        set_journal_title_table(None)
+
+    assert es_queries == expected_es_queries[:-1]
+
+
+def test_journal_query_values_conversions_are_cached():
+    with mock.patch(
+        'inspire_schemas.utils.convert_old_publication_info_to_new',
+        return_value=[{'journal_title': 'Phys.Rev.D', 'journal_volume': '85'}],
+    ) as mocked_convert:
+        assert parse_query('j Phys.Rev,D85') == parse_query('j Phys.Rev,D85')
+
+    mocked_convert.assert_called_once_with([{'journal_title': 'Phys.Rev', 'journal_volume': 'D85'}])
+
+
+def test_journal_query_values_converted_before_setting_the_table_are_converted_with_it(journal_title_table):
+    publication_info_keys = ('journal_title', 'journal_volume', 'page_start')
+    with mock.patch(
+        'inspire_schemas.utils.convert_old_publication_info_to_new',
+        return_value=[{'journal_title': 'Phys.Rev.D', 'journal_volume': '85'}],
+    ):
+        assert convert_journal_query_value(publication_info_keys, 'Phys.Rev,D85') == \
+            {'journal_title': 'Phys.Rev.D', 'journal_volume': '85'}
+
+        set_journal_title_table(journal_title_table)
+        try:
+            assert convert_journal_query_value(publication_info_keys, 'Phys.Rev,D85') == \
+                {'journal_title': 'Phys.Rev D', 'journal_volume': '85'}
+        finally:
+            set_journal_title_table(None)
+
+        assert convert_journal_query_value(publication_info_keys, 'Phys.Rev,D85') == \
+            {'journal_title': 'Phys.Rev.D', 'journal_volume': '85'}
+
+
+def test_journal_title_table_cli(tmpdir, capsys):
+    journal_query_values_path = str(tmpdir.join('journal_query_values.txt'))
+    table_path = str(tmpdir.join('journal_titles.json'))
+    with io.open(journal_query_values_path, 'w', encoding='utf-8') as journal_query_values_file:
+        journal_query_values_file.write('Phys.Rev,D85\n\nPhys.Rev,D85,1\nPhys.Lett.B\n')
+
+    assert main([journal_query_values_path, table_path]) == 0
+    assert 'Wrote 2 journal titles and volumes' in capsys.readouterr()[0]
+
+    assert JournalTitleTable(table_path).convert({'journal_title': 'Phys.Rev', 'journal_volume': 'D85'}) == \
+        {'journal_title': 'Phys.Rev D', 'journal_volume': '85'}
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+from __future__ import absolute_import, unicode_literals
+
+import threading
+
+import mock
+import pytest
+
+from inspire_query_parser.caching import LocalQueryCache, set_query_cache
+from inspire_query_parser.hooks import register_hooks, unregister_hooks
+from inspire_query_parser.metrics import MetricsRegistry
+from inspire_query_parser.parsing_driver import parse_query
+
+
+@pytest.fixture
+def registry():
+    metrics_registry = MetricsRegistry()
+    register_hooks(metrics_registry)
+    yield metrics_registry
+    unregister_hooks(metrics_registry)
+
+
+def test_observe_latency_fills_cumulative_buckets():
+    registry = MetricsRegistry(latency_buckets=(0.1, 1.0))
+
+    for duration in (0.05, 0.1, 0.5, 2.0):
+        registry.observe_latency('parse', duration)
+
+    histogram = registry.snapshot()['latency']['parse']
+    assert histogram['buckets'] == [(0.1, 2), (1.0, 3), (float('inf'), 4)]
+    assert histogram['count'] == 4
+    assert histogram['sum'] == pytest.approx(2.65)
+
+
+def test_registry_counts_queries_and_fallbacks(registry):
+    parse_query('title boson')
+    parse_query('d < 200')
+    with mock.patch('inspire_query_parser.parsing_driver.StatefulParser') as mocked_parser:
+        mocked_parser.return_value.parse.side_effect = SyntaxError()
+        parse_query('title boson')
+
+    snapshot = registry.snapshot()
+    assert snapshot['queries'] == 3
+    assert snapshot['fallbacks'] == {
+        'unrecognized_text': 0,
+        'syntax_error': 1,
+        'restructuring_visitor_crash': 0,
+        'elastic_search_visitor_crash': 0,
+        'empty_es_query': 1,
+    }
+    assert snapshot['latency']['total']['count'] == 3
+    assert snapshot['latency']['parse']['count'] == 3
+    assert snapshot['latency']['es']['count'] == 2
+    assert snapshot['latency']['fallback']['count'] == 2
+    assert snapshot['cache_hits'] == snapshot['cache_misses'] == 0
+
+
+def test_registry_counts_cache_hits_and_misses(registry):
+    set_query_cache(LocalQueryCache())
+    try:
+        for _ in range(3):
+            parse_query('title boson')
+    finally:
+        set_query_cache(None)
+
+    snapshot = registry.snapshot()
+    assert snapshot['cache_hits'] == 2
+    assert snapshot['cache_misses'] == 1
+
+
+def test_registry_merges_thread_shards():
+    registry = MetricsRegistry()
+
+    def record():
+        for _ in range(1000):
+            registry.observe_latency('parse', 0.001)
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert registry.snapshot()['latency']['parse']['count'] == 8000
+
+    registry.reset()
+    assert registry.snapshot()['latency']['parse']['count'] == 0
@@ -22,8 +22,17 @@
 
 from __future__ import print_function, unicode_literals
 
-from inspire_query_parser.parser import SimpleValue, SimpleValueUnit
-from inspire_query_parser.stateful_pypeg_parser import StatefulParser
+import random
+import sys
+import threading
+
+from pypeg2 import Keyword
+
+from inspire_query_parser.parser import Query, SimpleValue, SimpleValueUnit
+from inspire_query_parser.parsing_driver import WARM_UP_QUERIES
+from inspire_query_parser.stateful_pypeg_parser import (RuleAttemptCountingParser,
+                                                        StatefulParser)
+from inspire_query_parser.utils.format_parse_tree import emit_tree_format
 from test_utils import parametrize
 
 
@@ -166,3 +175,56 @@ def test_simple_value_accepted_tokens(query_str, unrecognized_text, result):
     else:
         assert returned_unrecognised_text == unrecognized_text
         assert isinstance(returned_result, SyntaxError) and result.msg == result.msg
+
+
+def test_parse_does_not_modify_the_parser_nor_the_keyword_table():
+    parser = StatefulParser()
+    parser_state = dict(parser.__dict__)
+    keyword_table = dict(Keyword.table)
+
+    parser.parse('texkey Ellis:2017abc and t (boson and higgs) or - title + & |', Query)
+
+    assert parser.__dict__ == parser_state
+    assert dict(Keyword.table) == keyword_table
+
+
+def test_rule_attempt_counting_parser_counts_the_attempts_of_all_its_parses():
+    parser = RuleAttemptCountingParser()
+
+    parser.parse('title boson', Query)
+    rule_attempts = parser.rule_attempts
+    parser.parse('title boson', Query)
+
+    assert rule_attempts > 0
+    assert parser.rule_attempts == 2 * rule_attempts
+
+
+def test_parser_shared_by_many_threads():
+    queries = list(WARM_UP_QUERIES) + ['texkey Ellis:2017abc', 'title (and)', 'author (ellis or smith) and + -']
+    expected_parse_trees = {query: emit_tree_format(StatefulParser().parse(query, Query)[1]) for query in queries}
+    parser = StatefulParser()
+    errors = []
+
+    def parse_queries(seed):
+        shuffled_queries = list(queries)
+        random.Random(seed).shuffle(shuffled_queries)
+        try:
+            for query in shuffled_queries:
+                _, parse_tree = parser.parse(query, Query)
+                if emit_tree_format(parse_tree) != expected_parse_trees[query]:
+                    errors.append(query)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=parse_queries, args=(seed,)) for seed in range(8)]
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads as often as possible.
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert errors == []
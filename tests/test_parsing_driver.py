@@ -22,9 +22,16 @@
 
 from __future__ import absolute_import, unicode_literals
 
+import json
+import logging
+import subprocess
+import sys
+
 import mock
 
-from inspire_query_parser.parsing_driver import parse_query
+from inspire_query_parser.hooks import ParseQueryHooks, register_hooks, unregister_hooks
+from inspire_query_parser.parsing_driver import WARM_UP_QUERIES, parse_query, parse_query_json
+from inspire_query_parser.stateful_pypeg_parser import InstrumentedStatefulParser, RuleStatistics
 
 
 def test_driver_with_simple_query():
@@ -128,3 +135,99 @@ def test_driver_with_es_visitor_empty_query_generates_a_query_against_all():
     es_query = parse_query(query_str)
 
     assert es_query == expected_es_query
+
+
+@mock.patch('inspire_query_parser.parsing_driver.emit_tree_format')
+def test_driver_renders_parse_tree_only_when_debug_logging_is_enabled(mocked_emit_tree_format):
+    mocked_emit_tree_format.return_value = ''
+    logger = logging.getLogger('inspire_query_parser.parsing_driver')
+    level = logger.level
+    try:
+        logger.setLevel(logging.INFO)
+        parse_query('title boson')
+        assert not mocked_emit_tree_format.called
+
+        logger.setLevel(logging.DEBUG)
+        parse_query('title boson')
+        assert mocked_emit_tree_format.call_count == 1
+    finally:
+        logger.setLevel(level)
+
+
+def test_importing_the_package_defers_the_dependencies_of_specific_queries():
+    deferred_modules = ['inspire_schemas', 'inspire_utils.date', 'inspire_utils.helpers', 'inspire_utils.name',
+                        'dateutil.relativedelta']
+    script = (
+        'import json, sys\n'
+        'import inspire_query_parser\n'
+        'print(json.dumps([module for module in sys.argv[1:] if module in sys.modules]))\n'
+    )
+
+    output = subprocess.check_output([sys.executable, '-c', script] + deferred_modules)
+
+    assert json.loads(output.decode('utf-8')) == []
+
+
+def test_warm_up_queries_are_translated_without_falling_back():
+    class FallbackReasonsHook(ParseQueryHooks):
+        def __init__(self):
+            self.fallback_reasons = {}
+
+        def on_query(self, trace):
+            self.fallback_reasons[trace.query_str] = trace.fallback_reason
+
+    hook = FallbackReasonsHook()
+    register_hooks(hook)
+    try:
+        for query_str in WARM_UP_QUERIES:
+            parse_query(query_str)
+    finally:
+        unregister_hooks(hook)
+
+    assert hook.fallback_reasons == {query_str: None for query_str in WARM_UP_QUERIES}
+
+
+def test_warm_up_imports_the_deferred_dependencies_and_freezes_the_objects():
+    deferred_modules = ['inspire_schemas', 'inspire_utils.date', 'inspire_utils.name', 'dateutil.relativedelta']
+    script = (
+        'import gc, json, sys\n'
+        'import inspire_query_parser\n'
+        'frozen = inspire_query_parser.warm_up()\n'
+        'print(json.dumps({\n'
+        '    "imported": [module for module in sys.argv[1:] if module in sys.modules],\n'
+        '    "frozen": frozen,\n'
+        '    "freeze_count": gc.get_freeze_count() if hasattr(gc, "freeze") else 0,\n'
+        '}))\n'
+    )
+
+    output = json.loads(subprocess.check_output([sys.executable, '-c', script] + deferred_modules).decode('utf-8'))
+
+    assert output['imported'] == deferred_modules
+    assert output['frozen'] == output['freeze_count']
+    if sys.version_info >= (3, 7):
+        assert output['frozen'] > 0
+
+
+def test_parse_query_json_gives_the_bytes_of_the_serialized_query():
+    for query_str in WARM_UP_QUERIES + ('refersto:recid:1', 'd < 200', 'sdf f', ''):
+        assert parse_query_json(query_str) == json.dumps(parse_query(query_str), sort_keys=True).encode('utf-8')
+
+
+def test_driver_parses_with_the_given_parser():
+    class RuleAttemptsHook(ParseQueryHooks):
+        counts_rule_attempts = True
+
+        def on_query(self, trace):
+            self.rule_attempts = trace.rule_attempts
+
+    rule_statistics = RuleStatistics()
+    hook = RuleAttemptsHook()
+    register_hooks(hook)
+    try:
+        es_query = parse_query('title boson', parser=InstrumentedStatefulParser(rule_statistics))
+    finally:
+        unregister_hooks(hook)
+
+    assert es_query == parse_query('title boson')
+    assert rule_statistics.total_attempts > 0
+    assert hook.rule_attempts is None
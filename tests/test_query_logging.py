@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+from __future__ import absolute_import, unicode_literals
+
+import json
+import logging
+import sys
+import threading
+
+import pytest
+
+from inspire_query_parser.hooks import get_hooks
+from inspire_query_parser.parsing_driver import parse_query
+from inspire_query_parser.query_logging import JsonFormatter, enable_query_logging
+
+requires_queue_handler = pytest.mark.skipif(sys.version_info < (3, 2), reason='Requires logging.handlers.QueueHandler.')
+
+
+class CollectingHandler(logging.Handler):
+    def __init__(self):
+        super(CollectingHandler, self).__init__()
+        self.records = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.records.append(self.format(record))
+        self.threads.add(threading.current_thread().name)
+
+
+def test_json_formatter_includes_query_event():
+    record = logging.LogRecord('inspire_query_parser.queries', logging.INFO, __file__, 1, 'Query "%s".', ('foo',), None)
+    record.query_event = {'query': 'foo', 'fallback_reason': None}
+
+    document = json.loads(JsonFormatter().format(record))
+
+    assert document['message'] == 'Query "foo".'
+    assert document['level'] == 'INFO'
+    assert document['query'] == 'foo'
+    assert document['fallback_reason'] is None
+
+
+@pytest.fixture
+def query_logger_levels():
+    query_logger = logging.getLogger('inspire_query_parser.queries')
+    driver_logger = logging.getLogger('inspire_query_parser.parsing_driver')
+    levels = query_logger.level, driver_logger.level
+
+    query_logger.setLevel(logging.INFO)
+    driver_logger.setLevel(logging.WARNING)
+    yield
+    query_logger.setLevel(levels[0])
+    driver_logger.setLevel(levels[1])
+
+
+@requires_queue_handler
+def test_enable_query_logging_logs_the_sampled_queries(query_logger_levels):
+    handler = CollectingHandler()
+    query_logging = enable_query_logging(handler, sample_rate=1.0)
+    try:
+        parse_query('title boson')
+        parse_query('d < 200')
+    finally:
+        query_logging.stop()
+
+    documents = [json.loads(record) for record in handler.records]
+    query_documents = [document for document in documents if document['logger'] == 'inspire_query_parser.queries']
+    assert [document['query'] for document in query_documents] == ['title boson', 'd < 200']
+    assert [document['fallback_reason'] for document in query_documents] == [None, 'empty_es_query']
+    assert all(document['level'] == 'INFO' for document in query_documents)
+    assert 'es' in query_documents[1]['stages']
+
+    assert not any(document['message'].startswith('Parsing:') for document in documents)
+    assert threading.current_thread().name not in handler.threads
+
+
+@requires_queue_handler
+def test_enable_query_logging_logs_the_fallbacks_once(query_logger_levels):
+    handler = CollectingHandler()
+    query_logging = enable_query_logging(handler, sample_rate=0.0)
+    try:
+        parse_query('title boson')
+        parse_query('d < 200')
+    finally:
+        query_logging.stop()
+
+    documents = [json.loads(record) for record in handler.records]
+    assert len(documents) == 1
+    assert documents[0]['logger'] == 'inspire_query_parser.parsing_driver'
+    assert documents[0]['level'] == 'WARNING'
+    assert 'd < 200' in documents[0]['message']
+
+
+@requires_queue_handler
+def test_enable_query_logging_leaves_the_levels_and_the_propagation_unchanged(query_logger_levels):
+    package_logger = logging.getLogger('inspire_query_parser')
+    loggers = [logging.getLogger(name) for name in (
+        'inspire_query_parser', 'inspire_query_parser.parsing_driver', 'inspire_query_parser.queries'
+    )]
+    handlers = list(package_logger.handlers)
+    levels_and_propagation = [(logger.level, logger.propagate) for logger in loggers]
+
+    handler = CollectingHandler()
+    query_logging = enable_query_logging(handler, sample_rate=1.0)
+    parse_query('title boson')
+    assert [(logger.level, logger.propagate) for logger in loggers] == levels_and_propagation
+    query_logging.stop()
+    parse_query('title boson')
+
+    assert len(handler.records) == 1
+    assert query_logging.dropped == 0
+    assert get_hooks() == ()
+    assert package_logger.handlers == handlers
+    assert [(logger.level, logger.propagate) for logger in loggers] == levels_and_propagation
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+from __future__ import absolute_import, unicode_literals
+
+import json
+import os
+import signal
+
+import mock
+import pytest
+
+from inspire_query_parser.hooks import QueryTrace, register_hooks, unregister_hooks
+from inspire_query_parser.parsing_driver import parse_query
+from inspire_query_parser.slow_queries import SlowQueryLog
+
+
+def _trace(query_str, duration):
+    trace = QueryTrace(())
+    trace.query_str = query_str
+    trace.duration = duration
+    return trace
+
+
+def test_slow_query_log_keeps_the_slowest_queries():
+    slow_query_log = SlowQueryLog(size=3)
+
+    for duration in (0.3, 0.1, 0.5, 0.2, 0.4, 0.05):
+        slow_query_log.on_query(_trace('q{}'.format(duration), duration))
+
+    assert [entry['query'] for entry in slow_query_log.entries()] == ['q0.5', 'q0.4', 'q0.3']
+
+
+def test_slow_query_log_drops_expired_queries():
+    slow_query_log = SlowQueryLog(size=2, window=60)
+
+    with mock.patch('inspire_query_parser.slow_queries.time.time', return_value=1000.0):
+        slow_query_log.on_query(_trace('old slow', 0.5))
+        slow_query_log.on_query(_trace('old fast', 0.2))
+
+    with mock.patch('inspire_query_parser.slow_queries.time.time', return_value=1100.0):
+        slow_query_log.on_query(_trace('new', 0.1))
+        entries = slow_query_log.entries()
+
+    assert [entry['query'] for entry in entries] == ['new']
+
+
+def test_slow_query_log_records_stage_breakdown():
+    slow_query_log = SlowQueryLog(size=5, count_rule_attempts=True)
+    register_hooks(slow_query_log)
+    try:
+        parse_query('author ellis and title boson')
+        parse_query('d < 200')
+    finally:
+        unregister_hooks(slow_query_log)
+
+    entries = {entry['query']: entry for entry in slow_query_log.entries()}
+    assert set(entries) == {'author ellis and title boson', 'd < 200'}
+
+    entry = entries['author ellis and title boson']
+    assert set(entry['stages']) == {'decode', 'parse', 'restructure', 'es'}
+    assert entry['node_count'] > 0
+    assert entry['rule_attempts'] > 0
+    assert entry['fallback_reason'] is None
+
+    assert entries['d < 200']['fallback_reason'] == 'empty_es_query'
+    assert 'fallback' in entries['d < 200']['stages']
+
+
+@mock.patch('inspire_query_parser.parsing_driver.RuleAttemptCountingParser')
+def test_slow_query_log_does_not_count_rule_attempts_by_default(mocked_counting_parser):
+    slow_query_log = SlowQueryLog(size=5)
+    register_hooks(slow_query_log)
+    try:
+        parse_query('author ellis and title boson')
+    finally:
+        unregister_hooks(slow_query_log)
+
+    entry, = slow_query_log.entries()
+    assert entry['rule_attempts'] is None
+    assert not mocked_counting_parser.called
+
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGUSR1'), reason='SIGUSR1 is not available.')
+def test_slow_query_log_dumps_on_signal(tmpdir):
+    slow_query_log = SlowQueryLog()
+    slow_query_log.on_query(_trace('title boson', 0.1))
+    dump_path = str(tmpdir.join('slow_queries.json'))
+
+    previous_handler = slow_query_log.install_signal_handler(path=dump_path)
+    try:
+        os.kill(os.getpid(), signal.SIGUSR1)
+    finally:
+        signal.signal(signal.SIGUSR1, previous_handler)
+
+    with open(dump_path) as dump_file:
+        assert json.load(dump_file) == slow_query_log.entries()
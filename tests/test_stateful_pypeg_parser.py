@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE.
+# Copyright (C) 2014-2017 CERN.
+#
+# INSPIRE is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# INSPIRE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE. If not, see <http://www.gnu.org/licenses/>.
+#
+# In applying this license, CERN does not waive the privileges and immunities
+# granted to it by virtue of its status as an Intergovernmental Organization
+# or submit itself to any jurisdiction.
+
+from __future__ import absolute_import, unicode_literals
+
+import json
+
+from inspire_query_parser.parser import Query
+from inspire_query_parser.stateful_pypeg_parser import (InstrumentedStatefulParser,
+                                                        RuleStatistics,
+                                                        StatefulParser)
+
+
+def test_instrumented_parser_generates_the_same_parse_tree():
+    query_str = 'author ellis, j and smith or t boson'
+
+    _, expected_parse_tree = StatefulParser().parse(query_str, Query)
+    _, parse_tree = InstrumentedStatefulParser().parse(query_str, Query)
+
+    assert parse_tree == expected_parse_tree
+
+
+def test_instrumented_parser_records_rule_statistics():
+    parser = InstrumentedStatefulParser()
+    parser.parse('t boson', Query)
+
+    statistics = parser.statistics.as_dict()
+
+    assert statistics['Query'] == {
+        'attempts': 1,
+        'successes': 1,
+        'failures': 0,
+        'characters_consumed': len('t boson'),
+        'cumulative_time': statistics['Query']['cumulative_time'],
+        'self_time': statistics['Query']['self_time'],
+    }
+    assert statistics['InspireKeyword']['successes'] >= 1
+    assert statistics['SimpleValueBooleanQuery']['failures'] >= 1
+    for rule in statistics.values():
+        assert rule['attempts'] == rule['successes'] + rule['failures']
+        assert 0 <= rule['self_time'] <= rule['cumulative_time']
+
+
+def test_rule_statistics_are_aggregated_over_many_queries():
+    statistics = RuleStatistics()
+    InstrumentedStatefulParser(statistics).parse('t boson', Query)
+    InstrumentedStatefulParser(statistics).parse('a ellis', Query)
+
+    assert statistics.as_dict()['Query']['attempts'] == 2
+
+
+def test_rule_statistics_merge():
+    statistics, other_statistics = RuleStatistics(), RuleStatistics()
+    statistics.record('SimpleValue', True, 5, 0.5, 0.25)
+    other_statistics.record('SimpleValue', False, 0, 0.25, 0.25)
+    other_statistics.record('Value', True, 3, 0.5, 0.5)
+
+    statistics.merge(other_statistics)
+
+    assert statistics.as_dict() == {
+        'SimpleValue': {
+            'attempts': 2, 'successes': 1, 'failures': 1, 'characters_consumed': 5,
+            'cumulative_time': 0.75, 'self_time': 0.5,
+        },
+        'Value': {
+            'attempts': 1, 'successes': 1, 'failures': 0, 'characters_consumed': 3,
+            'cumulative_time': 0.5, 'self_time': 0.5,
+        },
+    }
+    assert statistics.total_attempts == 3
+
+
+def test_rule_statistics_exports():
+    parser = InstrumentedStatefulParser()
+    parser.parse('a ellis', Query)
+
+    assert json.loads(parser.statistics.to_json()) == parser.statistics.as_dict()
+
+    table = parser.statistics.format_table(sort_by='attempts').splitlines()
+    assert table[0].split()[:2] == ['rule', 'attempts']
+    assert len(table) == len(parser.statistics.as_dict()) + 1
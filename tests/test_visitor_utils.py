@@ -22,14 +22,32 @@
 
 from __future__ import absolute_import, print_function, unicode_literals
 
+import mock
 from pytest import raises
 
+from datetime import date
+
+from inspire_utils.date import PartialDate
+from inspire_utils.helpers import force_list as inspire_utils_force_list
+from inspire_utils.name import ParsedName
+
+from inspire_query_parser.utils import visitor_utils
 from inspire_query_parser.utils.visitor_utils import (
+    _get_next_date_from_partial_date,
+    _parse_date_value,
     _truncate_wildcard_from_date,
+    analyze_author_name,
     author_name_contains_fullnames,
+    convert_date_specifier,
+    convert_today_date_specifier,
+    force_list,
     generate_match_query,
     generate_minimal_name_variations,
     generate_nested_query,
+    parse_date_value,
+    register_date_conversion_handler,
+    unregister_date_conversion_handler,
+    update_date_value_in_operator_value_pairs_for_fieldname,
     wrap_queries_in_bool_clauses_if_more_than_one,
 )
 
@@ -54,6 +72,35 @@ def test_author_name_contains_fullnames(name, expected_answer):
     assert expected_answer == author_name_contains_fullnames(name)
 
 
+def test_analyze_author_name_is_cached_per_name():
+    assert analyze_author_name('Smith, John') is analyze_author_name('Smith, John')
+    assert analyze_author_name('Smith, John') is not analyze_author_name('Smith, Jane')
+
+
+def test_analyze_author_name():
+    analysis = analyze_author_name('Gödel, Kurt')
+
+    assert analysis.contains_fullnames
+    assert not analysis.is_bai
+    assert analysis.normalized_name == 'Gödel, Kurt'
+    assert set(analysis.minimal_name_variations) == {'godel kurt', 'godel k', 'kurt godel', 'kurt g'}
+
+    assert analyze_author_name('K.Godel.1').is_bai
+
+
+@mock.patch('inspire_utils.name.ParsedName', wraps=ParsedName)
+def test_author_name_helpers_parse_each_name_once(mocked_parsed_name):
+    mocked_parsed_name.loads.side_effect = ParsedName.loads
+    name = 'Uniquename, Analysis'
+
+    for _ in range(3):
+        assert author_name_contains_fullnames(name)
+        generate_minimal_name_variations(name)
+
+    parsed_names = [call[0][0] for call in mocked_parsed_name.call_args_list + mocked_parsed_name.loads.call_args_list]
+    assert sorted(parsed_names) == sorted(set(parsed_names))
+
+
 def test_generate_minimal_name_variations_lastname_firstname():
     name = 'Ellis, John'
     expected_variations = {
@@ -174,6 +221,104 @@ def test_truncate_wildcard_from_date_throws_with_unsupported_separator():
         _truncate_wildcard_from_date(date)
 
 
+def test_parse_date_value_is_identical_to_partial_date_parse():
+    date_values = [
+        '2000', '2000-1', '2000-01', '2000-12', '2000-13', '2000-00', '2000-02-29', '2001-02-29', '2000-1-9',
+        '2000-10-31', '2000-11-31', '2000-10-00', '0999', '999', 'May 2000', '1 May 2000', 'foo', '',
+    ]
+
+    for date_value in date_values:
+        try:
+            expected_date = PartialDate.parse(date_value)
+        except ValueError:
+            expected_date = None
+        assert _parse_date_value(date_value) == expected_date, date_value
+
+
+@mock.patch('inspire_utils.date.PartialDate.parse', side_effect=AssertionError)
+def test_parse_date_value_doesnt_use_dateutil_for_iso_dates(mocked_parse):
+    assert _parse_date_value('2000-10-08') == PartialDate(2000, 10, 8)
+    assert _parse_date_value('2000-10') == PartialDate(2000, 10)
+    assert _parse_date_value('2000') == PartialDate(2000)
+
+
+def test_parse_date_value_is_cached_per_value():
+    assert parse_date_value('May 2000') is parse_date_value('May 2000')
+    assert parse_date_value('2000-13') is None
+
+
+@parametrize({
+    'Year': {'partial_date': PartialDate(2000), 'expected_date': PartialDate(2001)},
+    'Month': {'partial_date': PartialDate(2000, 11), 'expected_date': PartialDate(2000, 12)},
+    'Last month': {'partial_date': PartialDate(2000, 12), 'expected_date': PartialDate(2001, 1)},
+    'Day': {'partial_date': PartialDate(2000, 2, 28), 'expected_date': PartialDate(2000, 2, 29)},
+    'Last day of month': {'partial_date': PartialDate(2001, 2, 28), 'expected_date': PartialDate(2001, 3, 1)},
+    'Last day of year': {'partial_date': PartialDate(2000, 12, 31), 'expected_date': PartialDate(2001, 1, 1)},
+})
+def test_get_next_date_from_partial_date(partial_date, expected_date):
+    assert _get_next_date_from_partial_date(partial_date) == expected_date
+
+
+def test_update_date_value_in_operator_value_pairs_for_fieldname():
+    assert update_date_value_in_operator_value_pairs_for_fieldname('earliest_date', {'eq': '2000-12'}) == \
+        {'gte': '2000-12||/M', 'lt': '2001-01||/M'}
+    assert update_date_value_in_operator_value_pairs_for_fieldname('publication_info.year', {'gt': '2000-12'}) == \
+        {'gt': '2000||/y'}
+    assert update_date_value_in_operator_value_pairs_for_fieldname('earliest_date', {'gt': '2000-13'}) == {}
+
+
+class FakeDate(date):
+    current_date = date(2018, 3, 1)
+
+    @classmethod
+    def today(cls):
+        return cls.current_date
+
+
+@mock.patch('inspire_query_parser.utils.visitor_utils.date', FakeDate)
+def test_convert_date_specifier():
+    assert convert_date_specifier('today') == '2018-03-01'
+    assert convert_date_specifier('Yesterday - 2') == '2018-02-26'
+    assert convert_date_specifier('this month - 1') == '2018-02-01'
+    assert convert_date_specifier('last  month') == '2018-02-01'
+    assert convert_date_specifier('ellis') is None
+    assert convert_date_specifier('title') is None
+    assert convert_date_specifier('') is None
+
+
+@mock.patch('inspire_query_parser.utils.visitor_utils.date', FakeDate)
+def test_convert_date_specifier_is_cached_per_day():
+    handler = mock.Mock(return_value='2018-03-01')
+    register_date_conversion_handler('today')(handler)
+    try:
+        assert convert_date_specifier('today - 1') == '2018-03-01'
+        assert convert_date_specifier('today - 1') == '2018-03-01'
+        handler.assert_called_once_with(' - 1')
+
+        FakeDate.current_date = date(2018, 3, 2)
+        convert_date_specifier('today - 1')
+        assert handler.call_count == 2
+    finally:
+        FakeDate.current_date = date(2018, 3, 1)
+        unregister_date_conversion_handler('today')
+        register_date_conversion_handler('today')(convert_today_date_specifier)
+
+
+@mock.patch('inspire_query_parser.utils.visitor_utils.date', FakeDate)
+def test_register_date_conversion_handler():
+    @register_date_conversion_handler(r'last\s+year')
+    def convert_last_year_date_specifier(relative_date_specifier_suffix):
+        return str(date(FakeDate.today().year - 1, 1, 1))
+
+    try:
+        assert convert_date_specifier('last year') == '2017-01-01'
+        assert convert_date_specifier('today') == '2018-03-01'
+    finally:
+        unregister_date_conversion_handler(r'last\s+year')
+
+    assert convert_date_specifier('last year') is None
+
+
 def test_generate_match_query_with_bool_value():
     generated_match_query = generate_match_query('core', True, with_operator_and=True)
 
@@ -337,3 +482,14 @@ def test_generate_nested_query_returns_empty_dict_on_falsy_query():
     expected_query = {}
 
     assert generated_query == expected_query
+
+
+def test_force_list_resolves_the_inspire_utils_one_once():
+    assert force_list('a') == ['a']
+    assert force_list(['a']) == ['a']
+    assert visitor_utils._inspire_utils_force_list is inspire_utils_force_list
+
+    with mock.patch('inspire_utils.helpers.force_list') as mocked_force_list:
+        force_list('a')
+
+    assert not mocked_force_list.called